@@ -0,0 +1,59 @@
+"""
+Benchmark the peak memory and the time of the preprocessing CLI on growing
+synthetic files, loading the whole file or streaming it in chunks, with the
+inferred or the compact dtypes
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+import click
+
+
+MODES = {
+    'whole file': [],
+    'chunks': ['--chunksize', '50000'],
+    'chunks compact': [
+        '--chunksize', '50000', '--categorical_dtype', 'category',
+        '--numerical_dtype', 'float32'
+    ],
+}
+
+
+def _run_cli(module, args):
+    """Run a CLI module, returning its seconds and peak RSS in MB"""
+    # this process stays small, as the peak RSS of a child starts from it
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, '-m', module, *args],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    _, status, usage = os.wait4(process.pid, 0)
+    seconds = time.perf_counter() - start
+    if os.waitstatus_to_exitcode(status):
+        raise RuntimeError(f"{module} failed: {args}")
+    # the maximum resident set size is in kilobytes on linux
+    return seconds, usage.ru_maxrss / 1024
+
+
+@click.command()
+@click.option('--rows', 'rows_levels', default="100000,300000,1000000", help="Comma separated file sizes")
+def main(rows_levels):
+    """Report the seconds and the peak memory per file size and mode"""
+    click.echo(f"{'rows':>8} {'mode':>15} {'seconds':>8} {'peak MB':>8}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for rows in map(int, rows_levels.split(',')):
+            input_path = Path(tmp_dir) / 'houses.csv'
+            _run_cli('houses_pipeline.synthetic', [str(input_path), '--rows', str(rows)])
+            for mode, options in MODES.items():
+                seconds, peak = _run_cli('houses_pipeline.preprocess', [
+                    str(input_path), str(Path(tmp_dir) / 'output.csv'), *options
+                ])
+                click.echo(f"{rows:>8} {mode:>15} {seconds:>8.1f} {peak:>8.0f}")
+
+
+if __name__ == '__main__':
+    # pylint: disable=no-value-for-parameter
+    main()
@@ -0,0 +1,61 @@
+"""
+Benchmark scoring a batch of listings through the records endpoint and
+through the column oriented endpoint, with JSON columns or Parquet bytes
+"""
+import io
+import json
+import logging
+import time
+import pandas as pd
+import click
+
+from houses_api.api.app import create_app
+from houses_api.api.config import TestingConfig, TEST_DATASET_PATH
+
+
+def _time_request(test_client, repeats, **request):
+    """Best of `repeats` wall times of posting a request"""
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        response = test_client.post(**request)
+        timings.append(time.perf_counter() - start)
+        assert response.status_code == 200, response.get_data()
+    return min(timings)
+
+
+@click.command()
+@click.option('--rows', default=10_000, help="Listings per request")
+@click.option('--repeats', default=3, help="Requests timed per endpoint")
+def main(rows, repeats):
+    """Report the latency of a batch request for every request format"""
+    listings = pd.read_csv(TEST_DATASET_PATH).sample(
+        n=rows, replace=True, random_state=0
+    ).reset_index(drop=True)
+    records = json.loads(listings.to_json(orient='records'))
+    columns = {column: [row[column] for row in records] for column in listings}
+    parquet = io.BytesIO()
+    listings.to_parquet(parquet)
+
+    requests = {
+        'records json': {'path': '/predict/lasso', 'json': records},
+        'columns json': {'path': '/predict/lasso/columns', 'json': columns},
+        'parquet': {
+            'path': '/predict/lasso/columns', 'data': parquet.getvalue(),
+            'content_type': 'application/vnd.apache.parquet'
+        },
+    }
+
+    app = create_app(config_object=TestingConfig)
+    # the records endpoint logs its whole input, which is not what is timed
+    logging.getLogger('houses_api.api.controller').disabled = True
+    with app.test_client() as test_client:
+        click.echo(f"{'format':>13} {'seconds':>8} {'rows/s':>9}")
+        for name, request in requests.items():
+            seconds = _time_request(test_client, repeats, **request)
+            click.echo(f"{name:>13} {seconds:>8.3f} {rows / seconds:>9.0f}")
+
+
+if __name__ == '__main__':
+    # pylint: disable=no-value-for-parameter
+    main()
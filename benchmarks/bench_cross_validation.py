@@ -0,0 +1,71 @@
+"""
+Benchmark cross validating the lasso alphas with the transformations of
+every fold fitted once and a warm started path per fold, against refitting
+the whole pipeline for every fold and alpha
+"""
+import time
+import warnings
+import numpy as np
+import click
+from sklearn.exceptions import ConvergenceWarning
+from sklearn.metrics import mean_squared_error
+from sklearn.model_selection import KFold
+
+from houses_pipeline import constants
+from houses_pipeline.config import config
+from houses_pipeline.io import read_frame
+from houses_pipeline.modelling.cross_validation import cross_validate_lasso, default_alphas
+from houses_pipeline.modelling.search import PathConfig
+from houses_pipeline.modelling.train_lasso import create_lasso_pipeline
+from houses_pipeline.preprocess.core import fit_preprocess_pipeline
+from houses_pipeline.synthetic.core import HousesGenerator
+
+
+@click.command()
+@click.option('--rows', default=20_000, help="Rows of the synthetic training data")
+@click.option('--n_folds', default=5, help="Folds to cross validate on")
+@click.option('--n_alphas', default=10, help="Alphas to cross validate")
+@click.option('--n_jobs', default=-1, help="Processes of the fold engine")
+def main(rows, n_folds, n_alphas, n_jobs):
+    """Report the seconds and the best mean rmse of both cross validations"""
+    warnings.simplefilter('ignore', ConvergenceWarning)
+    generator = HousesGenerator(seed=0).fit(read_frame(config.DATASET_DIR / 'raw/train.csv'))
+    houses_df = generator.sample(rows, np.random.default_rng(0))
+    houses_df = fit_preprocess_pipeline(houses_df).transform(houses_df)
+    X = houses_df.drop(columns=[constants.TARGET_VARIABLE_NAME, 'Id'])
+    y = houses_df[constants.TARGET_VARIABLE_NAME]
+    alphas = default_alphas(X, y, 0.05, PathConfig(n_alphas=n_alphas, eps=1e-3))
+
+    start = time.perf_counter()
+    result = cross_validate_lasso(
+        X, y, rare_threshold=0.05, path=PathConfig(alphas=alphas), n_folds=n_folds, seed=1,
+        n_jobs=n_jobs
+    )
+    engine_seconds = time.perf_counter() - start
+
+    # the same folds and alphas, refitting the whole pipeline for each pair
+    start = time.perf_counter()
+    refitted_rmse = np.zeros((n_folds, n_alphas))
+    for fold, (train_index, test_index) in enumerate(
+        KFold(n_folds, shuffle=True, random_state=1).split(X)
+    ):
+        for i, alpha in enumerate(alphas):
+            pipeline = create_lasso_pipeline(0.05, X.iloc[train_index], alpha, 1)
+            pipeline.fit(X.iloc[train_index], y.iloc[train_index])
+            refitted_rmse[fold, i] = mean_squared_error(
+                y.iloc[test_index], pipeline.predict(X.iloc[test_index]), squared=False
+            )
+    refit_seconds = time.perf_counter() - start
+
+    click.echo(f"{n_folds} folds x {n_alphas} alphas on {rows} rows")
+    click.echo(f"{'cv':>8} {'seconds':>8} {'best rmse':>10}")
+    click.echo(f"{'refit':>8} {refit_seconds:>8.2f} {refitted_rmse.mean(axis=0).min():>10.1f}")
+    click.echo(
+        f"{'engine':>8} {engine_seconds:>8.2f} "
+        f"{result['rmse_mean'][result['best_index']]:>10.1f}"
+    )
+
+
+if __name__ == '__main__':
+    # pylint: disable=no-value-for-parameter
+    main()
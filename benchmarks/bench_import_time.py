@@ -0,0 +1,63 @@
+"""
+Benchmark the import time of the package entry points, parsing the output
+of `python -X importtime` into a report of the heaviest imports
+"""
+import subprocess
+import sys
+import click
+
+
+ENTRY_POINTS = (
+    'houses_pipeline',
+    'houses_pipeline.predict.__main__',
+    'houses_pipeline.preprocess.__main__',
+    'houses_pipeline.modelling.train_lasso',
+    'houses_pipeline.predict.lasso',
+    'houses_api.api.app',
+)
+
+
+def import_times(module: str) -> dict:
+    """The cumulative import time in microseconds of every imported module"""
+    statement = f'import {module}' if module else 'pass'
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', statement],
+        capture_output=True, text=True, check=True
+    )
+    times = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+@click.command()
+@click.option('--repeats', default=3, help="Imports timed per entry point")
+@click.option('--top', default=3, help="Heaviest third party imports to show")
+def main(repeats, top):
+    """Report the best import time of each entry point and its heaviest imports"""
+    # the modules imported by the interpreter startup itself (e.g. site)
+    startup = set(import_times(None))
+    click.echo(f"{'module':<40} {'ms':>8}  heaviest imports")
+    for module in ENTRY_POINTS:
+        times = min(
+            (import_times(module) for _ in range(repeats)),
+            key=lambda times, module=module: times[module]
+        )
+        third_party = {
+            name: cumulative for name, cumulative in times.items()
+            if '.' not in name and not name.startswith(('houses_', '_'))
+            and name not in sys.stdlib_module_names and name not in startup
+        }
+        heaviest = sorted(third_party, key=third_party.get, reverse=True)[:top]
+        click.echo(
+            f"{module:<40} {times[module] / 1e3:>8.1f}  " +
+            ", ".join(f"{name} {third_party[name] / 1e3:.0f}ms" for name in heaviest)
+        )
+
+
+if __name__ == '__main__':
+    # pylint: disable=no-value-for-parameter
+    main()
@@ -0,0 +1,55 @@
+"""
+Benchmark writing and reading the preprocessed dataset as CSV, Parquet and
+Feather: the seconds, the file size, the memory of the read frame, and
+reading only the columns of one model branch
+"""
+import tempfile
+import time
+from pathlib import Path
+import numpy as np
+import click
+
+from houses_pipeline import constants
+from houses_pipeline.config import config
+from houses_pipeline.io import read_frame, write_frame
+from houses_pipeline.preprocess.core import fit_preprocess_pipeline
+from houses_pipeline.synthetic.core import HousesGenerator
+
+
+def _timed(func, *args, **kwargs):
+    """Call func, returning its result and seconds"""
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+@click.command()
+@click.option('--rows', default=1_000_000, help="Rows of the synthetic dataset")
+def main(rows):
+    """Report the write and read seconds, file and frame MB per format"""
+    generator = HousesGenerator(seed=0).fit(read_frame(config.DATASET_DIR / 'raw/train.csv'))
+    houses_df = generator.sample(rows, np.random.default_rng(0))
+    houses_df = fit_preprocess_pipeline(houses_df).transform(houses_df)
+    projection = list(houses_df.columns.intersection(constants.NUMERICAL_COLUMNS))
+
+    click.echo(
+        f"{'format':>8} {'write s':>8} {'file MB':>8} {'read s':>7} "
+        f"{'frame MB':>9} {'projected read s':>17}"
+    )
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for suffix in ('.csv', '.parquet', '.feather'):
+            path = Path(tmp_dir) / f'train{suffix}'
+            _, write_seconds = _timed(write_frame, houses_df, path)
+            read_df, read_seconds = _timed(read_frame, path)
+            _, projected_seconds = _timed(read_frame, path, columns=projection)
+            click.echo(
+                f"{suffix[1:]:>8} {write_seconds:>8.2f} "
+                f"{path.stat().st_size / 1e6:>8.1f} {read_seconds:>7.2f} "
+                f"{read_df.memory_usage(deep=True).sum() / 1e6:>9.1f} "
+                f"{projected_seconds:>17.2f}"
+            )
+
+
+if __name__ == '__main__':
+    # pylint: disable=no-value-for-parameter
+    main()
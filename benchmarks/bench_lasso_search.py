@@ -0,0 +1,70 @@
+"""
+Benchmark searching the lasso alpha and rare threshold along warm started
+regularization paths over cached design matrices, against refitting the
+whole pipeline for every candidate
+"""
+import time
+import warnings
+import numpy as np
+import click
+from sklearn.exceptions import ConvergenceWarning
+from sklearn.metrics import mean_squared_error
+from sklearn.model_selection import train_test_split
+
+from houses_pipeline import constants
+from houses_pipeline.config import config
+from houses_pipeline.io import read_frame
+from houses_pipeline.modelling.search import SearchConfig, search_lasso
+from houses_pipeline.modelling.train_lasso import create_lasso_pipeline
+from houses_pipeline.preprocess.core import fit_preprocess_pipeline
+from houses_pipeline.synthetic.core import HousesGenerator
+
+
+@click.command()
+@click.option('--rows', default=20_000, help="Rows of the synthetic training data")
+@click.option('--rare_thresholds', default="0.05,0.1,0.2", help="Comma separated rare thresholds")
+@click.option('--n_alphas', default=20, help="Alphas per rare threshold")
+@click.option('--n_jobs', default=-1, help="Processes of the search, one per threshold at most")
+def main(rows, rare_thresholds, n_alphas, n_jobs):
+    """Report the seconds and the best validation rmse of both searches"""
+    warnings.simplefilter('ignore', ConvergenceWarning)
+    generator = HousesGenerator(seed=0).fit(read_frame(config.DATASET_DIR / 'raw/train.csv'))
+    houses_df = generator.sample(rows, np.random.default_rng(0))
+    houses_df = fit_preprocess_pipeline(houses_df).transform(houses_df)
+    X_fit, X_val, y_fit, y_val = train_test_split(
+        houses_df.drop(columns=[constants.TARGET_VARIABLE_NAME, 'Id']),
+        houses_df[constants.TARGET_VARIABLE_NAME],
+        train_size=0.8, random_state=1
+    )
+    thresholds = [float(threshold) for threshold in rare_thresholds.split(',')]
+
+    start = time.perf_counter()
+    candidates = search_lasso(
+        X_fit, y_fit, X_val, y_val,
+        SearchConfig(thresholds, n_alphas=n_alphas, n_jobs=n_jobs)
+    )
+    path_seconds = time.perf_counter() - start
+
+    # the same candidates, refitting the whole pipeline for each of them
+    start = time.perf_counter()
+    refitted_rmse = min(
+        mean_squared_error(
+            y_val,
+            create_lasso_pipeline(
+                candidate['rare_threshold'], X_fit, candidate['alpha'], 1
+            ).fit(X_fit, y_fit).predict(X_val),
+            squared=False
+        )
+        for candidate in candidates
+    )
+    refit_seconds = time.perf_counter() - start
+
+    click.echo(f"{len(candidates)} candidates on {len(X_fit)} training rows")
+    click.echo(f"{'search':>8} {'seconds':>8} {'best rmse':>10}")
+    click.echo(f"{'refit':>8} {refit_seconds:>8.2f} {refitted_rmse:>10.1f}")
+    click.echo(f"{'path':>8} {path_seconds:>8.2f} {candidates[0]['rmse']:>10.1f}")
+
+
+if __name__ == '__main__':
+    # pylint: disable=no-value-for-parameter
+    main()
@@ -0,0 +1,89 @@
+"""
+Load test the prediction endpoint at fixed request rates, with and without
+micro-batching, reporting the latency percentiles of single listing requests
+"""
+import sys
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import click
+
+from harness import free_port, listing_bodies, running_server
+
+
+SERVER_SCRIPT = """
+import sys
+from werkzeug.serving import make_server
+from houses_api.api.app import create_app
+from houses_api.api.config import Config
+make_server('127.0.0.1', int(sys.argv[1]), create_app(config_object=Config), threaded=True).serve_forever()
+"""
+
+
+def _post(url, body, scheduled):
+    """Wait for the scheduled time, post and return the latency from it"""
+    time.sleep(max(0.0, scheduled - time.perf_counter()))
+    request = urllib.request.Request(
+        url, data=body, headers={'Content-Type': 'application/json'}
+    )
+    try:
+        with urllib.request.urlopen(request) as response:
+            response.read()
+    except OSError:
+        return np.nan
+    return time.perf_counter() - scheduled
+
+
+def run_load(url, bodies, qps, seconds, concurrency):
+    """
+    Send requests at a fixed rate (open loop, so slow responses do not slow
+    down the sending), returning the latencies measured from the send times
+    """
+    count = int(qps * seconds)
+    start = time.perf_counter() + 0.1
+    with ThreadPoolExecutor(concurrency) as executor:
+        futures = [
+            executor.submit(_post, url, bodies[i % len(bodies)], start + i / qps)
+            for i in range(count)
+        ]
+        return np.array([future.result() for future in futures])
+
+
+@click.command()
+@click.option('--qps', 'qps_levels', default="25,50,100,200", help="Comma separated request rates")
+@click.option('--seconds', default=5.0, help="Seconds of load per request rate")
+@click.option('--concurrency', default=128, help="Most requests in flight")
+@click.option('--max_batch_size', default=256, help="Most rows per micro-batch")
+@click.option('--max_wait_ms', default=5.0, help="Most milliseconds to fill a batch")
+def main(qps_levels, seconds, concurrency, max_batch_size, max_wait_ms):
+    """Report p50/p95/p99 latencies per request rate, with and without batching"""
+    bodies = listing_bodies()
+
+    click.echo(
+        f"{'batching':>8} {'qps':>5} {'done/s':>7} {'errors':>6} "
+        f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}"
+    )
+    for micro_batching in (False, True):
+        port = free_port()
+        with running_server([sys.executable, '-c', SERVER_SCRIPT, str(port)], {
+            'MICRO_BATCHING': '1' if micro_batching else '0',
+            'MAX_BATCH_SIZE': str(max_batch_size),
+            'MAX_BATCH_WAIT_MS': str(max_wait_ms),
+        }, port) as root:
+            url = f'{root}/predict/lasso'
+            run_load(url, bodies, 10, 1, concurrency)  # warm up
+            for qps in map(float, qps_levels.split(',')):
+                latencies = run_load(url, bodies, qps, seconds, concurrency)
+                done = latencies[~np.isnan(latencies)]
+                p50, p95, p99 = np.percentile(done, [50, 95, 99]) * 1e3
+                click.echo(
+                    f"{str(micro_batching):>8} {qps:>5.0f} "
+                    f"{len(done) / (seconds + np.max(done)):>7.0f} "
+                    f"{len(latencies) - len(done):>6} "
+                    f"{p50:>8.1f} {p95:>8.1f} {p99:>8.1f}"
+                )
+
+if __name__ == '__main__':
+    # pylint: disable=no-value-for-parameter
+    main()
@@ -0,0 +1,98 @@
+"""
+Benchmark the time to the first prediction of a cold start and of a newly
+dropped model artifact, reloading in the request path or in a watcher thread
+"""
+import shutil
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+import click
+
+from houses_pipeline import __version__
+from houses_pipeline import save_model
+from houses_pipeline.config import config
+from houses_pipeline.predict import lasso
+
+
+def _use_registry(directory, mmap_mode):
+    """Point the lasso predictions at a fresh registry of a directory"""
+    lasso.registry = lasso.create_registry(directory, mmap_mode=mmap_mode)
+    return lasso.registry
+
+
+def _drop_new_model(directory):
+    """Save a retrained (here: a marked copy of the current) lasso"""
+    _, lasso_model, _ = lasso.load_artifacts()
+    lasso_model.dropped_at = time.time()
+    save_model(
+        lasso_model,
+        model_name=f"{config.LASSO_SAVE_FILENAME}_{__version__}.pkl",
+        directory=directory
+    )
+
+
+def _time_to_swap(registry, row, in_request_path):
+    """
+    Keep predicting while a new model is dropped, returning the seconds
+    until the first prediction of the new model and the slowest request
+    """
+    old_key = registry.key(config.LASSO_SAVE_FILENAME, __version__)
+    latencies = []
+    dropped = time.perf_counter()
+    _drop_new_model(registry.directory)
+    while registry.key(config.LASSO_SAVE_FILENAME, __version__) == old_key:
+        start = time.perf_counter()
+        if in_request_path:
+            registry.refresh()
+        lasso.predict_frame(row, mode='compiled')
+        latencies.append(time.perf_counter() - start)
+    return time.perf_counter() - dropped, max(latencies)
+
+
+@click.command()
+@click.option('--repeats', default=5, help="Swaps timed per setting")
+@click.option('--interval', default=0.05, help="Seconds between watcher checks")
+def main(repeats, interval):
+    """Report the time to the first prediction after a cold start and a swap"""
+    row = pd.read_csv(config.DATASET_DIR / 'raw/test.csv').head(1)
+
+    with tempfile.TemporaryDirectory() as directory:
+        for name in (config.PREPROCESS_SAVE_FILENAME, config.LASSO_SAVE_FILENAME):
+            filename = f"{name}_{__version__}.pkl"
+            shutil.copy(config.TRAINED_MODELS_DIR / filename, directory)
+
+        click.echo(f"{'mmap':>6} {'cold start ms':>14}")
+        for mmap_mode in (None, 'r'):
+            timings = []
+            for _ in range(repeats):
+                _use_registry(directory, mmap_mode)
+                start = time.perf_counter()
+                lasso.predict_frame(row, mode='compiled')
+                timings.append(time.perf_counter() - start)
+            click.echo(f"{str(mmap_mode):>6} {min(timings) * 1e3:>14.1f}")
+
+        start = time.perf_counter()
+        lasso.predict_frame(row, mode='compiled')
+        click.echo(f"\nsteady request: {(time.perf_counter() - start) * 1e3:.1f} ms")
+
+        click.echo(
+            f"\n{'reload':>8} {'to first prediction ms':>23} {'slowest request ms':>19}"
+        )
+        for setting in ('request', 'watcher'):
+            registry = _use_registry(directory, 'r')
+            lasso.predict_frame(row, mode='compiled')
+            if setting == 'watcher':
+                registry.watch(interval)
+            swaps = [
+                _time_to_swap(registry, row, setting == 'request')
+                for _ in range(repeats)
+            ]
+            registry.stop()
+            to_first, slowest = np.median(swaps, axis=0)
+            click.echo(f"{setting:>8} {to_first * 1e3:>23.1f} {slowest * 1e3:>19.1f}")
+
+
+if __name__ == '__main__':
+    # pylint: disable=no-value-for-parameter
+    main()
@@ -0,0 +1,62 @@
+"""
+Benchmark the time and the memory allocated by the Pandalizer copy modes,
+imputing the categorical columns the way the preprocessing pipeline does
+"""
+import time
+import tracemalloc
+import warnings
+import numpy as np
+import pandas as pd
+import click
+from sklearn.impute import SimpleImputer
+
+from houses_pipeline.config import config
+from houses_pipeline.preprocess.core import COLUMNS_TO_IMPUTE
+from houses_pipeline.preprocess.core import drop_useless_columns
+from houses_pipeline.transformers import Pandalizer
+
+
+def _measure(func, df):
+    """Time func(df) and trace the peak memory it allocates"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    func(df)
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return seconds, peak
+
+
+@click.command()
+@click.option('--rows', default=200_000, help="Rows of the scaled up input")
+def main(rows):
+    """Report time, traced peak memory and bytes_allocated per copy mode"""
+    raw_df = pd.read_csv(config.DATASET_DIR / 'raw/train.csv')
+    houses_df = drop_useless_columns(
+        raw_df.sample(n=rows, replace=True, random_state=0).reset_index(drop=True)
+    )
+    columns = np.intersect1d(COLUMNS_TO_IMPUTE, houses_df.columns)
+    click.echo(
+        f"input: {houses_df.shape}, "
+        f"{houses_df.memory_usage(index=False).sum() / 1e6:.1f} MB"
+    )
+
+    click.echo(f"{'mode':>8} {'seconds':>8} {'peak MB':>8} {'allocated MB':>13}")
+    for copy in Pandalizer.COPY_MODES:
+        imputer = Pandalizer(
+            SimpleImputer(strategy='constant', fill_value='Missing'), copy=copy
+        ).fit(houses_df, columns=columns)
+        # the inplace mode gets its own copy to modify
+        df = houses_df.copy() if copy == 'inplace' else houses_df
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', pd.errors.PerformanceWarning)
+            seconds, peak = _measure(imputer.transform, df)
+        click.echo(
+            f"{copy:>8} {seconds:>8.3f} {peak / 1e6:>8.1f} "
+            f"{imputer.bytes_allocated / 1e6:>13.1f}"
+        )
+
+
+if __name__ == '__main__':
+    # pylint: disable=no-value-for-parameter
+    main()
@@ -0,0 +1,65 @@
+"""
+Benchmark the throughput of scoring a large file with 1, 2, 4, ... worker
+processes sharing the loaded lasso model
+"""
+import functools
+import os
+import tempfile
+import pathlib
+import pandas as pd
+import click
+
+from houses_pipeline.config import config
+from houses_pipeline.predict import lasso
+from houses_pipeline.predict.batch import score_file
+
+
+def _worker_counts(max_workers):
+    """1, 2, 4, ... up to and including max_workers"""
+    counts = [1]
+    while counts[-1] * 2 < max_workers:
+        counts.append(counts[-1] * 2)
+    if max_workers > 1:
+        counts.append(max_workers)
+    return counts
+
+
+@click.command()
+@click.option('--rows', default=500_000, help="Rows of the scaled up input file")
+@click.option('--chunksize', default=10_000, help="Rows per scored range")
+@click.option(
+    '--max_workers', default=os.cpu_count(), help="The most workers to try"
+)
+@click.option(
+    '--mode', type=click.Choice(lasso.PREDICT_MODES), default='compiled',
+    help="Score with the sklearn pipeline or the compiled scoring plan"
+)
+def main(rows, chunksize, max_workers, mode):
+    """Report the scoring throughput for an increasing number of workers"""
+    test_df = pd.read_csv(config.DATASET_DIR / 'raw/test.csv')
+    score = functools.partial(lasso.predict_frame, mode=mode)
+
+    with tempfile.TemporaryDirectory() as directory:
+        input_path = pathlib.Path(directory) / 'houses.csv'
+        test_df.sample(n=rows, replace=True, random_state=0).to_csv(
+            input_path, index=False
+        )
+
+        click.echo(f"{'workers':>7} {'rows/s':>10} {'speedup':>8} {'efficiency':>10}")
+        baseline = None
+        for workers in _worker_counts(max_workers):
+            stats = score_file(
+                input_path, pathlib.Path(directory) / 'predictions.csv',
+                score=score, chunksize=chunksize, workers=workers
+            )
+            throughput = stats['rows_per_second']
+            baseline = baseline or throughput
+            click.echo(
+                f"{workers:>7} {throughput:>10.0f} {throughput / baseline:>7.2f}x "
+                f"{throughput / baseline / workers:>10.0%}"
+            )
+
+
+if __name__ == '__main__':
+    # pylint: disable=no-value-for-parameter
+    main()
@@ -0,0 +1,68 @@
+"""
+Benchmark the prediction cache on repeated traffic: single listing requests
+drawn with a skew from a pool of listings, and batches partly seen before
+"""
+import logging
+import pathlib
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+import click
+
+from houses_pipeline.config import config
+from houses_pipeline.predict import lasso
+from houses_pipeline.predict.cache import PredictionCache, SqliteStore
+
+
+def _requests_per_second(requests, cache):
+    """Score every request, returning the requests scored per second"""
+    start = time.perf_counter()
+    for input_df in requests:
+        lasso.predict_frame(input_df, cache=cache)
+    return len(requests) / (time.perf_counter() - start)
+
+
+@click.command()
+@click.option('--requests', 'request_count', default=500, help="Single listing requests")
+@click.option('--listings', default=100, help="Distinct listings requested")
+@click.option('--batch_size', default=200, help="Rows of the partly seen batches")
+def main(request_count, listings, batch_size):
+    """Report the requests per second and hit rates with and without cache"""
+    logging.getLogger(lasso.__name__).disabled = True
+    test_df = pd.read_csv(config.DATASET_DIR / 'raw/test.csv')
+    lasso.warm_up()
+
+    # zipf like popularity of the listings
+    rng = np.random.default_rng(0)
+    weights = 1 / np.arange(1, listings + 1)
+    picks = rng.choice(listings, size=request_count, p=weights / weights.sum())
+    singles = [test_df.iloc[[pick]] for pick in picks]
+    # each batch shares half of its rows with the one before
+    batches = [
+        test_df.iloc[start:start + batch_size]
+        for start in range(0, len(test_df) - batch_size, batch_size // 2)
+    ]
+
+    click.echo(f"{'traffic':>8} {'cache':>8} {'requests/s':>11} {'hit rate':>9}")
+    for name, requests in (('single', singles), ('batches', batches)):
+        for cache_name in ('none', 'memory', 'sqlite'):
+            with tempfile.TemporaryDirectory() as store_dir:
+                cache = {
+                    'none': None,
+                    'memory': PredictionCache(),
+                    'sqlite': PredictionCache(
+                        store=SqliteStore(pathlib.Path(store_dir) / 'predictions.db')
+                    ),
+                }[cache_name]
+                rate = _requests_per_second(requests, cache)
+            hit_rate = '-'
+            if cache is not None:
+                stats = cache.stats()
+                hit_rate = f"{stats['hits'] / (stats['hits'] + stats['misses']):.0%}"
+            click.echo(f"{name:>8} {cache_name:>8} {rate:>11.1f} {hit_rate:>9}")
+
+
+if __name__ == '__main__':
+    # pylint: disable=no-value-for-parameter
+    main()
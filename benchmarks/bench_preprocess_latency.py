@@ -0,0 +1,67 @@
+"""
+Benchmark the per row latency of the serving preprocessing, comparing
+refitting the preprocessor on every request against the frozen preprocessor
+"""
+import time
+import pandas as pd
+import click
+
+from houses_pipeline import __version__
+from houses_pipeline import load_model
+from houses_pipeline.config import config
+from houses_pipeline.preprocess.core import COLUMNS_TO_IMPUTE
+from houses_pipeline.preprocess.core import load_preprocess_pipeline
+from houses_pipeline.preprocess.core import fit_preprocess_pipeline
+
+
+def _refit_per_call(df):
+    """The previous serving path: fit the preprocessor on each request"""
+    return load_preprocess_pipeline().fit_transform(
+        df, impute_missing_categories__columns=COLUMNS_TO_IMPUTE
+    )
+
+
+def _load_frozen_preprocessor():
+    """Load the frozen preprocessor or fit one on the raw training data"""
+    model_name = f"{config.PREPROCESS_SAVE_FILENAME}_{__version__}.pkl"
+    if (config.TRAINED_MODELS_DIR / model_name).exists():
+        return load_model(model_name=model_name)
+    train_df = pd.read_csv(config.DATASET_DIR / 'raw/train.csv')
+    return fit_preprocess_pipeline(train_df)
+
+
+def _time_per_row(func, df, repeats):
+    """Best of `repeats` wall times of func(df), divided by the rows"""
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func(df)
+        timings.append(time.perf_counter() - start)
+    return min(timings) / len(df)
+
+
+@click.command()
+@click.option('--repeats', default=20, help="Repetitions per batch size")
+@click.option(
+    '--batch_sizes', default="1,10,100,1000",
+    help="Comma separated batch sizes to time"
+)
+def main(repeats, batch_sizes):
+    """Report the per row preprocessing latency before and after freezing"""
+    test_df = pd.read_csv(config.DATASET_DIR / 'raw/test.csv')
+    frozen = _load_frozen_preprocessor()
+
+    click.echo(f"{'rows':>6} {'refit us/row':>14} {'frozen us/row':>14} {'speedup':>8}")
+    for batch_size in map(int, batch_sizes.split(',')):
+        batch = test_df.sample(n=batch_size, replace=True, random_state=0)
+        before = _time_per_row(_refit_per_call, batch, repeats)
+        after = _time_per_row(frozen.transform, batch, repeats)
+        click.echo(
+            f"{batch_size:>6} {before * 1e6:>14.1f} {after * 1e6:>14.1f} "
+            f"{before / after:>7.1f}x"
+        )
+
+
+if __name__ == '__main__':
+    # pylint: disable=no-value-for-parameter
+    main()
@@ -0,0 +1,51 @@
+"""
+Micro-benchmark RareCategoriesReplacer.transform on a single row and on
+a million rows, with object and with category columns
+"""
+import time
+import pandas as pd
+import click
+
+from houses_pipeline import constants
+from houses_pipeline.config import config
+from houses_pipeline.preprocess.core import fit_preprocess_pipeline
+from houses_pipeline.transformers import RareCategoriesReplacer
+
+
+def _best_time(func, repeats):
+    """Best of `repeats` wall times of calling func"""
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+@click.command()
+@click.option('--rows', default=1_000_000, help="Rows of the large input")
+@click.option('--threshold', default=0.05, help="The rare categories threshold")
+def main(rows, threshold):
+    """Time transforming one row and `rows` rows of the categorical columns"""
+    raw_df = pd.read_csv(config.DATASET_DIR / 'raw/train.csv')
+    houses_df = fit_preprocess_pipeline(raw_df).transform(raw_df)
+    categoricals = houses_df[
+        houses_df.columns.intersection(constants.CATEGORICAL_COLUMNS)
+    ]
+    replacer = RareCategoriesReplacer(threshold).fit(categoricals)
+    large = categoricals.sample(n=rows, replace=True, random_state=0)
+
+    cases = [
+        ('1 row, object', categoricals.iloc[:1], 1000),
+        (f'{rows} rows, object', large, 3),
+        (f'{rows} rows, category', large.astype('category'), 3),
+    ]
+    click.echo(f"{'input':>28} {'seconds':>10} {'ns/value':>9}")
+    for name, X, repeats in cases:
+        seconds = _best_time(lambda X=X: replacer.transform(X), repeats)
+        click.echo(f"{name:>28} {seconds:>10.6f} {seconds / X.size * 1e9:>9.1f}")
+
+
+if __name__ == '__main__':
+    # pylint: disable=no-value-for-parameter
+    main()
@@ -0,0 +1,101 @@
+"""
+Benchmark the time a prediction request spends logging, writing its whole
+payload synchronously as the controller did, against queueing summaries
+"""
+import json
+import logging
+import pathlib
+import tempfile
+import time
+import zlib
+from logging.handlers import TimedRotatingFileHandler
+import pandas as pd
+import click
+
+from houses_api.api.config import FORMATTER, TEST_DATASET_PATH
+from houses_pipeline.config.logging import AsyncQueueHandler
+
+
+def _handlers(log_dir):
+    """Console (to a file, as when redirected) and file handlers"""
+    # pylint: disable=consider-using-with
+    console = logging.StreamHandler(open(log_dir / 'console.log', 'a', encoding='utf-8'))
+    rotating = TimedRotatingFileHandler(log_dir / 'api.log', when='midnight')
+    for handler in (console, rotating):
+        handler.setFormatter(FORMATTER)
+    return console, rotating
+
+
+def _log_whole(logger, body, records, outputs):
+    """Log the whole input and the output twice"""
+    logger.info("Input %s", records)
+    logger.info("Outputs: %s", outputs)
+    logger.info(outputs)
+
+
+def _log_summary(logger, body, records, outputs):
+    """Log the size and hash of the input and of the output"""
+    digest = f'{zlib.crc32(body):08x}'
+    logger.info("Input %s of %d rows", digest, len(records))
+    logger.info(
+        "Output %s: %d predictions, %d errors",
+        digest, len(outputs['predictions']), 0
+    )
+
+
+@click.command()
+@click.option('--batch_sizes', default="1,100,1000", help="Comma separated rows per request")
+@click.option('--requests', 'request_count', default=200, help="Requests per measure")
+def main(batch_sizes, request_count):
+    """
+    Report the milliseconds spent logging per request in the request thread
+    and, for the queued setups, until the listener wrote everything
+    """
+    test_df = pd.read_csv(TEST_DATASET_PATH)
+    setups = {
+        'sync whole': (False, _log_whole),
+        'queued whole': (True, _log_whole),
+        'queued summary': (True, _log_summary),
+    }
+
+    click.echo(
+        f"{'rows':>6} " + " ".join(f"{name:>15}" for name in setups)
+        + " " + " ".join(f"{name + ' (total)':>22}" for name in list(setups)[1:])
+    )
+    for batch_size in map(int, batch_sizes.split(',')):
+        records = json.loads(test_df.head(batch_size).to_json(orient='records'))
+        body = json.dumps(records).encode()
+        outputs = {'predictions': [1e5] * batch_size, 'version': '0.0.1', 'errors': None}
+
+        timings, totals = [], []
+        for name, (queued, log) in setups.items():
+            with tempfile.TemporaryDirectory() as log_dir:
+                handlers = _handlers(pathlib.Path(log_dir))
+                handler = AsyncQueueHandler(*handlers) if queued else None
+                logger = logging.getLogger(f'bench_request_logging.{name}')
+                logger.setLevel(logging.INFO)
+                logger.propagate = False
+                for attached in [handler] if queued else handlers:
+                    logger.addHandler(attached)
+
+                start = time.perf_counter()
+                for _ in range(request_count):
+                    log(logger, body, records, outputs)
+                timings.append((time.perf_counter() - start) / request_count * 1e3)
+
+                for attached in [handler] if queued else handlers:
+                    logger.removeHandler(attached)
+                if queued:
+                    handler.stop()
+                    totals.append((time.perf_counter() - start) / request_count * 1e3)
+                for written in handlers:
+                    written.close()
+        click.echo(
+            f"{batch_size:>6} " + " ".join(f"{ms:>12.3f} ms" for ms in timings)
+            + " " + " ".join(f"{ms:>19.3f} ms" for ms in totals)
+        )
+
+
+if __name__ == '__main__':
+    # pylint: disable=no-value-for-parameter
+    main()
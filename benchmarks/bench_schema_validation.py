@@ -0,0 +1,73 @@
+"""
+Benchmark validating batches of records with marshmallow row by row (the
+previous validation of the API) against the vectorized schema validation
+"""
+import json
+import time
+import pandas as pd
+import click
+from marshmallow import ValidationError
+
+from houses_api.api.config import TEST_DATASET_PATH
+from houses_api.api.validation import HouseDataRequestSchema
+from houses_api.api.validation import SYNTAX_ERROR_FIELD_MAP, validate_inputs
+
+
+def _marshmallow_validate(records):
+    """The previous validation: rename, load row by row and delete errors"""
+    for record in records:
+        for key, name in SYNTAX_ERROR_FIELD_MAP.items():
+            record[name] = record.pop(key)
+    errors = None
+    try:
+        HouseDataRequestSchema(many=True).load(records)
+    except ValidationError as error:
+        errors = error.messages
+    for record in records:
+        for key, name in SYNTAX_ERROR_FIELD_MAP.items():
+            record[key] = record.pop(name)
+    for index in sorted(errors or {}, reverse=True):
+        del records[index]
+    return records, errors
+
+
+def _time(func, records):
+    """Wall time of validating a fresh copy of the records"""
+    records = json.loads(json.dumps(records))
+    start = time.perf_counter()
+    func(records)
+    return time.perf_counter() - start
+
+
+@click.command()
+@click.option(
+    '--batch_sizes', default="100,1000,10000,100000",
+    help="Comma separated batch sizes to time"
+)
+@click.option(
+    '--max_marshmallow_rows', default=100_000,
+    help="Skip the (slow) marshmallow validation of larger batches"
+)
+def main(batch_sizes, max_marshmallow_rows):
+    """Report the validation time of both validations per batch size"""
+    test_df = pd.read_csv(TEST_DATASET_PATH)
+
+    click.echo(f"{'rows':>7} {'marshmallow s':>14} {'vectorized s':>13} {'speedup':>8}")
+    for batch_size in map(int, batch_sizes.split(',')):
+        records = json.loads(
+            test_df.sample(n=batch_size, replace=True, random_state=0)
+            .to_json(orient='records')
+        )
+        after = _time(validate_inputs, records)
+        if batch_size > max_marshmallow_rows:
+            click.echo(f"{batch_size:>7} {'-':>14} {after:>13.3f}")
+            continue
+        before = _time(_marshmallow_validate, records)
+        click.echo(
+            f"{batch_size:>7} {before:>14.3f} {after:>13.3f} {before / after:>7.1f}x"
+        )
+
+
+if __name__ == '__main__':
+    # pylint: disable=no-value-for-parameter
+    main()
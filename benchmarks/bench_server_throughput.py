@@ -0,0 +1,82 @@
+"""
+Compare the throughput of the flask development server with the preforked
+gunicorn workers, with clients posting single listings back to back
+"""
+import os
+import sys
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import click
+
+from harness import free_port, listing_bodies, running_server
+
+
+DEV_SERVER_SCRIPT = """
+import sys
+from houses_api.run import application
+application.run(port=int(sys.argv[1]), threaded=True, use_reloader=False)
+"""
+
+
+def _client(url, bodies, deadline):
+    """Post listings one after the other until the deadline, with the latencies"""
+    latencies = []
+    while time.perf_counter() < deadline:
+        request = urllib.request.Request(
+            url, data=bodies[len(latencies) % len(bodies)],
+            headers={'Content-Type': 'application/json'}
+        )
+        start = time.perf_counter()
+        with urllib.request.urlopen(request) as response:
+            response.read()
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def run_clients(url, bodies, clients, seconds):
+    """The latencies of all requests of the concurrent clients"""
+    deadline = time.perf_counter() + seconds
+    with ThreadPoolExecutor(clients) as executor:
+        futures = [
+            executor.submit(_client, url, bodies, deadline) for _ in range(clients)
+        ]
+        return np.concatenate([future.result() for future in futures])
+
+
+@click.command()
+@click.option('--clients', default=8, help="Concurrent clients")
+@click.option('--seconds', default=10.0, help="Seconds of load per server")
+@click.option('--workers', default=os.cpu_count() or 1, help="Gunicorn workers")
+@click.option('--threads', default=1, help="Threads per gunicorn worker")
+def main(clients, seconds, workers, threads):
+    """Report the requests per second and latencies of each server"""
+    bodies = listing_bodies()
+    servers = {
+        'flask dev': ([sys.executable, '-c', DEV_SERVER_SCRIPT], {}),
+        f'gunicorn x{workers}': (
+            [sys.executable, '-m', 'gunicorn', '-c', 'houses_api/gunicorn_config.py',
+             'houses_api.wsgi:application'],
+            {'WEB_CONCURRENCY': str(workers), 'WORKER_THREADS': str(threads)}
+        ),
+    }
+
+    click.echo(f"{'server':>14} {'req/s':>7} {'p50 ms':>8} {'p99 ms':>8}")
+    for name, (command, env) in servers.items():
+        port = free_port()
+        with running_server(
+            command + [str(port)] if name == 'flask dev' else command,
+            env | {'SERVER_ADDRESS': '127.0.0.1', 'SERVER_PORT': str(port)}, port
+        ) as root:
+            url = f'{root}/predict/lasso'
+            run_clients(url, bodies, clients, 1)  # warm up
+            latencies = run_clients(url, bodies, clients, seconds)
+            p50, p99 = np.percentile(latencies, [50, 99]) * 1e3
+            click.echo(
+                f"{name:>14} {len(latencies) / seconds:>7.1f} {p50:>8.1f} {p99:>8.1f}"
+            )
+
+if __name__ == '__main__':
+    # pylint: disable=no-value-for-parameter
+    main()
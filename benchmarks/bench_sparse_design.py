@@ -0,0 +1,71 @@
+"""
+Benchmark the peak memory and the time of fitting the lasso pipeline on a
+sparse (CSR) design matrix, against densifying it as the column transformer
+did by default. Every fit runs in its own process, for its peak memory.
+"""
+import tempfile
+import time
+import click
+
+from harness import read_training_data, run_measured, training_files
+
+# the sparse_threshold of the column transformer per mode, 0.3 being the
+# scikit-learn default densifying the design of the houses
+MODES = {'dense': 0.3, 'sparse': 1.0}
+
+
+def _fit(input_path, sparse_threshold):
+    """Fit the pipeline on a preprocessed file, printing the seconds"""
+    # pylint: disable=import-outside-toplevel
+    import scipy.sparse
+    from houses_pipeline.modelling.train_lasso import create_lasso_pipeline
+
+    X, y = read_training_data(input_path)
+    pipeline = create_lasso_pipeline(0.05, X, alpha=0.01, model_seed=1).set_params(
+        column_transformations__sparse_threshold=sparse_threshold
+    )
+
+    start = time.perf_counter()
+    design = pipeline.named_steps['column_transformations'].fit_transform(X, y)
+    transform_seconds = time.perf_counter() - start
+    design_bytes = (
+        design.data.nbytes + design.indices.nbytes + design.indptr.nbytes
+        if scipy.sparse.issparse(design) else design.nbytes
+    )
+    pipeline.named_steps['lasso_and_target_transform'].fit(design, y)
+    fit_seconds = time.perf_counter() - start - transform_seconds
+    print(transform_seconds, fit_seconds, design_bytes / 1e6)
+
+
+@click.command()
+@click.option('--rows', 'rows_levels', default="100000,1000000", help="Comma separated file sizes")
+@click.option('--fit', 'fit_input', default=None, hidden=True)
+@click.option('--sparse_threshold', default=1.0, hidden=True)
+def main(rows_levels, fit_input, sparse_threshold):
+    """Report the seconds, the design and the peak MB per file size and mode"""
+    if fit_input:
+        _fit(fit_input, sparse_threshold)
+        return
+
+    click.echo(
+        f"{'rows':>8} {'mode':>7} {'transform s':>12} {'fit s':>7} "
+        f"{'design MB':>10} {'peak MB':>8}"
+    )
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for rows, input_path in training_files(tmp_dir, rows_levels):
+            for mode, threshold in MODES.items():
+                output, peak = run_measured([
+                    __file__, '--fit', str(input_path), '--sparse_threshold', str(threshold)
+                ])
+                transform_seconds, fit_seconds, design_mb = map(
+                    float, output.strip().splitlines()[-1].split()
+                )
+                click.echo(
+                    f"{rows:>8} {mode:>7} {transform_seconds:>12.1f} {fit_seconds:>7.1f} "
+                    f"{design_mb:>10.0f} {peak:>8.0f}"
+                )
+
+
+if __name__ == '__main__':
+    # pylint: disable=no-value-for-parameter
+    main()
@@ -0,0 +1,58 @@
+"""
+Benchmark the overhead of timing a stage, and report where the time of a
+prediction goes, stage by stage
+"""
+import logging
+import time
+import pandas as pd
+import click
+
+from houses_pipeline import metrics
+from houses_pipeline.config import config
+from houses_pipeline.predict import lasso
+
+
+def _overhead_us(repeats):
+    """Microseconds of an empty timed block"""
+    start = time.perf_counter()
+    for _ in range(repeats):
+        with metrics.timed('overhead'):
+            pass
+    return (time.perf_counter() - start) / repeats * 1e6
+
+
+@click.command()
+@click.option('--batch_sizes', default="1,100,1000", help="Comma separated rows per prediction")
+@click.option('--repeats', default=20, help="Predictions per batch size")
+def main(batch_sizes, repeats):
+    """Report the overhead of a timed stage and the mean ms of each stage"""
+    logging.getLogger(lasso.__name__).disabled = True
+    test_df = pd.read_csv(config.DATASET_DIR / 'raw/test.csv')
+    lasso.warm_up()
+
+    for enabled in (False, True):
+        metrics.enable(enabled)
+        click.echo(
+            f"timed block, {'enabled' if enabled else 'disabled'}: "
+            f"{_overhead_us(100_000):.2f} us"
+        )
+
+    for batch_size in map(int, batch_sizes.split(',')):
+        metrics.reset()
+        input_df = test_df.sample(n=batch_size, replace=True, random_state=0)
+        start = time.perf_counter()
+        for _ in range(repeats):
+            lasso.predict_frame(input_df)
+        total = (time.perf_counter() - start) / repeats * 1e3
+
+        click.echo(f"\n{batch_size} rows, {total:.2f} ms per prediction")
+        for stage in sorted(metrics._histograms):  # pylint: disable=protected-access
+            stage_histogram = metrics.histogram(stage)
+            click.echo(
+                f"{stage:>42} {stage_histogram.sum / stage_histogram.count * 1e3:>8.3f} ms"
+            )
+
+
+if __name__ == '__main__':
+    # pylint: disable=no-value-for-parameter
+    main()
@@ -0,0 +1,58 @@
+"""
+Benchmark the peak memory and the time of training the lasso pipeline on
+the whole file in memory, against streaming it in chunks over two passes.
+Every training runs in its own process, for its peak memory.
+"""
+import tempfile
+import time
+import click
+
+from harness import read_training_data, run_measured, training_files
+
+
+def _train(input_path, mode, chunksize, epochs):
+    """Train on a preprocessed file, printing the seconds"""
+    # pylint: disable=import-outside-toplevel
+    from houses_pipeline.modelling.train_lasso import create_lasso_pipeline
+    from houses_pipeline.modelling.train_streaming import train_streaming
+
+    start = time.perf_counter()
+    if mode == 'streaming':
+        train_streaming(input_path, chunksize=chunksize, epochs=epochs, alpha=0.01)
+    else:
+        X, y = read_training_data(input_path)
+        create_lasso_pipeline(0.05, X, alpha=0.01, model_seed=1).fit(X, y)
+    # the logs go to the standard output too
+    print(f'seconds={time.perf_counter() - start}')
+
+
+@click.command()
+@click.option('--rows', 'rows_levels', default="300000,1000000", help="Comma separated file sizes")
+@click.option('--chunksize', default=100_000, help="Rows per chunk of the streaming training")
+@click.option('--epochs', default=3, help="Epochs of the streaming training")
+@click.option('--train', 'train_input', default=None, hidden=True)
+@click.option('--mode', default='streaming', hidden=True)
+def main(rows_levels, chunksize, epochs, train_input, mode):
+    """Report the seconds and the peak MB per file size and training mode"""
+    if train_input:
+        _train(train_input, mode, chunksize, epochs)
+        return
+
+    click.echo(f"{'rows':>8} {'mode':>10} {'seconds':>8} {'peak MB':>8}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for rows, input_path in training_files(tmp_dir, rows_levels):
+            for training in ('in memory', 'streaming'):
+                output, peak = run_measured([
+                    __file__, '--train', str(input_path), '--mode', training.replace(' ', '_'),
+                    '--chunksize', str(chunksize), '--epochs', str(epochs)
+                ])
+                seconds = [line for line in output.splitlines() if line.startswith('seconds=')]
+                click.echo(
+                    f"{rows:>8} {training:>10} {float(seconds[-1].split('=')[1]):>8.1f} "
+                    f"{peak:>8.0f}"
+                )
+
+
+if __name__ == '__main__':
+    # pylint: disable=no-value-for-parameter
+    main()
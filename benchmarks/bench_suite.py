@@ -0,0 +1,211 @@
+"""
+Benchmark the pipeline end to end and each transformer on the training
+data scaled up synthetically, saving the times and peak memory as JSON and
+failing when they regress past a tolerance relative to a saved baseline.
+
+    python benchmarks/bench_suite.py --update_baseline   # on the base commit
+    python benchmarks/bench_suite.py                     # on the change
+"""
+import json
+import logging
+import pathlib
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+import warnings
+import numpy as np
+import pandas as pd
+import click
+from click.testing import CliRunner
+from sklearn.impute import SimpleImputer
+
+from houses_pipeline import __version__, constants, save_model
+from houses_pipeline.config import config
+from houses_pipeline.modelling.train_lasso import create_lasso_pipeline
+from houses_pipeline.predict import lasso
+from houses_pipeline.preprocess.__main__ import main as preprocess_main
+from houses_pipeline.preprocess.core import COLUMNS_TO_IMPUTE
+from houses_pipeline.preprocess.core import drop_useless_columns, fit_preprocess_pipeline
+from houses_pipeline.transformers import Pandalizer, RareCategoriesReplacer
+from houses_pipeline.transformers import RedundantColumnsRemover
+from houses_pipeline.validation import validate_inputs
+
+
+RESULTS_DIR = pathlib.Path(__file__).resolve().parent / 'results'
+
+
+def scale_up(raw_df: pd.DataFrame, rows: int, seed: int = 0) -> pd.DataFrame:
+    """
+    Sample rows with replacement, jittering the numbers by up to 10% (so
+    that they keep their sign and missing values) and numbering the ids
+    """
+    rng = np.random.default_rng(seed)
+    scaled_df = raw_df.sample(n=rows, replace=True, random_state=seed).reset_index(drop=True)
+    for column in scaled_df.columns.drop('Id'):
+        if scaled_df[column].dtype.kind not in 'if':
+            continue
+        jittered = scaled_df[column] * rng.uniform(0.9, 1.1, rows)
+        if scaled_df[column].dtype.kind == 'i':
+            jittered = jittered.round().astype(scaled_df[column].dtype)
+        scaled_df[column] = jittered
+    scaled_df['Id'] = np.arange(1, rows + 1)
+    return scaled_df
+
+
+def _cases(raw_df, rows, cli_rows, train_rows, batch_rows, work_dir):
+    """The benchmarked calls by name, each prepared outside of its timing"""
+    scaled_df = scale_up(raw_df, rows)
+    features_df = scaled_df.drop(columns=[constants.TARGET_VARIABLE_NAME])
+    kept_df = drop_useless_columns(features_df)
+    imputed_columns = np.intersect1d(COLUMNS_TO_IMPUTE, kept_df.columns)
+    categoricals = kept_df[imputed_columns]
+    imputer = Pandalizer(
+        SimpleImputer(strategy='constant', fill_value='Missing'), copy='shallow'
+    ).fit(categoricals, columns=imputed_columns)
+    imputed_categoricals = imputer.transform(categoricals)
+
+    cli_input = work_dir / 'raw.csv'
+    scaled_df.head(cli_rows).to_csv(cli_input, index=False)
+
+    train_df = scaled_df.head(train_rows)
+    preprocessor = fit_preprocess_pipeline(train_df)
+    X_train = preprocessor.transform(train_df).drop(
+        columns=[constants.TARGET_VARIABLE_NAME, 'Id']
+    )
+    y_train = train_df[constants.TARGET_VARIABLE_NAME]
+    model = create_lasso_pipeline(0.05, X_train, alpha=0.05, model_seed=1).fit(X_train, y_train)
+
+    # serve the fitted artifacts to lasso.predict_frame from the work directory
+    for name, artifact in (
+        (config.PREPROCESS_SAVE_FILENAME, preprocessor), (config.LASSO_SAVE_FILENAME, model)
+    ):
+        save_model(artifact, model_name=f"{name}_{__version__}.pkl", directory=work_dir)
+    lasso.registry.directory = work_dir
+    lasso.warm_up()
+
+    single_rows = [features_df.iloc[[row]] for row in range(100)]
+    batch_df = features_df.head(batch_rows)
+
+    return {
+        'pandalizer_impute': lambda: imputer.transform(categoricals),
+        'rare_categories_replacer': lambda: RareCategoriesReplacer(0.05).fit_transform(
+            imputed_categoricals
+        ),
+        'redundant_columns_remover': lambda: RedundantColumnsRemover().fit(
+            features_df
+        ).transform(features_df),
+        'validate_inputs': lambda: validate_inputs(features_df),
+        'preprocess_cli': lambda: CliRunner().invoke(
+            preprocess_main, [str(cli_input), str(work_dir / 'processed.csv')],
+            catch_exceptions=False
+        ),
+        'train_lasso': lambda: create_lasso_pipeline(
+            0.05, X_train, alpha=0.05, model_seed=1
+        ).fit(X_train, y_train),
+        'predict_single_x100': lambda: [lasso.predict_frame(row) for row in single_rows],
+        'predict_batch': lambda: lasso.predict_frame(batch_df),
+        'predict_single_x100_compiled': lambda: [
+            lasso.predict_frame(row, mode='compiled') for row in single_rows
+        ],
+        'predict_batch_compiled': lambda: lasso.predict_frame(batch_df, mode='compiled'),
+    }
+
+
+def _measure(func, repeats):
+    """The best time of the repeats, and the peak memory traced in one more"""
+    seconds = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        seconds.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'seconds': min(seconds), 'peak_mb': peak / 1e6}
+
+
+def compare(results, baseline, time_tolerance, memory_tolerance) -> list:
+    """The regressions of the results over the baseline, as messages"""
+    regressions = []
+    for case, measures in results['cases'].items():
+        base = baseline['cases'].get(case)
+        if base is None:
+            continue
+        for measure, tolerance in (('seconds', time_tolerance), ('peak_mb', memory_tolerance)):
+            # ignore the noise of the measures close to nothing
+            floor = 1e-3 if measure == 'seconds' else 1.0
+            if measures[measure] > max(base[measure], floor) * (1 + tolerance):
+                regressions.append(
+                    f"{case} {measure}: {base[measure]:.4g} -> {measures[measure]:.4g} "
+                    f"(+{measures[measure] / max(base[measure], floor) - 1:.0%})"
+                )
+    return regressions
+
+
+@click.command()
+@click.option('--rows', default=1_000_000, help="Rows of the scaled up data")
+@click.option('--cli_rows', default=100_000, help="Rows preprocessed through the CLI")
+@click.option('--train_rows', default=100_000, help="Rows to train the lasso on")
+@click.option('--batch_rows', default=100_000, help="Rows of the batch prediction")
+@click.option('--repeats', default=3, help="Timed runs per case, the best one is kept")
+@click.option('--cases', 'selected', default=None, help="Comma separated cases to run")
+@click.option('--output', type=click.Path(), default=str(RESULTS_DIR / 'latest.json'))
+@click.option('--baseline', type=click.Path(), default=str(RESULTS_DIR / 'baseline.json'))
+@click.option('--update_baseline', is_flag=True, help="Save the results as the baseline")
+@click.option('--time_tolerance', default=0.25, help="Allowed relative slow down")
+@click.option('--memory_tolerance', default=0.10, help="Allowed relative memory growth")
+# pylint: disable=too-many-arguments,too-many-locals
+def main(rows, cli_rows, train_rows, batch_rows, repeats, selected, output,
+         baseline, update_baseline, time_tolerance, memory_tolerance):
+    """Run the benchmark suite and check it against the baseline"""
+    logging.disable(logging.INFO)
+    warnings.simplefilter('ignore')
+    raw_df = pd.read_csv(config.DATASET_DIR / 'raw/train.csv')
+    settings = {
+        'rows': rows, 'cli_rows': cli_rows, 'train_rows': train_rows,
+        'batch_rows': batch_rows,
+    }
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        cases = _cases(raw_df, rows, cli_rows, train_rows, batch_rows, pathlib.Path(work_dir))
+        if selected:
+            cases = {name: cases[name] for name in selected.split(',')}
+
+        results = {
+            'settings': settings,
+            'repeats': repeats,
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'cases': {},
+        }
+        click.echo(f"{'case':>28} {'seconds':>9} {'peak MB':>9}")
+        for name, func in cases.items():
+            measures = _measure(func, repeats)
+            results['cases'][name] = measures
+            click.echo(f"{name:>28} {measures['seconds']:>9.3f} {measures['peak_mb']:>9.1f}")
+
+    for path in [output] + ([baseline] if update_baseline else []):
+        pathlib.Path(path).parent.mkdir(parents=True, exist_ok=True)
+        pathlib.Path(path).write_text(json.dumps(results, indent=2), encoding='utf-8')
+    if update_baseline or not pathlib.Path(baseline).exists():
+        return
+
+    saved = json.loads(pathlib.Path(baseline).read_text(encoding='utf-8'))
+    if saved['settings'] != settings:
+        click.echo(f"Not comparing with a baseline of other settings {saved['settings']}")
+        return
+    regressions = compare(results, saved, time_tolerance, memory_tolerance)
+    for regression in regressions:
+        click.echo(f"REGRESSION {regression}", err=True)
+    if regressions:
+        sys.exit(1)
+    click.echo("No regression over the baseline")
+
+
+if __name__ == '__main__':
+    # pylint: disable=no-value-for-parameter
+    main()
@@ -0,0 +1,61 @@
+"""
+Benchmark fitting the lasso pipeline with and without the transform cache:
+refitting the column transformations, caching them on a first run, and
+reusing them on a later run which only changes the alpha
+"""
+import tempfile
+import time
+import warnings
+from pathlib import Path
+import numpy as np
+import click
+from sklearn.exceptions import ConvergenceWarning
+
+from houses_pipeline import constants
+from houses_pipeline.config import config
+from houses_pipeline.io import read_frame, write_frame
+from houses_pipeline.modelling.train_lasso import create_lasso_pipeline
+from houses_pipeline.modelling.train_lasso import fit_lasso_pipeline, read_training_frame
+from houses_pipeline.modelling.transform_cache import TransformCache
+from houses_pipeline.utils import file_digest
+from houses_pipeline.preprocess.core import fit_preprocess_pipeline
+from houses_pipeline.synthetic.core import HousesGenerator
+
+
+@click.command()
+@click.option('--rows', default=200_000, help="Rows of the synthetic training data")
+def main(rows):
+    """Report the seconds of fitting the pipeline per cache state"""
+    warnings.simplefilter('ignore', ConvergenceWarning)
+    generator = HousesGenerator(seed=0).fit(read_frame(config.DATASET_DIR / 'raw/train.csv'))
+    houses_df = generator.sample(rows, np.random.default_rng(0))
+    houses_df = fit_preprocess_pipeline(houses_df).transform(houses_df)
+
+    click.echo(f"{'run':>10} {'seconds':>8}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        input_path = Path(tmp_dir) / 'train.parquet'
+        write_frame(houses_df, input_path)
+        training_df = read_training_frame(input_path)
+        X_train = training_df.drop(columns=constants.TARGET_VARIABLE_NAME)
+        y_train = training_df[constants.TARGET_VARIABLE_NAME]
+        cache = TransformCache(Path(tmp_dir) / 'cache')
+
+        for run, alpha, use_cache in (
+            ('no cache', 0.05, False), ('cold', 0.05, True), ('warm', 0.1, True)
+        ):
+            start = time.perf_counter()
+            pipeline = create_lasso_pipeline(0.05, X_train, alpha, model_seed=1)
+            key = None
+            if use_cache:
+                key = cache.key(
+                    file_digest(input_path), {'split_seed': 1},
+                    pipeline.named_steps['column_transformations']
+                )
+            fit_lasso_pipeline(pipeline, X_train, y_train, cache if use_cache else None, key)
+            click.echo(f"{run:>10} {time.perf_counter() - start:>8.2f}")
+        click.echo(f"cache: {cache.stats()['bytes'] / 1e6:.1f} MB")
+
+
+if __name__ == '__main__':
+    # pylint: disable=no-value-for-parameter
+    main()
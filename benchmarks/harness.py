@@ -0,0 +1,99 @@
+"""
+Helpers shared by the benchmarks: running the API server in a subprocess to
+load test, and running the trainings in their own processes for their peak
+memory, on synthetic training files
+"""
+import contextlib
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+import warnings
+from pathlib import Path
+
+from houses_api.api.config import PACKAGE_ROOT, TEST_DATASET_PATH
+
+
+def listing_bodies(rows: int = 200) -> list:
+    """The JSON bodies of requests of a single listing of the test dataset"""
+    # pylint: disable=import-outside-toplevel
+    import pandas as pd
+
+    listings = pd.read_csv(TEST_DATASET_PATH).head(rows)
+    return [
+        json.dumps([record]).encode()
+        for record in json.loads(listings.to_json(orient='records'))
+    ]
+
+
+def free_port() -> int:
+    """A free local port for the server"""
+    with socket.socket() as free_socket:
+        free_socket.bind(('127.0.0.1', 0))
+        return free_socket.getsockname()[1]
+
+
+@contextlib.contextmanager
+def running_server(command: list, env: dict, port: int):
+    """Run a server in a subprocess until done, once it is healthy"""
+    server = subprocess.Popen(
+        command, cwd=PACKAGE_ROOT, env=os.environ | env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        for _ in range(600):
+            try:
+                urllib.request.urlopen(f'http://127.0.0.1:{port}/health')
+                break
+            except OSError:
+                time.sleep(0.1)
+        else:
+            raise RuntimeError("The API server did not start")
+        yield f'http://127.0.0.1:{port}'
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def run_measured(args: list):
+    """Run a python command, returning its output and peak RSS in MB"""
+    # this process stays small, as the peak RSS of a child starts from it
+    with subprocess.Popen(
+        [sys.executable, *args], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True
+    ) as process:
+        output = process.stdout.read()
+        _, status, usage = os.wait4(process.pid, 0)
+    if os.waitstatus_to_exitcode(status):
+        raise RuntimeError(f"Failed: {args}")
+    # the maximum resident set size is in kilobytes on linux
+    return output, usage.ru_maxrss / 1024
+
+
+def training_files(tmp_dir, rows_levels: str):
+    """Generate and preprocess a synthetic file per size, yielding its rows and path"""
+    raw_path = Path(tmp_dir) / 'houses.csv'
+    input_path = Path(tmp_dir) / 'houses.parquet'
+    for rows in map(int, rows_levels.split(',')):
+        run_measured(['-m', 'houses_pipeline.synthetic', str(raw_path), '--rows', str(rows)])
+        run_measured([
+            '-m', 'houses_pipeline.preprocess', str(raw_path), str(input_path),
+            '--chunksize', '100000'
+        ])
+        yield rows, input_path
+
+
+def read_training_data(input_path):
+    """The features and the target of a preprocessed file, as the training reads them"""
+    # pylint: disable=import-outside-toplevel
+    from sklearn.exceptions import ConvergenceWarning
+    from houses_pipeline import constants
+    from houses_pipeline.modelling.train_lasso import read_training_frame
+
+    warnings.simplefilter('ignore', ConvergenceWarning)
+    houses_df = read_training_frame(input_path)
+    X = houses_df.drop(columns=constants.TARGET_VARIABLE_NAME)
+    y = houses_df.pop(constants.TARGET_VARIABLE_NAME)
+    return X, y
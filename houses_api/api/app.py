@@ -1,7 +1,14 @@
 """The create app module for creating a flask api application"""
+import functools
+
 from flask import Flask
 
 
+from houses_pipeline import metrics
+from houses_pipeline.predict import lasso
+from houses_pipeline.predict.cache import PredictionCache, SqliteStore
+
+from ..api.batching import MicroBatcher
 from ..api.controller import predictions_app
 from ..api.config import get_logger
 
@@ -16,6 +23,52 @@ def create_app(*, config_object) -> Flask:
     flask_app.config.from_object(config_object)
 
     flask_app.register_blueprint(predictions_app)
+    metrics.enable(flask_app.config.get('METRICS', False))
+
+    if flask_app.config.get('PREDICTION_CACHE'):
+        cache_path = flask_app.config.get('PREDICTION_CACHE_PATH')
+        ttl = flask_app.config['PREDICTION_CACHE_TTL']
+        flask_app.extensions['prediction_cache'] = PredictionCache(
+            capacity=flask_app.config['PREDICTION_CACHE_SIZE'], ttl=ttl,
+            store=SqliteStore(cache_path, ttl=ttl) if cache_path else None
+        )
+
+    if flask_app.config.get('PRELOAD_MODELS'):
+        lasso.warm_up()
+
+    # preforking servers start them in each worker instead, as threads
+    # running in the parent while it forks could deadlock the children
+    if flask_app.config.get('BACKGROUND_THREADS'):
+        start_background_threads(flask_app)
     _logger.debug("Application instance created")
 
     return flask_app
+
+
+def start_background_threads(flask_app: Flask):
+    """
+    Start the micro-batching and model reloading threads of the app. Threads
+    do not survive a fork, so prefork servers call this in each worker.
+    """
+    if flask_app.config.get('MICRO_BATCHING'):
+        flask_app.extensions['micro_batcher'] = MicroBatcher(
+            functools.partial(
+                lasso.predict_frame,
+                cache=flask_app.extensions.get('prediction_cache')
+            ),
+            max_batch_size=flask_app.config['MAX_BATCH_SIZE'],
+            max_wait_ms=flask_app.config['MAX_BATCH_WAIT_MS']
+        )
+
+    # hot swap the models dropped in the models directory
+    reload_interval = flask_app.config.get('MODEL_RELOAD_INTERVAL')
+    if reload_interval:
+        lasso.registry.watch(reload_interval)
+
+
+def stop_background_threads(flask_app: Flask):
+    """Score the queued requests and stop the background threads of the app"""
+    micro_batcher = flask_app.extensions.pop('micro_batcher', None)
+    if micro_batcher is not None:
+        micro_batcher.stop()
+    lasso.registry.stop()
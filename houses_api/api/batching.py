@@ -0,0 +1,136 @@
+"""
+Coalesce concurrent prediction requests into micro-batches, scored by a
+single thread in one vectorized call, with the predictions fanned back out
+to the waiting requests
+"""
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+from .config import get_logger
+
+_logger = get_logger(logger_name=__name__)
+
+# put in the queue to stop the scoring thread
+_STOP = object()
+
+
+class MicroBatcher:
+    """
+    Queue dataframes to score, scoring them in batches of up to
+    `max_batch_size` rows, waiting at most `max_wait_ms` for a batch to fill
+    """
+
+    def __init__(
+        self,
+        score: Callable[[pd.DataFrame], pd.Series],
+        max_batch_size: int = 256,
+        max_wait_ms: float = 5.0
+    ):
+        self.score = score
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1e3
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(
+            target=self._run, name='micro-batcher', daemon=True
+        )
+        self._thread.start()
+
+
+    def submit(self, input_df: pd.DataFrame) -> Future:
+        """
+        Queue a dataframe, returning the future of its predictions (indexed
+        by the rows which passed validation, as with `lasso.predict_frame`)
+        """
+        future = Future()
+        self._queue.put((input_df, future))
+        return future
+
+
+    def stop(self):
+        """Score the queued requests and stop the scoring thread"""
+        self._queue.put(_STOP)
+        self._thread.join()
+
+
+    def _next_batch(self) -> list:
+        """Block for a request, then gather more until the batch is full or due"""
+        first = self._queue.get()
+        if first is _STOP:
+            return None
+        batch, rows = [first], len(first[0])
+        deadline = time.perf_counter() + self.max_wait
+        while rows < self.max_batch_size:
+            timeout = deadline - time.perf_counter()
+            if timeout <= 0:
+                break
+            try:
+                request = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            if request is _STOP:
+                # score what is gathered, then stop
+                self._queue.put(_STOP)
+                break
+            batch.append(request)
+            rows += len(request[0])
+        return batch
+
+
+    def _run(self):
+        """Score batches until stopped"""
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            try:
+                self._score_batch(batch)
+            except Exception:  # pylint: disable=broad-except
+                # a failing request should not fail the others of its batch
+                _logger.exception("Scoring a batch of %d requests failed", len(batch))
+                for input_df, future in batch:
+                    self._score_one(input_df, future)
+
+
+    def _score_batch(self, batch: list):
+        """
+        Score the requests of a batch in one call per set of columns, as a
+        request lacking some columns would otherwise be scored with NaN in them
+        """
+        groups = {}
+        for request in batch:
+            groups.setdefault(tuple(request[0].columns), []).append(request)
+        for group in groups.values():
+            self._score_group(group)
+
+
+    def _score_group(self, batch: list):
+        """Score requests of the same columns in one call and split the predictions"""
+        frames = [input_df for input_df, _ in batch]
+        predictions = self.score(pd.concat(frames, ignore_index=True))
+
+        # the predictions are indexed by the (kept) rows of the batch
+        ends = np.cumsum([len(input_df) for input_df in frames])
+        bounds = np.searchsorted(predictions.index.to_numpy(), ends)
+        start = 0
+        for (input_df, future), (offset, end) in zip(
+            batch, zip(np.append(0, ends[:-1]), bounds)
+        ):
+            own = predictions.iloc[start:end]
+            # back to the index of the request's own rows
+            own.index = input_df.index[own.index.to_numpy() - offset]
+            future.set_result(own)
+            start = end
+
+
+    def _score_one(self, input_df: pd.DataFrame, future: Future):
+        """Score a request on its own"""
+        try:
+            future.set_result(self.score(input_df))
+        except Exception as error:  # pylint: disable=broad-except
+            future.set_exception(error)
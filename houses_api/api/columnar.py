@@ -0,0 +1,67 @@
+"""
+Decode column oriented prediction requests, given either as JSON columns
+({"column": [values, ...]}), Arrow IPC or Parquet bytes, straight into a
+dataframe without going through a dict per row
+"""
+import io
+
+import pandas as pd
+
+from houses_pipeline.io import arrow_to_pandas
+
+from .validation import InvalidInputError
+
+
+JSON_CONTENT_TYPE = 'application/json'
+ARROW_STREAM_CONTENT_TYPE = 'application/vnd.apache.arrow.stream'
+ARROW_FILE_CONTENT_TYPE = 'application/vnd.apache.arrow.file'
+PARQUET_CONTENT_TYPES = ('application/vnd.apache.parquet', 'application/x-parquet')
+
+
+def _json_columns_to_frame(payload) -> pd.DataFrame:
+    """Build a dataframe from JSON columns of equal length"""
+    if not isinstance(payload, dict) or not all(
+        isinstance(values, list) for values in payload.values()
+    ):
+        raise InvalidInputError("Expected an object mapping columns to lists of values")
+    if len({len(values) for values in payload.values()}) > 1:
+        raise InvalidInputError("All the columns should have the same length")
+    return pd.DataFrame(payload)
+
+
+def _arrow_to_frame(content_type: str, body: bytes) -> pd.DataFrame:
+    """Read Arrow IPC or Parquet bytes into a dataframe"""
+    try:
+        # pylint: disable=import-outside-toplevel
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError as error:
+        raise InvalidInputError(
+            "Arrow and Parquet requests require pyarrow to be installed"
+        ) from error
+
+    try:
+        if content_type == ARROW_STREAM_CONTENT_TYPE:
+            table = pyarrow.ipc.open_stream(body).read_all()
+        elif content_type == ARROW_FILE_CONTENT_TYPE:
+            table = pyarrow.ipc.open_file(body).read_all()
+        else:
+            table = pyarrow.parquet.read_table(io.BytesIO(body))
+    except pyarrow.ArrowException as error:
+        raise InvalidInputError(f"Could not read the {content_type} body: {error}") from error
+    frame = arrow_to_pandas(table)
+    # rows are reported by their position, not by an index in the metadata
+    frame.index = pd.RangeIndex(len(frame))
+    return frame
+
+
+def read_columnar_request(request) -> pd.DataFrame:
+    """Decode a column oriented request by its content type"""
+    content_type = request.mimetype
+    if content_type == JSON_CONTENT_TYPE:
+        return _json_columns_to_frame(request.get_json())
+    if content_type in (ARROW_STREAM_CONTENT_TYPE, ARROW_FILE_CONTENT_TYPE) or \
+            content_type in PARQUET_CONTENT_TYPES:
+        return _arrow_to_frame(content_type, request.get_data())
+    raise InvalidInputError(f"Unsupported content type {content_type}")
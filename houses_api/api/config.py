@@ -5,6 +5,8 @@ import pathlib
 import os
 import sys
 
+from houses_pipeline.config.logging import AsyncQueueHandler
+
 PACKAGE_ROOT = pathlib.Path(__file__).resolve().parent.parent.parent
 
 FORMATTER = logging.Formatter(
@@ -44,15 +46,23 @@ def get_file_handler():
     return file_handler
 
 
+# the handler of every logger of the api, writing in a background thread
+_queue_handler = None
+
+
 def get_logger(*, logger_name):
     """Get logger with prepared handlers."""
+    global _queue_handler  # pylint: disable=global-statement
 
     logger = logging.getLogger(logger_name)
 
     logger.setLevel(logging.INFO)
 
-    logger.addHandler(get_console_handler())
-    logger.addHandler(get_file_handler())
+    if _queue_handler is None:
+        _queue_handler = AsyncQueueHandler(get_console_handler(), get_file_handler())
+    # attach the handler once, however many times the logger is got
+    if _queue_handler not in logger.handlers:
+        logger.addHandler(_queue_handler)
     logger.propagate = False
 
     return logger
@@ -70,6 +80,27 @@ class Config:
     SECRET_KEY = 'this-really-needs-to-be-changed'
     SERVER_PORT = 5000
     UPLOAD_FOLDER = UPLOAD_FOLDER
+    # seconds between checks for new model artifacts, 0 to never reload
+    MODEL_RELOAD_INTERVAL = float(os.environ.get('MODEL_RELOAD_INTERVAL', '0'))
+    # load the models when the app is created instead of on the first request
+    PRELOAD_MODELS = os.environ.get('PRELOAD_MODELS', '1') == '1'
+    # coalesce concurrent prediction requests into micro-batches
+    MICRO_BATCHING = os.environ.get('MICRO_BATCHING', '0') == '1'
+    MAX_BATCH_SIZE = int(os.environ.get('MAX_BATCH_SIZE', '256'))
+    MAX_BATCH_WAIT_MS = float(os.environ.get('MAX_BATCH_WAIT_MS', '5'))
+    # cache the predictions of the listings queried again
+    PREDICTION_CACHE = os.environ.get('PREDICTION_CACHE', '0') == '1'
+    PREDICTION_CACHE_SIZE = int(os.environ.get('PREDICTION_CACHE_SIZE', '100000'))
+    PREDICTION_CACHE_TTL = float(os.environ.get('PREDICTION_CACHE_TTL', '600'))
+    # a sqlite file sharing the cached predictions between the workers
+    PREDICTION_CACHE_PATH = os.environ.get('PREDICTION_CACHE_PATH')
+    # time the stages of the predictions, served at /metrics
+    METRICS = os.environ.get('METRICS', '1') == '1'
+    # the share of the requests whose whole payload is logged
+    LOG_PAYLOAD_SAMPLE_RATE = float(os.environ.get('LOG_PAYLOAD_SAMPLE_RATE', '0'))
+    # start the micro-batching and model reloading threads in create_app,
+    # cleared by the entry points of servers that fork after creating it
+    BACKGROUND_THREADS = True
 
 # xTODO: main configuration, should read from environment or specific yaml files
 # pylint: disable=too-few-public-methods
@@ -80,8 +111,18 @@ class ProductionConfig(Config):
     docker is also introduced
     """
     DEBUG = False
-    SERVER_ADDRESS: os.environ.get('SERVER_ADDRESS', '0.0.0.0')
-    SERVER_PORT: os.environ.get('SERVER_PORT', '5000')
+    SERVER_ADDRESS = os.environ.get('SERVER_ADDRESS', '0.0.0.0')
+    SERVER_PORT = int(os.environ.get('SERVER_PORT', '5000'))
+    # preforked workers and the threads of each, for the gunicorn launcher
+    WORKERS = int(os.environ.get('WEB_CONCURRENCY', str(os.cpu_count() or 1)))
+    THREADS = int(os.environ.get('WORKER_THREADS', '1'))
+    # recycle a worker after about that many requests, 0 to never recycle
+    MAX_REQUESTS = int(os.environ.get('MAX_REQUESTS', '10000'))
+    MAX_REQUESTS_JITTER = int(os.environ.get('MAX_REQUESTS_JITTER', '1000'))
+    # seconds for the workers to finish their requests on SIGTERM
+    GRACEFUL_TIMEOUT = int(os.environ.get('GRACEFUL_TIMEOUT', '30'))
+    # seconds before a silent worker is killed and restarted
+    WORKER_TIMEOUT = int(os.environ.get('WORKER_TIMEOUT', '60'))
 
 # xTODO: main configuration, should read from environment or specific yaml files
 # pylint: disable=too-few-public-methods
@@ -103,3 +144,4 @@ class TestingConfig(Config):
     docker is also introduced
     """
     TESTING = True
+    PRELOAD_MODELS = False
@@ -1,10 +1,18 @@
 """The flask controller module for the houses api server"""
-from flask import Blueprint, request, jsonify
+import random
+import zlib
+
+import pandas as pd
+from flask import Blueprint, request, jsonify, current_app
 
 from houses_pipeline.predict import lasso
 from houses_pipeline import __version__ as _model_version
+from houses_pipeline import constants
+from houses_pipeline import metrics
 from houses_api import __version__ as _api_version
-from houses_api.api.validation import validate_inputs
+from houses_api.api.validation import validate_inputs, validate_columns
+from houses_api.api.validation import InvalidInputError
+from houses_api.api.columnar import read_columnar_request
 
 
 from .config import get_logger
@@ -13,6 +21,23 @@ _logger = get_logger(logger_name=__name__)
 
 predictions_app = Blueprint('predictions_app', __name__)
 
+
+def _log_payload(input_data) -> str:
+    """
+    Log the size and hash of the request payload (the whole payload for a
+    sample of the requests, see LOG_PAYLOAD_SAMPLE_RATE), returning the hash
+    """
+    rows = len(input_data) if isinstance(input_data, list) else 1
+    # a checksum is enough to tell the payloads apart in the logs
+    digest = f'{zlib.crc32(request.get_data()):08x}'
+    sample_rate = current_app.config.get('LOG_PAYLOAD_SAMPLE_RATE')
+    if sample_rate and random.random() < sample_rate:
+        _logger.info("Input %s of %d rows: %s", digest, rows, input_data)
+    else:
+        _logger.info("Input %s of %d rows", digest, rows)
+    return digest
+
+
 @predictions_app.get('/health')
 def get_health():
     """Get whether the api is in good health or is on medications"""
@@ -30,21 +55,92 @@ def version():
     }
 
 
+@predictions_app.get('/metrics')
+def get_metrics():
+    """
+    Return the histograms of the seconds spent in each prediction stage by
+    the worker serving the request, in the Prometheus text format
+    """
+    if not metrics.is_enabled():
+        return "Metrics are disabled", 404
+    return metrics.render_prometheus(), 200, {
+        'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'
+    }
+
+
+@predictions_app.get('/cache/stats')
+def get_cache_stats():
+    """
+    Return the hit, miss and eviction counters of the prediction cache of
+    the worker serving the request
+    """
+    cache = current_app.extensions.get('prediction_cache')
+    if cache is None:
+        return {'enabled': False}
+    return {'enabled': True} | cache.stats()
+
+
 @predictions_app.post("/predict/lasso")
 def produce_lasso_predictions():
     """pass an observation or more and return an array of predictions"""
     input_data = request.get_json()
 
-    _logger.info("Input %s", input_data)
-    input_data, errors = validate_inputs(input_data=input_data)
+    digest = _log_payload(input_data)
+    with metrics.timed('api_validation'):
+        input_data, errors = validate_inputs(input_data=input_data)
 
-    # validate, preprocess and get predictions using the fitted model
-    prediction_results = lasso.predict(input_data=input_data)
-    _logger.info("Outputs: %s", prediction_results)
-    _logger.info(prediction_results)
+    # validate, preprocess and get predictions using the fitted model,
+    # together with the concurrent requests if micro-batching
+    micro_batcher = current_app.extensions.get('micro_batcher')
+    cache = current_app.extensions.get('prediction_cache')
+    if input_data.empty:
+        # every row is invalid, there is nothing to score
+        prediction_results = {'predictions': [], 'version': _model_version}
+    elif micro_batcher is not None:
+        prediction_results = {
+            'predictions': micro_batcher.submit(input_data).result().tolist(),
+            'version': _model_version
+        }
+    else:
+        prediction_results = lasso.predict(input_data=input_data, cache=cache)
+    _logger.info(
+        "Output %s: %d predictions, %d errors", digest,
+        len(prediction_results['predictions']), len(errors or ())
+    )
     return jsonify(prediction_results | {'errors': errors})
 
 
+@predictions_app.post("/predict/lasso/columns")
+def produce_columnar_lasso_predictions():
+    """
+    pass a batch of observations as JSON columns, Arrow IPC or Parquet and
+    return the predictions of the valid rows, with their positions
+    """
+    try:
+        input_df = read_columnar_request(request)
+    except InvalidInputError as error:
+        return jsonify({'errors': str(error)}), 400
+
+    _logger.info("Input of %d rows and %d columns", *input_df.shape)
+    with metrics.timed('api_column_validation'):
+        input_df, keep, errors = validate_columns(input_df)
+    if not keep.all():
+        input_df = input_df[keep]
+
+    # validate, preprocess and score the columns without any per row objects
+    predictions = pd.Series([], dtype=float) if input_df.empty else lasso.predict_frame(
+        input_df, mode=constants.DEFAULT_PREDICT_MODE,
+        cache=current_app.extensions.get('prediction_cache')
+    )
+    _logger.info("Scored %d rows", len(predictions))
+    return jsonify({
+        'predictions': predictions.tolist(),
+        'rows': predictions.index.tolist(),
+        'version': _model_version,
+        'errors': errors or None
+    })
+
+
 # @predictions_app.errorhandler(404)
 # def not_found(error):
 #     resp = make_response(render_template('error.html'), 404)
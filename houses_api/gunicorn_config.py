@@ -0,0 +1,47 @@
+"""
+Gunicorn settings of the production server, read from the environment
+through ProductionConfig. Run from the repository root with
+
+    gunicorn -c houses_api/gunicorn_config.py houses_api.wsgi:application
+"""
+import gc
+
+from houses_api.api.config import ProductionConfig
+
+
+bind = f'{ProductionConfig.SERVER_ADDRESS}:{ProductionConfig.SERVER_PORT}'
+workers = ProductionConfig.WORKERS
+threads = ProductionConfig.THREADS
+worker_class = 'gthread' if threads > 1 else 'sync'
+
+# load the app, and so the models, once in the master before forking, so
+# that the workers share its memory pages
+preload_app = True
+
+# recycle the workers, staggered, to bound any slow growth of their memory
+max_requests = ProductionConfig.MAX_REQUESTS
+max_requests_jitter = ProductionConfig.MAX_REQUESTS_JITTER
+
+# on SIGTERM the workers stop accepting and finish their requests in time
+graceful_timeout = ProductionConfig.GRACEFUL_TIMEOUT
+timeout = ProductionConfig.WORKER_TIMEOUT
+
+
+def when_ready(server):  # pylint: disable=unused-argument
+    """Keep the garbage collector off the preloaded objects, which would
+    otherwise copy their pages into each worker"""
+    gc.freeze()
+
+
+def post_fork(server, worker):  # pylint: disable=unused-argument
+    """Start the background threads of the app in the worker, after the fork"""
+    # pylint: disable=import-outside-toplevel
+    from houses_api.api.app import start_background_threads
+    start_background_threads(worker.app.wsgi())
+
+
+def worker_exit(server, worker):  # pylint: disable=unused-argument
+    """Score the requests queued for micro-batching before exiting"""
+    # pylint: disable=import-outside-toplevel
+    from houses_api.api.app import stop_background_threads
+    stop_background_threads(worker.app.wsgi())
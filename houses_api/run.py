@@ -1,10 +1,18 @@
 """Run the flask api"""
-from .api.app import create_app
+from .api.app import create_app, start_background_threads
 from .api.config import DevelopmentConfig
 
 
-application = create_app(config_object=DevelopmentConfig)
+# pylint: disable=too-few-public-methods
+class ServerConfig(DevelopmentConfig):
+    """The threads are only started when served here, not when preforked"""
+    BACKGROUND_THREADS = False
+
+
+application = create_app(config_object=ServerConfig)
 
 # xTODO: add __init__ in the main api module
 if __name__ == "__main__":
-    application.run()
+    start_background_threads(application)
+    # serve requests in threads, so that they can be micro-batched
+    application.run(threaded=True)
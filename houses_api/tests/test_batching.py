@@ -0,0 +1,95 @@
+"""Test coalescing prediction requests into micro-batches"""
+import json
+
+import pandas as pd
+import pytest
+
+from ..api.app import create_app
+from ..api.batching import MicroBatcher
+from ..api.config import TestingConfig, TEST_DATASET_PATH
+
+
+def _score(input_df):
+    """Double x, dropping the rows with a negative x as validation would"""
+    kept = input_df[input_df['x'] >= 0]
+    return (kept['x'] * 2).rename('prediction')
+
+
+def test_micro_batcher_fans_out_the_predictions_of_a_batch():
+    """Requests scored together get the predictions of their own rows"""
+    batches = []
+
+    def score(input_df):
+        batches.append(len(input_df))
+        return _score(input_df)
+
+    batcher = MicroBatcher(score, max_batch_size=100, max_wait_ms=500)
+    requests = [
+        pd.DataFrame({'x': [1, -1, 3]}, index=[10, 11, 12]),
+        pd.DataFrame({'x': [-2]}),
+        pd.DataFrame({'x': [4, 5]}, index=['a', 'b']),
+    ]
+    futures = [batcher.submit(request) for request in requests]
+    batcher.stop()
+
+    assert batches == [6]
+    for request, future in zip(requests, futures):
+        pd.testing.assert_series_equal(future.result(), _score(request))
+
+
+def test_micro_batcher_isolates_failing_requests():
+    """A request failing to score does not fail the rest of its batch"""
+    def score(input_df):
+        if (input_df['x'] == 13).any():
+            raise ValueError("Unlucky listing")
+        return _score(input_df)
+
+    batcher = MicroBatcher(score, max_batch_size=100, max_wait_ms=500)
+    valid = pd.DataFrame({'x': [1, 2]})
+    futures = [batcher.submit(valid), batcher.submit(pd.DataFrame({'x': [13]}))]
+    batcher.stop()
+
+    pd.testing.assert_series_equal(futures[0].result(), _score(valid))
+    with pytest.raises(ValueError):
+        futures[1].result()
+
+
+def test_micro_batcher_scores_requests_of_other_columns_apart():
+    """Requests lacking a column are not scored with NaN filled in for it"""
+    columns = []
+
+    def score(input_df):
+        columns.append(list(input_df.columns))
+        assert not input_df.isna().any().any()
+        return _score(input_df)
+
+    batcher = MicroBatcher(score, max_batch_size=100, max_wait_ms=500)
+    requests = [
+        pd.DataFrame({'x': [1, 2], 'y': [0, 0]}),
+        pd.DataFrame({'x': [3]}),
+        pd.DataFrame({'x': [4], 'y': [1]}),
+    ]
+    futures = [batcher.submit(request) for request in requests]
+    batcher.stop()
+
+    assert columns == [['x', 'y'], ['x']]
+    for request, future in zip(requests, futures):
+        pd.testing.assert_series_equal(future.result(), _score(request))
+
+
+def test_micro_batched_endpoint_matches_the_direct_one(test_client):
+    """The micro-batched endpoint returns the predictions of the direct one"""
+    class BatchingConfig(TestingConfig):
+        """Testing with micro-batching"""
+        MICRO_BATCHING = True
+
+    app = create_app(config_object=BatchingConfig)
+    records = json.loads(
+        pd.read_csv(TEST_DATASET_PATH).head(5).to_json(orient='records')
+    )
+    with app.test_client() as batching_client:
+        batched = batching_client.post('/predict/lasso', json=records).get_json()
+    app.extensions['micro_batcher'].stop()
+
+    direct = test_client.post('/predict/lasso', json=records).get_json()
+    assert batched == direct
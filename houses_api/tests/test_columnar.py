@@ -0,0 +1,71 @@
+"""Test the column oriented prediction endpoint"""
+import io
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ..api.config import TEST_DATASET_PATH
+
+
+@pytest.fixture(name='listings')
+def fixture_listings():
+    """A few listings of the test dataset, one of them with an invalid area"""
+    listings = pd.read_csv(TEST_DATASET_PATH).head(5)
+    listings['LotArea'] = listings['LotArea'].astype(object)
+    listings.loc[2, 'LotArea'] = 'large'
+    return listings
+
+
+def test_json_columns_match_the_records_endpoint(test_client, listings):
+    """Column oriented JSON is scored like the same rows sent as records"""
+    records = json.loads(listings.to_json(orient='records'))
+    response = test_client.post(
+        '/predict/lasso/columns',
+        json={column: [row[column] for row in records] for column in listings}
+    )
+    assert response.status_code == 200
+    result = response.get_json()
+    assert result['rows'] == [0, 1, 3, 4]
+    assert result['errors'] == {'2': {'LotArea': ['Not a valid integer.']}}
+
+    del records[2]
+    expected = test_client.post('/predict/lasso', json=records).get_json()
+    np.testing.assert_allclose(result['predictions'], expected['predictions'])
+
+
+def test_parquet_body_is_scored(test_client, listings):
+    """Parquet bytes are decoded and validated column by column"""
+    pytest.importorskip('pyarrow')
+    body = io.BytesIO()
+    listings.drop(index=2).astype({'LotArea': int}).to_parquet(body)
+    response = test_client.post(
+        '/predict/lasso/columns', data=body.getvalue(),
+        content_type='application/vnd.apache.parquet'
+    )
+    assert response.status_code == 200
+    assert response.get_json()['rows'] == [0, 1, 2, 3]
+
+
+def test_malformed_columns_are_rejected(test_client):
+    """Columns of different lengths are a bad request"""
+    response = test_client.post(
+        '/predict/lasso/columns', json={'LotArea': [1, 2], 'Street': ['Pave']}
+    )
+    assert response.status_code == 400
+
+
+def test_requests_without_valid_rows_score_nothing(test_client, listings):
+    """Requests whose every row is invalid are answered without the model"""
+    invalid = listings.iloc[[2]]
+    records = json.loads(invalid.to_json(orient='records'))
+    response = test_client.post('/predict/lasso', json=records)
+    assert response.status_code == 200
+    assert response.get_json()['predictions'] == []
+
+    response = test_client.post(
+        '/predict/lasso/columns', json={column: [records[0][column]] for column in invalid}
+    )
+    assert response.status_code == 200
+    assert response.get_json()['rows'] == []
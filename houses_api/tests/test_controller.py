@@ -4,6 +4,7 @@ import json
 import math
 import pandas as pd
 from houses_pipeline import __version__ as _model_version
+from houses_pipeline.predict.cache import PredictionCache
 from .. import __version__ as _api_version
 
 from ..api.config import get_logger
@@ -73,3 +74,30 @@ def test_prediction_endpoint_returns_prediction(test_client):
     response_version = response_json['version']
     assert math.ceil(prediction[0]) == 117205
     assert response_version == _model_version
+
+
+def test_cache_stats_endpoint_counts_hits(test_client):
+    """Predicting the same listings again hits the prediction cache"""
+    test_client.application.extensions['prediction_cache'] = PredictionCache()
+    records = json.loads(
+        pd.read_csv(TEST_DATASET_PATH).head(3).to_json(orient='records')
+    )
+    first = test_client.post('/predict/lasso', json=records).get_json()
+    second = test_client.post('/predict/lasso', json=records).get_json()
+
+    stats = test_client.get('/cache/stats').get_json()
+    assert second == first
+    assert (stats['hits'], stats['misses']) == (3, 3)
+
+
+def test_metrics_endpoint_serves_the_stage_histograms(test_client):
+    """The stages of a prediction are served in the Prometheus format"""
+    records = json.loads(
+        pd.read_csv(TEST_DATASET_PATH).head(3).to_json(orient='records')
+    )
+    test_client.post('/predict/lasso', json=records)
+
+    response = test_client.get('/metrics')
+    assert response.mimetype == 'text/plain'
+    for stage in ('api_validation', 'validate_inputs', 'preprocess.drop_useless_columns'):
+        assert f'houses_stage_seconds_count{{stage="{stage}"}}' in response.text
@@ -0,0 +1,77 @@
+"""Test the vectorized schema validation against marshmallow itself"""
+import copy
+import json
+
+import pandas as pd
+import pytest
+from marshmallow import Schema, fields, validate, ValidationError
+
+from ..api.config import TEST_DATASET_PATH
+from ..api.validation import HouseDataRequestSchema, field_table, validate_columns
+from ..api.validation import SYNTAX_ERROR_FIELD_MAP, SMALL_BATCH_ROWS
+from ..api.validation import validate_inputs
+
+
+def _marshmallow_errors(schema, records):
+    """The errors of loading the records with marshmallow"""
+    try:
+        schema.load(records)
+    except ValidationError as error:
+        return error.messages
+    return None
+
+
+@pytest.mark.parametrize('rows', [SMALL_BATCH_ROWS, 50])
+def test_validate_inputs_reports_the_marshmallow_errors(rows):
+    """Small and large batches keep and report the rows marshmallow does"""
+    records = json.loads(
+        pd.read_csv(TEST_DATASET_PATH).head(rows).to_json(orient='records')
+    )
+    records[0]['LotArea'] = 'large'
+    records[1]['LotFrontage'] = True
+    records[2]['Street'] = 3
+    records[3]['GrLivArea'] = '1200'
+    records[4]['Street'] = None
+    records[5]['Unknown'] = 1
+    del records[6]['Alley']
+    records[7] = 'not a listing'
+
+    renamed = copy.deepcopy(records)
+    for record in renamed[:7] + renamed[8:]:
+        for key, name in SYNTAX_ERROR_FIELD_MAP.items():
+            record[name] = record.pop(key)
+    expected = _marshmallow_errors(HouseDataRequestSchema(many=True), renamed)
+
+    validated, errors = validate_inputs(records)
+    assert errors == expected
+    assert len(validated) == len(records) - len(expected)
+    assert validated.loc[3, 'GrLivArea'] == 1200
+    assert 6 in validated.index
+
+
+def test_column_validation_applies_the_field_validators():
+    """Choices and ranges are validated with the messages of the validators"""
+    class ListingSchema(Schema):
+        """A schema with validators on its fields"""
+        Street = fields.Str(validate=validate.OneOf(['Pave', 'Grvl']))
+        LotArea = fields.Integer(validate=[validate.Range(min=1), validate.Range(max=10)])
+
+    columns = pd.DataFrame({
+        'Street': ['Pave', 'Dirt', 'Grvl', None],
+        'LotArea': [5, 0, 11, 3],
+    })
+    _, keep, errors = validate_columns(columns, fields_by_column=field_table(ListingSchema()))
+
+    expected = _marshmallow_errors(
+        ListingSchema(many=True), columns.to_dict(orient='records')
+    )
+    assert errors == expected
+    assert keep.tolist() == [True, False, False, False]
+
+
+@pytest.mark.parametrize('input_data', [{'LotArea': 1}, 'listing'])
+def test_validate_inputs_rejects_non_lists(input_data):
+    """Inputs which are not lists of rows are invalid as a whole"""
+    validated, errors = validate_inputs(input_data)
+    assert validated.empty
+    assert errors == _marshmallow_errors(HouseDataRequestSchema(many=True), input_data)
@@ -0,0 +1,76 @@
+"""Test serving the api with preforked gunicorn workers"""
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+import pandas as pd
+import pytest
+
+from ..api.config import PACKAGE_ROOT, TEST_DATASET_PATH
+
+pytest.importorskip('gunicorn')
+
+
+def _free_port() -> int:
+    """A free local port for the server"""
+    with socket.socket() as free_socket:
+        free_socket.bind(('127.0.0.1', 0))
+        return free_socket.getsockname()[1]
+
+
+def test_preloaded_app_starts_no_threads_before_the_fork():
+    """The app gunicorn preloads in its master leaves the threads to post_fork"""
+    env = os.environ | {'MICRO_BATCHING': '1', 'MODEL_RELOAD_INTERVAL': '1'}
+    script = (
+        'import sys\n'
+        'from houses_api.wsgi import application\n'
+        'from houses_pipeline.predict import lasso\n'
+        "print('micro_batcher' in application.extensions, lasso.registry._watcher,"
+        " file=sys.stderr)"
+    )
+    output = subprocess.run(
+        [sys.executable, '-c', script], cwd=PACKAGE_ROOT, env=env,
+        capture_output=True, text=True, check=True
+    ).stderr
+
+    assert output.split() == ['False', 'None']
+
+
+def test_gunicorn_serves_predictions_and_drains_on_sigterm():
+    """Preforked micro-batching workers predict and exit cleanly on SIGTERM"""
+    port = _free_port()
+    env = os.environ | {
+        'SERVER_ADDRESS': '127.0.0.1', 'SERVER_PORT': str(port),
+        'WEB_CONCURRENCY': '2', 'WORKER_THREADS': '2', 'MICRO_BATCHING': '1',
+    }
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'houses_api/gunicorn_config.py',
+         'houses_api.wsgi:application'],
+        cwd=PACKAGE_ROOT, env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        for _ in range(300):
+            try:
+                urllib.request.urlopen(f'http://127.0.0.1:{port}/health')
+                break
+            except OSError:
+                time.sleep(0.1)
+
+        records = json.loads(
+            pd.read_csv(TEST_DATASET_PATH).head(3).to_json(orient='records')
+        )
+        request = urllib.request.Request(
+            f'http://127.0.0.1:{port}/predict/lasso', data=json.dumps(records).encode(),
+            headers={'Content-Type': 'application/json'}
+        )
+        with urllib.request.urlopen(request) as response:
+            assert len(json.load(response)['predictions']) == 3
+    finally:
+        server.send_signal(signal.SIGTERM)
+        assert server.wait(timeout=30) == 0
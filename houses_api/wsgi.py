@@ -0,0 +1,15 @@
+"""The production entry point of the api, served by gunicorn_config.py"""
+from .api.app import create_app
+from .api.config import ProductionConfig
+
+
+# pylint: disable=too-few-public-methods
+class PreforkConfig(ProductionConfig):
+    """
+    The app is created in the gunicorn master before the workers are forked,
+    so its background threads are started in each worker by post_fork
+    """
+    BACKGROUND_THREADS = False
+
+
+application = create_app(config_object=PreforkConfig)
@@ -1,31 +1,74 @@
 """
 The pipeline module containing extract, preprocess and train
 """
+import importlib
+import os
 import pathlib
-import joblib
-from .config.logging import LoggingHandler
-from .config.config import TRAINED_MODELS_DIR
-from .preprocess.core import load_preprocess_pipeline
+import tempfile
 
 
 PACKAGE_ROOT = pathlib.Path(__file__).resolve().parent
 VERSION_PATH = PACKAGE_ROOT / 'VERSION'
 
-# Configure logger for use in package
-logger = LoggingHandler.get_logger(__name__)
+# attributes imported from their (heavy) modules on first access, so that
+# importing the package for its version or a command's --help stays fast
+_LAZY_ATTRIBUTES = {
+    'load_preprocess_pipeline': '.preprocess.core',
+}
 
 # set the version as an importable module
 with open(VERSION_PATH, 'r', encoding='utf-8') as version_file:
     __version__ = version_file.read().strip()
 
 
+def __getattr__(name):
+    """Import the lazy attributes of the package on first access"""
+    if name in _LAZY_ATTRIBUTES:
+        module = importlib.import_module(_LAZY_ATTRIBUTES[name], __name__)
+        return getattr(module, name)
+    if name == 'logger':
+        # configure the logger for use in package, opening its log file
+        # only once it is used
+        # pylint: disable=import-outside-toplevel
+        from .config.logging import LoggingHandler
+        globals()['logger'] = LoggingHandler.get_logger(__name__)
+        return globals()['logger']
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 def load_model(*, model_name):
     """Load a model from our model storage"""
+    # pylint: disable=import-outside-toplevel
+    import joblib
+    from .config.config import TRAINED_MODELS_DIR
 
     file_path = TRAINED_MODELS_DIR / model_name
     return joblib.load(filename=file_path)
 
 
+def save_model(model, *, model_name, directory=None):
+    """
+    Save a model to our model storage, atomically replacing an older one,
+    so that servers memory mapping the older file can keep using it
+    """
+    # pylint: disable=import-outside-toplevel
+    import joblib
+    from .config.config import TRAINED_MODELS_DIR
+
+    file_path = pathlib.Path(directory or TRAINED_MODELS_DIR) / model_name
+    file_descriptor, temporary_path = tempfile.mkstemp(
+        dir=file_path.parent, prefix=f".{model_name}."
+    )
+    os.close(file_descriptor)
+    try:
+        joblib.dump(model, temporary_path)
+        os.replace(temporary_path, file_path)
+    except BaseException:
+        os.unlink(temporary_path)
+        raise
+    return file_path
+
+
 def load_data(*, filename):
     """Load a dataset proxy method"""
     raise NotImplementedError("The loading of the data is not implemented yet")
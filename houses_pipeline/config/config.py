@@ -19,6 +19,21 @@ LOG_DIR = PACKAGE_ROOT / "logs"
 TRAINED_MODELS_DIR = PACKAGE_ROOT / "models"
 DATASET_DIR = PACKAGE_ROOT / "data"
 LASSO_SAVE_FILENAME = 'lasso'
+# the preprocessing pipeline fitted at training time, frozen for serving
+PREPROCESS_SAVE_FILENAME = 'preprocess'
+# the most artifacts (current and old versions) kept loaded in memory
+MODEL_CACHE_SIZE = 4
+# seconds between checks for new artifacts in the models directory
+MODEL_RELOAD_INTERVAL = 5.0
+# the most predictions kept by a prediction cache, and for how many seconds
+PREDICTION_CACHE_SIZE = 100_000
+PREDICTION_CACHE_TTL = 600.0
+# time the stages of the predictions, see houses_pipeline.metrics
+METRICS_ENABLED = True
+# the fitted training transformations and their design matrices, and the
+# most bytes they take before the least recently used ones are evicted
+TRANSFORM_CACHE_DIR = PACKAGE_ROOT / "cache" / "transforms"
+TRANSFORM_CACHE_SIZE = 2 * 1024 ** 3
 
 
 # variables
@@ -1,8 +1,12 @@
 """Configure the logging of the houses pipeline"""
+import atexit
+import os
 import pathlib
 import logging
-from logging.handlers import TimedRotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, TimedRotatingFileHandler
+import queue
 import sys
+import threading
 
 # pylint: disable=cyclic-import
 import houses_pipeline
@@ -22,6 +26,52 @@ FORMATTER = logging.Formatter(
 )
 
 
+class AsyncQueueHandler(QueueHandler):
+    """
+    Hand the records over to a listener thread, which writes them to the
+    handlers, so that logging never blocks on I/O. The message is merged
+    with its arguments before queueing, as the arguments may change later.
+    A forked process (e.g. a server worker) starts a listener of its own.
+    """
+
+    def __init__(self, *handlers: logging.Handler):
+        super().__init__(queue.SimpleQueue())
+        self.handlers = handlers
+        self._listener = None
+        self._pid = None
+        self._lock = threading.Lock()
+        atexit.register(self.stop)
+
+
+    def start(self):
+        """Start the listener of the current process, if not started"""
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            # the queue of the parent process has no listener here
+            self.queue = queue.SimpleQueue()
+            self._listener = QueueListener(
+                self.queue, *self.handlers, respect_handler_level=True
+            )
+            self._listener.start()
+            self._pid = os.getpid()
+
+
+    def stop(self):
+        """Write the queued records and stop the listener"""
+        with self._lock:
+            if self._pid == os.getpid():
+                self._listener.stop()
+            self._listener, self._pid = None, None
+
+
+    def enqueue(self, record: logging.LogRecord):
+        """Queue a record for the listener, starting it when needed"""
+        if self._pid != os.getpid():
+            self.start()
+        self.queue.put_nowait(record)
+
+
 class LoggingHandler:
     """Factory class for creating logging handlers"""
 
@@ -54,15 +104,26 @@ class LoggingHandler:
         return None
 
 
+    # the handler of every logger of the pipeline, created on first use
+    _queue_handler = None
+
     @staticmethod
     def get_logger(logger_name: str):
-        """Get the main logger attaching console and file handling"""
+        """
+        Get the main logger, handing its records to the console and file
+        handlers in a background thread
+        """
         logger = logging.getLogger(logger_name)
         logger.setLevel(logging.DEBUG)
 
-        # attach handlers
-        logger.addHandler(LoggingHandler.__get_file_handler())
-        logger.addHandler(LoggingHandler.__get_console_handler())
+        if LoggingHandler._queue_handler is None:
+            LoggingHandler._queue_handler = AsyncQueueHandler(
+                LoggingHandler.__get_file_handler(),
+                LoggingHandler.__get_console_handler()
+            )
+        # attach the handler once, however many times the logger is got
+        if LoggingHandler._queue_handler not in logger.handlers:
+            logger.addHandler(LoggingHandler._queue_handler)
 
         logger.propagate = False
         return logger
@@ -53,13 +53,52 @@ DEFAULT_PREPROCESS_OUTPUT_PATH = "data/interim/train.csv"
 
 DEFAULT_TRAIN_INPUT_PATH = "data/interim/train.csv"
 
+DEFAULT_PREDICT_CHUNKSIZE = 10_000
+DEFAULT_PREDICT_MODE = "compiled"
+# score through the sklearn pipeline or through the compiled scoring plan
+PREDICT_MODES = ("pipeline", "compiled")
+
+DEFAULT_GENERATE_CHUNKSIZE = 100_000
+
+DEFAULT_PREPROCESS_CHUNKSIZE = 100_000
+# the dtypes the categorical and numerical columns can be read as
+CATEGORICAL_DTYPES = ("object", "category")
+NUMERICAL_DTYPES = ("float64", "float32")
+
 # arguments helps
-INPUT_PATH_HELP = "The path of the csv file to preprocess"
+INPUT_PATH_HELP = "The csv, parquet or feather file to preprocess"
 OUTPUT_PATH_HELP = "Where to store the processed path"
 REDUNDANT_COLUMNS_HELP = """A threshold to use above which to drop drop nan columns"""
 NAN_COLUMNS_THRESHOLD_HELP = """Drop if the column is mostly the same"""
 RARE_CATEGORIES_DROP_THRESHOLD_HELP = "Replace rare categories"
 VERBOSE_HELP = "Whether to print the steps of the pipeline"
+PREDICT_INPUT_PATH_HELP = "The csv, parquet or feather file with the listings to score"
+PREDICT_OUTPUT_PATH_HELP = "The csv, parquet or feather file to write the predictions to"
+CHUNKSIZE_HELP = "How many rows to hold in memory at once"
+PREDICT_MODE_HELP = "Score with the sklearn pipeline or the compiled scoring plan"
+WORKERS_HELP = "How many processes to score row ranges of the file in parallel"
+GENERATE_INPUT_PATH_HELP = "The houses file to fit the synthetic data on"
+GENERATE_ROWS_HELP = "How many synthetic rows to generate"
+SEED_HELP = "The seed of the random generator, for reproducible data"
+TARGET_HELP = "Whether to generate the sale prices too"
+UNSEEN_RATE_HELP = "The share of the rows with a category never seen in training"
+NA_RATE_HELP = "The share of the rows with a missing value the model does not accept"
+NON_POSITIVE_RATE_HELP = "The share of the rows with a non-positive log transformed variable"
+PREPROCESS_CHUNKSIZE_HELP = "Stream the file in chunks of this many rows instead of loading it"
+CATEGORICAL_DTYPE_HELP = "Read the categorical columns as this dtype (streams the file)"
+NUMERICAL_DTYPE_HELP = "Read the numerical columns as this dtype (streams the file)"
+SEARCH_HELP = "Search the alpha (and the rare threshold) and train the best candidate"
+RARE_THRESHOLDS_HELP = "Comma separated rare thresholds to search, one process each"
+N_ALPHAS_HELP = "How many alphas to search along the regularization path"
+N_JOBS_HELP = "Processes (-1 for all cores), up to one per searched threshold or fold"
+CROSS_VALIDATE_HELP = "Cross validate the alphas on k folds of the training rows and train the best"
+N_FOLDS_HELP = "How many folds to cross validate on"
+RESERVOIR_SIZE_HELP = "How many sampled rows to approximate the Yeo-Johnson lambdas on"
+EPOCHS_HELP = "How many passes of gradient descent to make over the file"
+SGD_ALPHA_HELP = "L1 penalty of the gradient descent, on columns scaled to a unit root mean square"
+HOLDOUT_HELP = "The share of the rows held out for evaluating the model"
+TRANSFORM_CACHE_HELP = "Reuse the fitted transformations and design matrix of the same input"
+TRANSFORM_CACHE_DIR_HELP = "The directory of the transform cache"
 
 DROP_COLUMNS = ['GarageYrBlt', 'YrSold', 'Exterior2nd', 'PoolQC']
 
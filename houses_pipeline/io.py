@@ -0,0 +1,216 @@
+"""
+Read and write the datasets passed between the pipeline stages, as CSV or
+as typed columnar Parquet and Feather (Arrow IPC) files. The columnar files
+store their schema, so nothing is re-inferred or re-parsed when reading
+them, and only the requested columns are read. Large files are read and
+written in chunks, so that the memory stays bounded by the chunk size.
+"""
+import pathlib
+from typing import Iterator
+
+import numpy as np
+import pandas as pd
+
+SUPPORTED_FORMATS = ('.csv', '.parquet', '.feather')
+COLUMNAR_FORMATS = ('.parquet', '.feather')
+
+
+def file_format(filepath) -> str:
+    """Get the format of a file by its suffix"""
+    suffix = pathlib.Path(filepath).suffix.lower()
+    if suffix not in SUPPORTED_FORMATS:
+        raise ValueError(
+            f"Unsupported file format {suffix}, use one of {SUPPORTED_FORMATS}"
+        )
+    return suffix
+
+
+def import_pyarrow():
+    """Import pyarrow, which is only required for the columnar files"""
+    try:
+        # pylint: disable=import-outside-toplevel
+        import pyarrow
+        import pyarrow.feather
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError as error:
+        raise ImportError(
+            "Parquet and Feather files require pyarrow to be installed"
+        ) from error
+    return pyarrow
+
+
+def arrow_to_pandas(table) -> pd.DataFrame:
+    """Convert an arrow table or batch, with missing strings as NaN"""
+    chunk = table.to_pandas()
+    # arrow nulls of string columns become None, unlike in read_csv
+    strings = chunk.columns[chunk.dtypes == object]
+    chunk[strings] = chunk[strings].fillna(np.nan)
+    return chunk
+
+
+def read_columns(filepath) -> list:
+    """Read only the column names of a file"""
+    suffix = file_format(filepath)
+    if suffix == '.csv':
+        return list(pd.read_csv(filepath, nrows=0).columns)
+    pyarrow = import_pyarrow()
+    if suffix == '.parquet':
+        return pyarrow.parquet.ParquetFile(filepath).schema_arrow.names
+    with pyarrow.memory_map(str(filepath)) as source:
+        return pyarrow.ipc.open_file(source).schema.names
+
+
+def read_frame(filepath, columns: list = None, memory_map: bool = True) -> pd.DataFrame:
+    """
+    Read a whole file, or only some of its columns. The columnar files are
+    memory mapped rather than read into a buffer first.
+    """
+    suffix = file_format(filepath)
+    if suffix == '.csv':
+        return pd.read_csv(filepath, usecols=columns)
+
+    pyarrow = import_pyarrow()
+    if suffix == '.parquet':
+        table = pyarrow.parquet.read_table(
+            filepath, columns=columns, memory_map=memory_map
+        )
+    else:
+        table = pyarrow.feather.read_table(
+            filepath, columns=columns, memory_map=memory_map
+        )
+    return arrow_to_pandas(table)
+
+
+def to_arrow_table(df: pd.DataFrame, schema=None, categories: bool = False):
+    """
+    Convert a frame to an arrow table, without its index. With categories,
+    the string columns are dictionary encoded, and read back as categoricals.
+    """
+    if categories:
+        strings = df.columns[df.dtypes == object]
+        df = df.astype(dict.fromkeys(strings, 'category'))
+    return import_pyarrow().Table.from_pandas(df, schema=schema, preserve_index=False)
+
+
+def write_frame(df: pd.DataFrame, filepath, categories: bool = True):
+    """
+    Write a whole frame. The columnar files keep the dtypes, the string
+    columns being stored as dictionaries of their categories (unless not
+    categories). The Feather files are not compressed, so they can be
+    memory mapped when read.
+    """
+    suffix = file_format(filepath)
+    if suffix == '.csv':
+        df.to_csv(filepath, index=False)
+        return
+
+    pyarrow = import_pyarrow()
+    table = to_arrow_table(df, categories=categories)
+    if suffix == '.parquet':
+        pyarrow.parquet.write_table(table, filepath)
+    else:
+        pyarrow.feather.write_feather(table, filepath, compression='uncompressed')
+
+
+def read_chunks(filepath, chunksize: int, dtype: dict = None) -> Iterator[pd.DataFrame]:
+    """
+    Read a CSV, Parquet or Feather file in chunks of at most `chunksize`
+    rows, indexed by their row number in the whole file, optionally with the
+    given dtypes for some of the columns
+    """
+    suffix = file_format(filepath)
+    if suffix == '.csv':
+        yield from pd.read_csv(filepath, chunksize=chunksize, dtype=dtype)
+        return
+
+    start = 0
+    for batch in _arrow_batches(filepath, chunksize):
+        chunk = arrow_to_pandas(batch)
+        if dtype:
+            chunk = chunk.astype(dtype)
+        chunk.index = pd.RangeIndex(start, start + len(chunk))
+        start += len(chunk)
+        yield chunk
+
+
+def _arrow_batches(filepath, chunksize: int):
+    """The record batches of a columnar file, of at most `chunksize` rows"""
+    pyarrow = import_pyarrow()
+    if file_format(filepath) == '.parquet':
+        yield from pyarrow.parquet.ParquetFile(filepath).iter_batches(batch_size=chunksize)
+        return
+    with pyarrow.memory_map(str(filepath)) as source:
+        reader = pyarrow.ipc.open_file(source)
+        for index in range(reader.num_record_batches):
+            batch = reader.get_batch(index)
+            for start in range(0, batch.num_rows, chunksize):
+                yield batch.slice(start, chunksize)
+
+
+class FrameWriter:
+    """
+    Incrementally write a frame, chunk by chunk, to a CSV, Parquet or
+    Feather file. The schema of the columnar files is the one of the first
+    chunk, unless given, and the later chunks are converted to it. A file
+    with no chunk written has no rows, only the header (or schema), if known.
+    """
+
+    def __init__(self, filepath, schema=None):
+        self.filepath = filepath
+        self.format = file_format(filepath)
+        self.schema = schema
+        self._writer = None
+        self._header = True
+
+
+    def write(self, chunk: pd.DataFrame):
+        """Append a chunk to the output file"""
+        if self.format == '.csv':
+            chunk.to_csv(
+                self.filepath, mode='w' if self._header else 'a',
+                header=self._header, index=False
+            )
+            self._header = False
+            return
+
+        table = to_arrow_table(chunk, schema=self.schema)
+        if self._writer is None:
+            self._open(table.schema)
+        self._writer.write_table(table)
+
+
+    def _open(self, schema):
+        """Open the columnar file, pinning its schema for the later chunks"""
+        pyarrow = import_pyarrow()
+        self.schema = schema
+        if self.format == '.parquet':
+            self._writer = pyarrow.parquet.ParquetWriter(self.filepath, schema)
+        else:
+            # uncompressed, so that the file can be memory mapped
+            self._writer = pyarrow.ipc.new_file(str(self.filepath), schema)
+
+
+    def close(self):
+        """Finalise the output file, creating it if no chunk was written"""
+        if self.format == '.csv':
+            if self._header:
+                names = [] if self.schema is None else self.schema.names
+                pathlib.Path(self.filepath).write_text(
+                    pd.DataFrame(columns=names).to_csv(index=False) if names else '',
+                    encoding='utf-8'
+                )
+                self._header = False
+            return
+
+        if self._writer is None:
+            self._open(import_pyarrow().schema([]) if self.schema is None else self.schema)
+        self._writer.close()
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,145 @@
+"""
+Cross validate the lasso pipeline over k folds of the training rows. The
+column transformations of every fold are fitted once and reused for all
+the alphas, which are fitted along a single warm started regularization
+path. The folds are scored in forked processes inheriting the training
+rows, so that only the fold numbers are sent to them.
+"""
+import gc
+import time
+from typing import List
+
+import numpy as np
+from joblib import effective_n_jobs
+from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+from sklearn.model_selection import KFold
+
+from houses_pipeline.modelling.search import PathConfig, alpha_grid, fit_path
+from houses_pipeline.modelling.search import transform_design
+from houses_pipeline.config.logging import LoggingHandler
+from houses_pipeline.utils import process_context
+
+_logger = LoggingHandler.get_logger(__name__)
+
+# the state every fold process inherits from its parent
+_worker_state = {}
+
+
+def default_alphas(X, y, rare_threshold: float, path: PathConfig = PathConfig()) -> np.ndarray:
+    """
+    The alphas shared by all the folds, from the smallest alpha zeroing every
+    coefficient of the design matrix of all the training rows down to `eps`
+    times it, as the path of a single fit would
+    """
+    design, target, _ = transform_design(rare_threshold, X, y)
+    return alpha_grid(design, target, path)
+
+
+def _init_worker(X, y, folds, rare_threshold, alphas):
+    """Keep the training rows, their folds and the candidates in the worker"""
+    _worker_state.update(
+        X=X, y=y, folds=folds, rare_threshold=rare_threshold, alphas=alphas
+    )
+
+
+def _score_fold(fold: int) -> dict:
+    """Fit the path of one fold and score every alpha on its held out rows"""
+    X, y = _worker_state['X'], _worker_state['y']
+    train_index, test_index = _worker_state['folds'][fold]
+    y_test = y.iloc[test_index]
+
+    path = fit_path(
+        _worker_state['rare_threshold'], X.iloc[train_index], y.iloc[train_index],
+        X.iloc[test_index], PathConfig(alphas=_worker_state['alphas'])
+    )
+    predictions = path['predictions']
+    return {
+        'fold': fold,
+        'train_rows': len(train_index),
+        'test_rows': len(test_index),
+        'transform_seconds': path['transform_seconds'],
+        'path_seconds': path['path_seconds'],
+        'non_zero_coefficients': path['non_zero_coefficients'],
+        'rmse': np.array([
+            mean_squared_error(y_test, predictions[:, i], squared=False)
+            for i in range(predictions.shape[1])
+        ]),
+        'mae': np.array([
+            mean_absolute_error(y_test, predictions[:, i]) for i in range(predictions.shape[1])
+        ]),
+        'r2': np.array([
+            r2_score(y_test, predictions[:, i]) for i in range(predictions.shape[1])
+        ]),
+    }
+
+
+def _score_folds(n_folds: int, workers: int, initargs: tuple) -> List[dict]:
+    """Score the folds in a pool of `workers` processes, or in this one"""
+    if workers <= 1:
+        _init_worker(*initargs)
+        try:
+            return [_score_fold(fold) for fold in range(n_folds)]
+        finally:
+            _worker_state.clear()
+
+    # objects alive before forking are never collected by the workers,
+    # so the garbage collector does not touch (and copy) their pages
+    gc.freeze()
+    try:
+        with process_context().Pool(workers, _init_worker, initargs) as pool:
+            return pool.map(_score_fold, range(n_folds), chunksize=1)
+    finally:
+        gc.unfreeze()
+
+
+def _summarize(scores: List[dict]) -> dict:
+    """The mean and standard deviation of every metric across the folds, per alpha"""
+    summary = {}
+    for metric in ('rmse', 'mae', 'r2'):
+        values = np.stack([score[metric] for score in scores])
+        summary[f'{metric}_mean'] = values.mean(axis=0)
+        summary[f'{metric}_std'] = values.std(axis=0)
+    return summary
+
+
+def cross_validate_lasso(
+    X, y, *,
+    rare_threshold: float,
+    path: PathConfig = PathConfig(),
+    n_folds: int = 5,
+    seed: int = None,
+    n_jobs: int = -1
+) -> dict:
+    """
+    Score every alpha of the path (by default `default_alphas`) on `n_folds` shuffled
+    folds, returning the metrics of every fold, their mean and standard
+    deviation per alpha, and the alpha of the lowest mean rmse
+    """
+    start = time.perf_counter()
+    alphas = (
+        default_alphas(X, y, rare_threshold, path) if path.alphas is None
+        else np.sort(np.asarray(path.alphas, dtype=float))[::-1]
+    )
+    folds = list(KFold(n_folds, shuffle=True, random_state=seed).split(X))
+    workers = min(n_folds, effective_n_jobs(n_jobs))
+
+    scores = _score_folds(n_folds, workers, (X, y, folds, rare_threshold, alphas))
+
+    rmse = np.stack([score['rmse'] for score in scores])
+    best = int(np.argmin(rmse.mean(axis=0)))
+    result = {
+        'alphas': alphas,
+        'folds': scores,
+        'best_index': best,
+        'best_alpha': alphas[best],
+        'seconds': time.perf_counter() - start,
+    }
+    result.update(_summarize(scores))
+
+    _logger.info(
+        "Cross validated %d alphas on %d folds in %.2fs, the best alpha %.4g "
+        "with a rmse of %.1f (+/- %.1f)",
+        len(alphas), n_folds, result['seconds'], result['best_alpha'],
+        result['rmse_mean'][best], result['rmse_std'][best]
+    )
+    return result
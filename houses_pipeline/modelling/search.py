@@ -0,0 +1,160 @@
+"""
+Search the alpha and rare_threshold of the lasso pipeline. The column
+transformations are fitted once per rare_threshold and their design matrix
+is cached, then every alpha is fitted along a single warm started
+coordinate descent path over it. The rare thresholds are searched in
+parallel processes.
+"""
+import time
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+
+import numpy as np
+import scipy.sparse
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.linear_model import lasso_path
+from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+
+from houses_pipeline.modelling.train_lasso import create_lasso_pipeline
+
+
+@dataclass(frozen=True)
+class PathConfig:
+    """
+    The alphas of a lasso path: the given ones, or `n_alphas` log spaced
+    from the smallest alpha zeroing every coefficient down to `eps` times it
+    """
+    alphas: Optional[Sequence[float]] = None
+    n_alphas: int = 100
+    eps: float = 1e-4
+
+
+@dataclass(frozen=True)
+class SearchConfig:
+    """
+    The candidates of a search, the alphas of the path of every rare
+    threshold, and the processes searching them. The rare thresholds are
+    searched in parallel, so at most one process per threshold is busy.
+    """
+    rare_thresholds: Sequence[float]
+    n_alphas: int = 100
+    eps: float = 1e-4
+    n_jobs: int = -1
+
+    @property
+    def path(self) -> PathConfig:
+        """The alphas of the path of every rare threshold"""
+        return PathConfig(n_alphas=self.n_alphas, eps=self.eps)
+
+
+def alpha_grid(design, target, path: PathConfig = PathConfig()) -> np.ndarray:
+    """
+    The alphas of the path, or `n_alphas` log spaced from the smallest alpha
+    zeroing every coefficient of the (centered) design, max|X'y| / n, down
+    to `eps` times it
+    """
+    if path.alphas is not None:
+        return np.sort(np.asarray(path.alphas, dtype=float))[::-1]
+    # the centered target makes the centering of the design unnecessary
+    correlations = design.T @ (target - target.mean())
+    alpha_max = np.abs(correlations).max() / design.shape[0]
+    return np.geomspace(alpha_max, alpha_max * path.eps, path.n_alphas)
+
+
+def transform_design(rare_threshold, X, y) -> tuple:
+    """
+    Fit the transformations of one rare_threshold on the rows, returning
+    their design matrix, the transformed target and the fitted (column,
+    target) transformers
+    """
+    pipeline = create_lasso_pipeline(rare_threshold, X, alpha=1.0, model_seed=None)
+    column_transformations = pipeline.named_steps['column_transformations']
+    target_transformer = clone(
+        pipeline.named_steps['lasso_and_target_transform'].transformer
+    )
+
+    design = column_transformations.fit_transform(X, y)
+    target = target_transformer.fit_transform(y.to_numpy().reshape(-1, 1)).ravel()
+    return design, target, (column_transformations, target_transformer)
+
+
+def _lasso_path(design, target, path: PathConfig) -> tuple:
+    """The alphas, coefficients (one column per alpha) and intercepts of the path"""
+    alphas = alpha_grid(design, target, path)
+    # centered, as the lasso fits its intercept
+    design_mean = np.asarray(design.mean(axis=0)).ravel()
+    target_mean = target.mean()
+    if scipy.sparse.issparse(design):
+        # a sparse design is centered inside the coordinate descent, by its
+        # offsets, instead of being densified
+        alphas, coefs, _ = lasso_path(
+            design, target - target_mean, alphas=alphas,
+            X_offset=design_mean, X_scale=np.ones_like(design_mean)
+        )
+    else:
+        alphas, coefs, _ = lasso_path(design - design_mean, target - target_mean, alphas=alphas)
+    return alphas, coefs, target_mean - design_mean @ coefs
+
+
+def fit_path(rare_threshold, X_fit, y_fit, X_val, path: PathConfig = PathConfig()) -> dict:
+    """
+    Fit the transformations of one rare_threshold once, then the lasso path
+    over their design matrix, returning the alphas, the number of non zero
+    coefficients and the validation predictions of every alpha, one column
+    each
+    """
+    start = time.perf_counter()
+    design, target, transformers = transform_design(rare_threshold, X_fit, y_fit)
+    validation_design = transformers[0].transform(X_val)
+    transform_seconds = time.perf_counter() - start
+
+    alphas, coefs, intercepts = _lasso_path(design, target, path)
+
+    # the predictions of every alpha at once, back on the scale of the prices
+    predictions = transformers[1].inverse_transform(
+        (validation_design @ coefs + intercepts).reshape(-1, 1)
+    ).reshape(validation_design.shape[0], len(alphas))
+
+    return {
+        'alphas': alphas,
+        'non_zero_coefficients': np.count_nonzero(coefs, axis=0),
+        'predictions': predictions,
+        'transform_seconds': transform_seconds,
+        'path_seconds': time.perf_counter() - start - transform_seconds,
+    }
+
+
+def _path_candidates(rare_threshold, split: tuple, path: PathConfig) -> List[dict]:
+    """
+    Score every alpha of the path of one rare_threshold on the validation
+    rows of the split, (X_fit, y_fit, X_val, y_val)
+    """
+    X_fit, y_fit, X_val, y_val = split
+    fitted = fit_path(rare_threshold, X_fit, y_fit, X_val, path)
+    predictions = fitted['predictions']
+    return [
+        {
+            'rare_threshold': rare_threshold,
+            'alpha': alpha,
+            'non_zero_coefficients': int(fitted['non_zero_coefficients'][i]),
+            'rmse': mean_squared_error(y_val, predictions[:, i], squared=False),
+            'mae': mean_absolute_error(y_val, predictions[:, i]),
+            'r2': r2_score(y_val, predictions[:, i]),
+        }
+        for i, alpha in enumerate(fitted['alphas'])
+    ]
+
+
+def search_lasso(X_fit, y_fit, X_val, y_val, search: SearchConfig) -> List[dict]:
+    """
+    Score the alphas of the path of every rare threshold of the search,
+    returning the candidates by increasing validation rmse
+    """
+    split = (X_fit, y_fit, X_val, y_val)
+    paths = Parallel(n_jobs=search.n_jobs)(
+        delayed(_path_candidates)(rare_threshold, split, search.path)
+        for rare_threshold in search.rare_thresholds
+    )
+    candidates = [candidate for path in paths for candidate in path]
+    return sorted(candidates, key=lambda candidate: candidate['rmse'])
@@ -1,8 +1,6 @@
 """Train a lasso regression. Intended use is as a command from the terminal"""
 # generally used modules
 from urllib.parse import urlparse
-import joblib
-import pandas as pd
 import click
 
 # pipeline feature engineering and scaling
@@ -17,19 +15,23 @@ from sklearn.impute import SimpleImputer
 from sklearn.linear_model import Lasso
 from sklearn.model_selection import train_test_split
 
-# model tracking
-import mlflow
-import mlflow.sklearn
-
 # internal modules
 from houses_pipeline import constants
 from houses_pipeline.transformers import RareCategoriesReplacer
+from houses_pipeline.preprocess.core import fit_preprocess_pipeline
+from houses_pipeline.io import read_columns, read_frame
+from houses_pipeline.modelling.transform_cache import TransformCache
+from houses_pipeline.utils import file_digest
 from houses_pipeline import __version__
+from houses_pipeline import save_model
 from houses_pipeline.config import config
 from houses_pipeline.config.logging import LoggingHandler
 
 _logger = LoggingHandler.get_logger(__name__)
 
+# the share of the rows to train on, the rest being held out for evaluation
+TRAIN_SIZE = 0.8
+
 __ordinal_encoder = OrdinalEncoder(
     categories=[constants.ORDINALS_ORDERING] * len(constants.ORDINALS),
     handle_unknown='use_encoded_value',
@@ -51,7 +53,9 @@ def create_lasso_pipeline(rare_threshold, X_train, alpha, model_seed):
     # transformations to be applied to categorical features
     categoric_pipeline = Pipeline([
         ('replace_rare', RareCategoriesReplacer(rare_threshold)),
-        ('one_hot_encoding', OneHotEncoder())
+        # categories unseen in the fit, e.g. a first rare one replaced by the
+        # keyword, are encoded as all zeros instead of failing the transform
+        ('one_hot_encoding', OneHotEncoder(handle_unknown='ignore'))
     ])
 
     # transformations on the response variable
@@ -66,7 +70,10 @@ def create_lasso_pipeline(rare_threshold, X_train, alpha, model_seed):
             ('categoric_transformations', categoric_pipeline, categoricals),
             ('ordinals_encoding', __ordinal_encoder, constants.ORDINALS)
         ],
-        remainder='passthrough'
+        remainder='passthrough',
+        # keep the design matrix sparse (CSR) whatever its density, as the
+        # one hot block dominates it and the lasso fits on sparse input
+        sparse_threshold=1.0
     )
 
 
@@ -82,8 +89,43 @@ def create_lasso_pipeline(rare_threshold, X_train, alpha, model_seed):
 
     return pipeline
 
+
+def fit_lasso_pipeline(pipeline, X_train, y_train, cache=None, cache_key=None):
+    """
+    Fit the lasso pipeline, taking the fitted column transformations and
+    their design matrix from the transform cache when they are cached
+    """
+    cached = cache.get(cache_key) if cache is not None else None
+    if cached is None:
+        design = pipeline.named_steps['column_transformations'].fit_transform(
+            X_train, y_train
+        )
+        if cache is not None:
+            cache.put(cache_key, pipeline.named_steps['column_transformations'], design)
+    else:
+        _logger.info("Reusing the cached design matrix %s", cache_key)
+        column_transformations, design = cached
+        pipeline.steps[0] = ('column_transformations', column_transformations)
+
+    pipeline.named_steps['lasso_and_target_transform'].fit(design, y_train)
+    return pipeline
+
+
+def read_training_frame(input_filepath):
+    """
+    Read the columns the training uses, i.e. all but the identifiers, from
+    a csv, parquet or feather file
+    """
+    columns = [column for column in read_columns(input_filepath) if column != 'Id']
+    return read_frame(input_filepath, columns=columns)
+
+
 def track_mlflow_model(model, model_name):
     """Track the model in the mlflow model registry"""
+    # pylint: disable=import-outside-toplevel
+    import mlflow
+    import mlflow.sklearn
+
     tracking_url_type_store = urlparse(mlflow.get_tracking_uri()).scheme
     # Model registry does not work with file store
     if tracking_url_type_store != "file":
@@ -100,6 +142,103 @@ def track_mlflow_model(model, model_name):
         mlflow.sklearn.log_model(sk_model=model, artifact_path=model_name)
 
 
+def save_lasso_artifacts(pipeline, X_train):
+    """
+    Save the lasso pipeline to the models directory, with the preprocessing
+    fitted on the training features frozen next to it, so that serving only
+    has to transform with it instead of refitting per request
+    """
+    # pylint: disable=import-outside-toplevel
+    import mlflow
+
+    save_path = save_model(pipeline, model_name=f"lasso_{__version__}.pkl")
+    _logger.info("Saved the lasso pipeline at %s", save_path)
+
+    preprocessor = fit_preprocess_pipeline(X_train)
+    preprocessor_save_path = save_model(
+        preprocessor,
+        model_name=f"{config.PREPROCESS_SAVE_FILENAME}_{__version__}.pkl"
+    )
+    mlflow.log_artifact(str(preprocessor_save_path))
+    _logger.info("Saved the preprocessing pipeline at %s", preprocessor_save_path)
+
+
+def log_search_candidates(candidates):
+    """Track every searched candidate as a child run of the current run"""
+    # pylint: disable=import-outside-toplevel
+    import mlflow
+
+    for candidate in candidates:
+        params = {'alpha': candidate['alpha'], 'rare_threshold': candidate['rare_threshold']}
+        with mlflow.start_run(
+            run_name=f"alpha={candidate['alpha']:.4g} rare_threshold={candidate['rare_threshold']}",
+            nested=True
+        ):
+            mlflow.log_params(params)
+            mlflow.log_metrics({
+                name: value for name, value in candidate.items() if name not in params
+            })
+
+
+def search_hyperparameters(X_train, y_train, split_seed, **search_params):
+    """
+    Search the alpha and the rare threshold on a validation split of the
+    training rows, tracking the candidates and returning the best one. The
+    search parameters are the ones of `search.SearchConfig`.
+    """
+    # pylint: disable=import-outside-toplevel
+    from houses_pipeline.modelling.search import SearchConfig, search_lasso
+
+    X_fit, X_val, y_fit, y_val = train_test_split(
+        X_train, y_train, train_size=0.8, random_state=split_seed
+    )
+    candidates = search_lasso(X_fit, y_fit, X_val, y_val, SearchConfig(**search_params))
+    log_search_candidates(candidates)
+    _logger.info(
+        "Searched %d candidates, the best with a validation rmse of %.1f: %s",
+        len(candidates), candidates[0]['rmse'], candidates[0]
+    )
+    return candidates[0]
+
+
+def log_cross_validation(result):
+    """
+    Track the metrics and the timing of every fold (at the best alpha) as
+    child runs of the current run, and their mean along the alphas
+    """
+    # pylint: disable=import-outside-toplevel
+    import mlflow
+
+    best = result['best_index']
+    for fold in result['folds']:
+        with mlflow.start_run(run_name=f"fold={fold['fold']}", nested=True):
+            mlflow.log_params({
+                'fold': fold['fold'],
+                'alpha': result['best_alpha'],
+                'train_rows': fold['train_rows'],
+                'test_rows': fold['test_rows'],
+            })
+            mlflow.log_metrics({
+                'rmse': fold['rmse'][best],
+                'mae': fold['mae'][best],
+                'r2': fold['r2'][best],
+                'non_zero_coefficients': fold['non_zero_coefficients'][best],
+                'transform_seconds': fold['transform_seconds'],
+                'path_seconds': fold['path_seconds'],
+            })
+
+    mlflow.log_metrics({
+        'cv_rmse_mean': result['rmse_mean'][best],
+        'cv_rmse_std': result['rmse_std'][best],
+        'cv_mae_mean': result['mae_mean'][best],
+        'cv_r2_mean': result['r2_mean'][best],
+        'cv_seconds': result['seconds'],
+    })
+    # the mean rmse of every alpha, from the strongest one
+    for step, rmse in enumerate(result['rmse_mean']):
+        mlflow.log_metric('cv_rmse_by_alpha', rmse, step=step)
+
+
 @click.command()
 @click.argument(
     'input_filepath',
@@ -134,15 +273,70 @@ def track_mlflow_model(model, model_name):
     default=0.05,
     help="Rare Threshold"
 )
-def main(input_filepath, alpha, model_seed, split_seed, rare_threshold):
+@click.option(
+    '--search',
+    'search',
+    is_flag=True,
+    default=False,
+    help=constants.SEARCH_HELP
+)
+@click.option(
+    '--rare_thresholds',
+    'rare_thresholds',
+    required=False,
+    default=None,
+    help=constants.RARE_THRESHOLDS_HELP
+)
+@click.option(
+    '--n_alphas',
+    'n_alphas',
+    required=False,
+    default=100,
+    help=constants.N_ALPHAS_HELP
+)
+@click.option(
+    '--n_jobs',
+    'n_jobs',
+    required=False,
+    default=-1,
+    help=constants.N_JOBS_HELP
+)
+@click.option(
+    '--cross_validate',
+    'cross_validate',
+    is_flag=True,
+    default=False,
+    help=constants.CROSS_VALIDATE_HELP
+)
+@click.option(
+    '--n_folds',
+    'n_folds',
+    required=False,
+    default=5,
+    help=constants.N_FOLDS_HELP
+)
+@click.option(
+    '--transform_cache/--no-transform_cache',
+    'transform_cache',
+    default=True,
+    help=constants.TRANSFORM_CACHE_HELP
+)
+# pylint: disable=too-many-arguments,too-many-locals
+def main(
+    input_filepath, alpha, model_seed, split_seed, rare_threshold, search,
+    rare_thresholds, n_alphas, n_jobs, cross_validate, n_folds, transform_cache
+):
     """Main method for training the lasso model"""
+    # model tracking, only imported once a model is actually trained
+    # pylint: disable=import-outside-toplevel
+    import mlflow
 
-    houses_df = pd.read_csv(input_filepath)
+    houses_df = read_training_frame(input_filepath)
 
     X_train, X_test, y_train, y_test = train_test_split(
-        houses_df.drop([constants.TARGET_VARIABLE_NAME, 'Id'], axis=1),
+        houses_df.drop(constants.TARGET_VARIABLE_NAME, axis=1),
         houses_df[constants.TARGET_VARIABLE_NAME],
-        train_size=0.8,
+        train_size=TRAIN_SIZE,
         random_state=split_seed
     )
 
@@ -152,11 +346,50 @@ def main(input_filepath, alpha, model_seed, split_seed, rare_threshold):
     # start experiment tracking
     experiment = mlflow.set_experiment(experiment_name="houses_lasso_train")
     with mlflow.start_run(experiment_id=experiment.experiment_id):
+        if search:
+            # train the best candidate instead of the given alpha and threshold
+            best = search_hyperparameters(
+                X_train, y_train, split_seed,
+                rare_thresholds=(
+                    [float(threshold) for threshold in rare_thresholds.split(',')]
+                    if rare_thresholds else [rare_threshold]
+                ),
+                n_alphas=n_alphas,
+                n_jobs=n_jobs
+            )
+            alpha, rare_threshold = best['alpha'], best['rare_threshold']
+            mlflow.log_metric('search_validation_rmse', best['rmse'])
+
+        if cross_validate:
+            from houses_pipeline.modelling.cross_validation import cross_validate_lasso
+            from houses_pipeline.modelling.search import PathConfig
+
+            # train the alpha of the lowest rmse across the folds
+            result = cross_validate_lasso(
+                X_train, y_train,
+                rare_threshold=rare_threshold,
+                path=PathConfig(n_alphas=n_alphas),
+                n_folds=n_folds,
+                seed=split_seed,
+                n_jobs=n_jobs
+            )
+            log_cross_validation(result)
+            alpha = result['best_alpha']
+
         pipeline = create_lasso_pipeline(
             rare_threshold, X_train, alpha, model_seed
         )
-        # fit the pipeline
-        pipeline.fit(X_train, y_train)
+        # fit the pipeline, reusing the transformations of an earlier run
+        # on the same input, split and transformer parameters
+        cache, cache_key = None, None
+        if transform_cache:
+            cache = TransformCache()
+            cache_key = cache.key(
+                file_digest(input_filepath),
+                {'split_seed': split_seed, 'train_size': TRAIN_SIZE},
+                pipeline.named_steps['column_transformations']
+            )
+        fit_lasso_pipeline(pipeline, X_train, y_train, cache, cache_key)
 
         # track the experiment's transformations
         mlflow.log_param("rare_threshold", rare_threshold)
@@ -183,10 +416,7 @@ def main(input_filepath, alpha, model_seed, split_seed, rare_threshold):
             evaluators=["default"]
         )
 
-        # save the lasso to the models directory
-        save_path = config.TRAINED_MODELS_DIR / f"{model_name}.pkl"
-        joblib.dump(pipeline, save_path)
-        _logger.info("Saved the lasso pipeline at %s", save_path)
+        save_lasso_artifacts(pipeline, X_train)
 
 
 if __name__ == "__main__":
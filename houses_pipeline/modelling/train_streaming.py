@@ -0,0 +1,451 @@
+"""
+Train the lasso pipeline on files larger than the memory, streaming them in
+chunks. Intended use is as a command from the terminal.
+
+A first pass learns the imputation means and the scaler moments (exactly),
+the proportions of the categories and a uniform reservoir sample of the
+rows, on which the Yeo-Johnson lambdas are approximated. A second pass fits
+a linear model with an L1 penalty by stochastic gradient descent over the
+chunks, for a few epochs. The saved pipeline has the structure of the one
+of train_lasso.py, so that predict/lasso.py serves (and compiles) it alike.
+"""
+import itertools
+import time
+
+import click
+import numpy as np
+import pandas as pd
+import scipy.sparse
+from sklearn.linear_model import SGDRegressor
+from sklearn.preprocessing import StandardScaler
+
+from houses_pipeline import constants
+from houses_pipeline.transformers import RareCategoriesReplacer
+from houses_pipeline.io import read_chunks, read_columns
+from houses_pipeline.modelling.train_lasso import create_lasso_pipeline, save_lasso_artifacts
+from houses_pipeline.modelling.train_lasso import track_mlflow_model
+from houses_pipeline import __version__
+from houses_pipeline.config.logging import LoggingHandler
+
+_logger = LoggingHandler.get_logger(__name__)
+
+
+def training_chunks(filepath, chunksize: int, holdout: float, split_seed: int):
+    """
+    Read the features and the target of a file in chunks, along with
+    whether every row is held out. The same rows are held out on every pass.
+    """
+    columns = [column for column in read_columns(filepath) if column != 'Id']
+    for number, chunk in enumerate(read_chunks(filepath, chunksize)):
+        chunk = chunk[columns]
+        held_out = np.random.default_rng([split_seed, number]).random(len(chunk)) < holdout
+        yield (
+            chunk.drop(columns=constants.TARGET_VARIABLE_NAME),
+            chunk[constants.TARGET_VARIABLE_NAME],
+            held_out
+        )
+
+
+def _new_reservoir(sample: pd.DataFrame, size: int, seed: int) -> tuple:
+    """
+    A reservoir of `size` rows with the columns of a sample (the non numeric
+    ones as objects, holding any category), the random keys of its rows
+    (infinite while they are empty) and the generator of the keys
+    """
+    frame = pd.DataFrame({
+        column: np.empty(size, dtype=values.dtype if values.dtype.kind in 'biuf' else object)
+        for column, values in sample.items()
+    })
+    return frame, np.full(size, np.inf), np.random.default_rng(seed)
+
+
+def _sample_into(reservoir: tuple, sample: pd.DataFrame):
+    """
+    Keep the rows of the smallest random keys, of the reservoir and of a
+    sample, in the reservoir: the kept rows of the sample replace the evicted
+    ones in place
+    """
+    frame, frame_keys, rng = reservoir
+    keys = rng.random(len(sample))
+    size = len(frame_keys)
+    kept = np.argpartition(np.concatenate([frame_keys, keys]), size - 1)[:size]
+    incoming = kept[kept >= size] - size
+    if not incoming.size:
+        return
+    evicted = np.setdiff1d(np.arange(size), kept, assume_unique=True)
+    for position in range(frame.shape[1]):
+        frame.iloc[evicted, position] = sample.iloc[incoming, position].to_numpy()
+    frame_keys[evicted] = keys[incoming]
+
+
+def _sampled_rows(reservoir: tuple) -> pd.DataFrame:
+    """The filled rows of a reservoir, by increasing key"""
+    frame, frame_keys, _ = reservoir
+    order = np.argsort(frame_keys, kind='stable')
+    return frame.iloc[order[np.isfinite(frame_keys[order])]].reset_index(drop=True)
+
+
+def scan_statistics(chunks, *, rare_threshold: float, reservoir_size: int, seed: int) -> dict:
+    """
+    Stream the training rows once, accumulating the moments of the numerical
+    columns and of the target, the counts of the categories and a uniform
+    sample of `reservoir_size` rows
+    """
+    chunks = iter(chunks)
+    first = next(chunks, None)
+    if first is None:
+        raise ValueError("No training rows to scan")
+    numericals = first[0].columns.intersection(constants.NUMERICAL_COLUMNS)
+    categoricals = first[0].columns.intersection(constants.CATEGORICAL_COLUMNS)
+
+    numerical_moments, target_moments = StandardScaler(), StandardScaler()
+    replacer = RareCategoriesReplacer(rare_threshold)
+    # the rows of the smallest random keys are a uniform sample
+    reservoir = _new_reservoir(
+        first[0].assign(**{constants.TARGET_VARIABLE_NAME: first[1]}), reservoir_size, seed
+    )
+    rows = 0
+
+    for X, y, held_out in itertools.chain([first], chunks):
+        X, y = X[~held_out], y[~held_out]
+        if X.empty:
+            continue
+        rows += len(X)
+        # missing values are ignored by the moments, as by the mean imputer
+        numerical_moments.partial_fit(X[numericals].to_numpy(dtype=float))
+        target_moments.partial_fit(y.to_numpy(dtype=float).reshape(-1, 1))
+        replacer.partial_fit(X[categoricals])
+        _sample_into(reservoir, X.assign(**{constants.TARGET_VARIABLE_NAME: y}))
+
+    if rows == 0:
+        raise ValueError("No training rows to scan")
+    return {
+        'rows': rows,
+        'numerical_moments': numerical_moments,
+        'target_moments': target_moments,
+        'replacer': replacer,
+        'reservoir': _sampled_rows(reservoir),
+    }
+
+
+def _set_moments(scaler, moments, rows: int):
+    """
+    Set the moments of a fitted scaler to the streamed ones, the missing
+    values counting as imputed with the mean
+    """
+    scaler.mean_ = moments.mean_
+    scaler.var_ = moments.var_ * moments.n_samples_seen_ / rows
+    scaler.scale_ = np.where(scaler.var_ > 0, np.sqrt(scaler.var_), 1.0)
+    scaler.n_samples_seen_ = rows
+
+
+def _replaced_categories(replacer) -> np.ndarray:
+    """
+    The categories every column takes once the rare ones are replaced, as
+    rows to fit the one hot encoder on
+    """
+    columns = []
+    for counts, kept in zip(replacer.counts_, replacer.categories_to_keep):
+        values = list(kept)
+        if (counts > 0).sum() > len(kept):
+            values.append(replacer.keyword)
+        columns.append(values)
+    rows = max(map(len, columns))
+    return np.array(
+        [values + values[:1] * (rows - len(values)) for values in columns], dtype=object
+    ).T
+
+
+def _select(X, columns):
+    """The columns of a frame, by name or (for the remainder) position"""
+    if all(isinstance(column, (int, np.integer)) for column in columns):
+        return X.iloc[:, list(columns)]
+    return X[columns]
+
+
+def fit_column_transformations(column_transformations, statistics: dict):
+    """
+    Fit the column transformations on the reservoir, then replace what was
+    streamed: the imputation means, the scaler moments and the rare
+    categories (with the one hot encoding of the categories they leave)
+    """
+    reservoir = statistics['reservoir']
+    X_sample = reservoir.drop(columns=constants.TARGET_VARIABLE_NAME)
+    column_transformations.fit(X_sample, reservoir[constants.TARGET_VARIABLE_NAME])
+
+    branches = {name: (transformer, columns) for name, transformer, columns
+                in column_transformations.transformers_}
+    numeric_pipeline, numericals = branches['numeriric_transformations']
+    imputer = numeric_pipeline.named_steps['impute_with_mean']
+    imputer.statistics_ = statistics['numerical_moments'].mean_
+    _set_moments(
+        numeric_pipeline.named_steps['scaling'], statistics['numerical_moments'],
+        statistics['rows']
+    )
+    # the lambdas are approximated on the reservoir, scaled as streamed
+    numeric_pipeline.named_steps['yeo_johnson'].fit(
+        numeric_pipeline[:-1].transform(X_sample[numericals])
+    )
+
+    categoric_pipeline, _ = branches['categoric_transformations']
+    replacer = statistics['replacer']
+    categoric_pipeline.steps[0] = ('replace_rare', replacer)
+    categoric_pipeline.named_steps['one_hot_encoding'].fit(_replaced_categories(replacer))
+
+    # the one hot encoding may now output more or fewer columns
+    start = 0
+    for name, transformer, columns in column_transformations.transformers_:
+        if transformer == 'drop':
+            width = 0
+        elif transformer == 'passthrough':
+            width = len(columns)
+        else:
+            width = transformer.transform(_select(X_sample.iloc[:1], columns)).shape[1]
+        column_transformations.output_indices_[name] = slice(start, start + width)
+        start += width
+    return column_transformations
+
+
+def _root_mean_squares(design) -> np.ndarray:
+    """The root mean square of every column of a design matrix, 1 if all zero"""
+    if scipy.sparse.issparse(design):
+        squares = np.asarray(design.multiply(design).mean(axis=0)).ravel()
+    else:
+        squares = np.square(design).mean(axis=0)
+    return np.where(squares > 0, np.sqrt(squares), 1.0)
+
+
+def _scaled(design, scale: np.ndarray):
+    """Divide the columns of a design matrix chunk by their scale, keeping it sparse"""
+    if scipy.sparse.issparse(design):
+        return scipy.sparse.csr_matrix(design @ scipy.sparse.diags(1 / scale))
+    return np.asarray(design) / scale
+
+
+# pylint: disable=too-many-arguments,too-many-locals
+def train_streaming(
+    filepath, *,
+    rare_threshold: float = 0.05,
+    alpha: float = 0.05,
+    chunksize: int = constants.DEFAULT_PREPROCESS_CHUNKSIZE,
+    reservoir_size: int = 100_000,
+    epochs: int = 5,
+    holdout: float = 0.2,
+    split_seed: int = 1,
+    model_seed: int = 1
+):
+    """
+    Train the lasso pipeline over a file in two streaming passes, returning
+    the fitted pipeline and the training statistics, including the reservoir
+    sample and the metrics on the held out rows
+    """
+    def chunks():
+        return training_chunks(filepath, chunksize, holdout, split_seed)
+
+    start = time.perf_counter()
+    statistics = scan_statistics(
+        chunks(), rare_threshold=rare_threshold, reservoir_size=reservoir_size, seed=split_seed
+    )
+    reservoir = statistics['reservoir']
+    X_sample = reservoir.drop(columns=constants.TARGET_VARIABLE_NAME)
+    y_sample = reservoir[constants.TARGET_VARIABLE_NAME]
+    scan_seconds = time.perf_counter() - start
+
+    pipeline = create_lasso_pipeline(rare_threshold, X_sample, alpha, model_seed)
+    column_transformations = fit_column_transformations(
+        pipeline.named_steps['column_transformations'], statistics
+    )
+
+    # the gradient descent runs on design columns of unit root mean square
+    # (as approximated on the reservoir), which stay sparse as they are not
+    # centered: the unpenalized intercept absorbs their means instead. The
+    # scaling is folded back into the coefficients in the end, so the alpha
+    # penalizes every coefficient by the scale of its column too, and is
+    # not the alpha of a lasso trained in memory.
+    sample_design = column_transformations.transform(X_sample)
+    design_scale = _root_mean_squares(sample_design)
+
+    model = pipeline.named_steps['lasso_and_target_transform']
+    model.set_params(regressor=SGDRegressor(
+        penalty='l1', alpha=alpha, random_state=model_seed
+    ))
+    # warm started on the reservoir, which also fits the target transformer
+    model.fit(_scaled(sample_design, design_scale), y_sample)
+    target_transformer = model.transformer_
+    _set_moments(
+        target_transformer.named_steps['normalization'], statistics['target_moments'],
+        statistics['rows']
+    )
+    target_transformer.named_steps['yeo_johnson'].fit(
+        target_transformer[:-1].transform(y_sample.to_numpy().reshape(-1, 1))
+    )
+
+    rng = np.random.default_rng(model_seed)
+    regressor = model.regressor_
+    for _ in range(epochs):
+        for X, y, held_out in chunks():
+            X, y = X[~held_out], y[~held_out]
+            if X.empty:
+                continue
+            design = _scaled(column_transformations.transform(X), design_scale)
+            target = target_transformer.transform(y.to_numpy().reshape(-1, 1)).ravel()
+            order = rng.permutation(len(target))
+            regressor.partial_fit(design[order], target[order])
+    regressor.coef_ = regressor.coef_ / design_scale
+    fit_seconds = time.perf_counter() - start - scan_seconds
+
+    statistics.update(
+        evaluate_streaming(pipeline, chunks()),
+        scan_seconds=scan_seconds,
+        fit_seconds=fit_seconds,
+        non_zero_coefficients=int(np.count_nonzero(regressor.coef_)),
+    )
+    _logger.info(
+        "Trained on %d rows in %.1fs (%.1fs scanning), held out rmse %.1f",
+        statistics['rows'], scan_seconds + fit_seconds, scan_seconds,
+        statistics.get('rmse', np.nan)
+    )
+    return pipeline, statistics
+
+
+def evaluate_streaming(pipeline, chunks) -> dict:
+    """The rmse, mae and r2 of a pipeline on the held out rows of the chunks"""
+    rows, squared_error, absolute_error = 0, 0.0, 0.0
+    target_sum, target_squared_sum = 0.0, 0.0
+    for X, y, held_out in chunks:
+        if not held_out.any():
+            continue
+        y = y[held_out].to_numpy(dtype=float)
+        residuals = y - pipeline.predict(X[held_out])
+        rows += len(y)
+        squared_error += residuals @ residuals
+        absolute_error += np.abs(residuals).sum()
+        target_sum += y.sum()
+        target_squared_sum += y @ y
+
+    if rows == 0:
+        return {'holdout_rows': 0}
+    total_squares = target_squared_sum - target_sum ** 2 / rows
+    return {
+        'holdout_rows': rows,
+        'rmse': np.sqrt(squared_error / rows),
+        'mae': absolute_error / rows,
+        'r2': 1 - squared_error / total_squares if total_squares else np.nan,
+    }
+
+
+@click.command()
+@click.argument(
+    'input_filepath',
+    type=click.Path(exists=True),
+    default=constants.DEFAULT_TRAIN_INPUT_PATH
+)
+@click.option(
+    '--alpha',
+    'alpha',
+    required=False,
+    default=0.05,
+    help=constants.SGD_ALPHA_HELP
+)
+@click.option(
+    '--rare_threshold',
+    'rare_threshold',
+    required=False,
+    default=0.05,
+    help="Rare Threshold"
+)
+@click.option(
+    '--chunksize',
+    'chunksize',
+    required=False,
+    default=constants.DEFAULT_PREPROCESS_CHUNKSIZE,
+    help=constants.CHUNKSIZE_HELP
+)
+@click.option(
+    '--reservoir_size',
+    'reservoir_size',
+    required=False,
+    default=100_000,
+    help=constants.RESERVOIR_SIZE_HELP
+)
+@click.option(
+    '--epochs',
+    'epochs',
+    required=False,
+    default=5,
+    help=constants.EPOCHS_HELP
+)
+@click.option(
+    '--holdout',
+    'holdout',
+    required=False,
+    default=0.2,
+    help=constants.HOLDOUT_HELP
+)
+@click.option(
+    '--split_seed',
+    'split_seed',
+    required=False,
+    default=1,
+    help="Splitting seed"
+)
+@click.option(
+    '--model_seed',
+    'model_seed',
+    required=False,
+    default=1,
+    help="Regularization model seed"
+)
+def main(
+    input_filepath, alpha, rare_threshold, chunksize, reservoir_size, epochs, holdout,
+    split_seed, model_seed
+):
+    """Main method for training the lasso model over a file in chunks"""
+    # model tracking, only imported once a model is actually trained
+    # pylint: disable=import-outside-toplevel
+    import mlflow
+
+    experiment = mlflow.set_experiment(experiment_name="houses_lasso_train")
+    with mlflow.start_run(experiment_id=experiment.experiment_id):
+        pipeline, statistics = train_streaming(
+            input_filepath,
+            rare_threshold=rare_threshold,
+            alpha=alpha,
+            chunksize=chunksize,
+            reservoir_size=reservoir_size,
+            epochs=epochs,
+            holdout=holdout,
+            split_seed=split_seed,
+            model_seed=model_seed
+        )
+
+        mlflow.log_params({
+            'training': 'streaming',
+            'rare_threshold': rare_threshold,
+            # not comparable with the alpha of the lasso, see train_streaming
+            'sgd_alpha': alpha,
+            'model_random_seed': model_seed,
+            'chunksize': chunksize,
+            'reservoir_size': reservoir_size,
+            'epochs': epochs,
+            'training_rows': statistics['rows'],
+        })
+        mlflow.log_metrics({
+            name: statistics[name]
+            for name in ('rmse', 'mae', 'r2', 'scan_seconds', 'fit_seconds',
+                         'non_zero_coefficients')
+            if name in statistics
+        })
+
+        model_name = f"lasso_{__version__}"
+        track_mlflow_model(pipeline, model_name)
+
+        # the preprocessing served next to the model is fitted on the reservoir
+        save_lasso_artifacts(
+            pipeline, statistics['reservoir'].drop(columns=constants.TARGET_VARIABLE_NAME)
+        )
+
+
+if __name__ == "__main__":
+    # pylint: disable=no-value-for-parameter
+    main()
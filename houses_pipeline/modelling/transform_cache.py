@@ -0,0 +1,250 @@
+"""
+Cache the fitted column transformations of the training and their design
+matrix on disk, so that a training run differing only in the model (e.g.
+the alpha or the seed) skips straight to fitting it.
+
+Entries are addressed by a hash of the content of the input file, the split,
+the (unfitted) transformer parameters and the source of the transformers of
+the package, so that changing their code invalidates the entries made with
+the older code. The design matrices are saved as
+numpy files, memory mapped when loaded, and the least recently used entries
+are evicted once the cache grows past its size.
+
+    python -m houses_pipeline.modelling.transform_cache stats
+    python -m houses_pipeline.modelling.transform_cache clear
+"""
+import errno
+import hashlib
+import json
+import os
+import pathlib
+import shutil
+import tempfile
+import time
+
+import click
+
+from houses_pipeline import __version__, constants
+from houses_pipeline.config import config
+from houses_pipeline.config.logging import LoggingHandler
+from houses_pipeline.utils import file_digest
+
+_logger = LoggingHandler.get_logger(__name__)
+
+# the files of an entry
+_TRANSFORMER_FILE = 'transformer.pkl'
+_METADATA_FILE = 'metadata.json'
+# the arrays of a sparse (CSR) design matrix, saved one by one so that they
+# can be memory mapped
+_SPARSE_ARRAYS = ('data', 'indices', 'indptr')
+
+
+def _transformers_digest() -> str:
+    """The sha256 of the source of the transformers of the package"""
+    # pylint: disable=import-outside-toplevel
+    from houses_pipeline import transformers
+
+    return file_digest(transformers.__file__)
+
+
+def _directory_bytes(directory: pathlib.Path) -> int:
+    """The total size of the files of a directory"""
+    return sum(path.stat().st_size for path in directory.iterdir() if path.is_file())
+
+
+class TransformCache:
+    """
+    A directory of fitted transformers with their design matrices, holding
+    up to `max_bytes` of them
+    """
+
+    def __init__(self, directory=None, max_bytes: int = None):
+        self.directory = pathlib.Path(directory or config.TRANSFORM_CACHE_DIR)
+        self.max_bytes = config.TRANSFORM_CACHE_SIZE if max_bytes is None else max_bytes
+
+
+    @staticmethod
+    def key(input_digest: str, split: dict, transformer) -> str:
+        """
+        The address of the design matrix of an input file content, split by
+        the given parameters and transformed by an unfitted transformer
+        """
+        # pylint: disable=import-outside-toplevel
+        import joblib
+        import sklearn
+        from sklearn.base import clone
+
+        parts = {
+            'input': input_digest,
+            'split': split,
+            # the clone drops any fitted state of shared sub-estimators
+            'transformer': joblib.hash(clone(transformer)),
+            'sklearn': sklearn.__version__,
+            # the pickled transformers only refer to their code
+            'code': _transformers_digest(),
+            'version': __version__,
+        }
+        return hashlib.sha256(json.dumps(parts, sort_keys=True).encode()).hexdigest()
+
+
+    def get(self, key: str):
+        """
+        The fitted transformer and the (memory mapped) design matrix of a
+        key, or None if not cached
+        """
+        # pylint: disable=import-outside-toplevel
+        import joblib
+        import numpy as np
+        import scipy.sparse
+
+        entry = self.directory / key
+        try:
+            metadata = json.loads((entry / _METADATA_FILE).read_text(encoding='utf-8'))
+            transformer = joblib.load(entry / _TRANSFORMER_FILE)
+            if metadata['sparse']:
+                arrays = [
+                    np.load(entry / f'{name}.npy', mmap_mode='r') for name in _SPARSE_ARRAYS
+                ]
+                design = scipy.sparse.csr_matrix(tuple(arrays), shape=metadata['shape'])
+            else:
+                design = np.load(entry / 'design.npy', mmap_mode='r')
+        except FileNotFoundError:
+            return None
+
+        metadata['hits'] += 1
+        metadata['last_used'] = time.time()
+        self._write_metadata(entry, metadata)
+        return transformer, design
+
+
+    def put(self, key: str, transformer, design, **metadata):
+        """Cache a fitted transformer and its design matrix, then evict"""
+        # pylint: disable=import-outside-toplevel
+        import joblib
+        import numpy as np
+        import scipy.sparse
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # written aside and renamed, so readers never see a partial entry
+        staging = pathlib.Path(tempfile.mkdtemp(dir=self.directory, prefix=f'.{key}.'))
+        try:
+            joblib.dump(transformer, staging / _TRANSFORMER_FILE)
+            sparse = scipy.sparse.issparse(design)
+            if sparse:
+                design = scipy.sparse.csr_matrix(design)
+                for name in _SPARSE_ARRAYS:
+                    np.save(staging / f'{name}.npy', getattr(design, name))
+            else:
+                np.save(staging / 'design.npy', np.asarray(design))
+            now = time.time()
+            self._write_metadata(staging, metadata | {
+                'sparse': sparse, 'shape': list(design.shape),
+                'created': now, 'last_used': now, 'hits': 0
+            })
+            os.replace(staging, self.directory / key)
+        except OSError as error:
+            shutil.rmtree(staging, ignore_errors=True)
+            # unless another process cached the same key meanwhile
+            if error.errno not in (errno.EEXIST, errno.ENOTEMPTY) or not (
+                self.directory / key
+            ).is_dir():
+                _logger.warning("Could not cache the design matrix %s: %s", key, error)
+        self.evict()
+
+
+    def entries(self) -> list:
+        """The metadata of the cached entries, the least recently used first"""
+        entries = []
+        if not self.directory.is_dir():
+            return entries
+        for entry in self.directory.iterdir():
+            if entry.name.startswith('.') or not entry.is_dir():
+                continue
+            try:
+                metadata = json.loads((entry / _METADATA_FILE).read_text(encoding='utf-8'))
+            except FileNotFoundError:
+                continue
+            entries.append(metadata | {'key': entry.name, 'bytes': _directory_bytes(entry)})
+        return sorted(entries, key=lambda metadata: metadata['last_used'])
+
+
+    def evict(self) -> int:
+        """Remove the least recently used entries until the cache fits its size"""
+        entries = self.entries()
+        total = sum(entry['bytes'] for entry in entries)
+        evicted = 0
+        for entry in entries:
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(self.directory / entry['key'], ignore_errors=True)
+            total -= entry['bytes']
+            evicted += 1
+        return evicted
+
+
+    def clear(self):
+        """Remove every entry"""
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+    def stats(self) -> dict:
+        """The size and the entries of the cache"""
+        entries = self.entries()
+        return {
+            'directory': str(self.directory),
+            'entries': len(entries),
+            'bytes': sum(entry['bytes'] for entry in entries),
+            'max_bytes': self.max_bytes,
+            'hits': sum(entry['hits'] for entry in entries),
+        }
+
+
+    @staticmethod
+    def _write_metadata(entry: pathlib.Path, metadata: dict):
+        """Write the metadata of an entry"""
+        (entry / _METADATA_FILE).write_text(json.dumps(metadata), encoding='utf-8')
+
+
+@click.group()
+@click.option(
+    '--directory',
+    'directory',
+    type=click.Path(),
+    default=None,
+    help=constants.TRANSFORM_CACHE_DIR_HELP
+)
+@click.pass_context
+def cli(context, directory):
+    """Inspect or clear the transform cache"""
+    context.obj = TransformCache(directory)
+
+
+@cli.command()
+@click.pass_obj
+def stats(cache):
+    """Print the size of the cache and its entries, the oldest first"""
+    summary = cache.stats()
+    click.echo(
+        f"{summary['entries']} entries, {summary['bytes'] / 1e6:.1f} of "
+        f"{summary['max_bytes'] / 1e6:.0f} MB, {summary['hits']} hits in {summary['directory']}"
+    )
+    for entry in cache.entries():
+        click.echo(
+            f"{entry['key'][:12]} {entry['bytes'] / 1e6:>9.1f} MB "
+            f"{entry['hits']:>5} hits  last used "
+            f"{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(entry['last_used']))}  "
+            f"{entry.get('input', '')} {tuple(entry['shape'])}"
+        )
+
+
+@cli.command()
+@click.pass_obj
+def clear(cache):
+    """Remove every entry of the cache"""
+    cache.clear()
+    click.echo(f"Cleared {cache.directory}")
+
+
+if __name__ == '__main__':
+    # pylint: disable=no-value-for-parameter
+    cli()
@@ -0,0 +1,66 @@
+"""
+Score a large CSV or Parquet file with the lasso model, streaming it in
+fixed size chunks and writing the predictions incrementally
+"""
+import functools
+import click
+
+from houses_pipeline import constants
+from houses_pipeline.config.logging import LoggingHandler
+
+
+logger = LoggingHandler.get_logger(__name__)
+
+
+@click.command()
+@click.argument('input_filepath', type=click.Path(exists=True))
+@click.argument('output_filepath', type=click.Path())
+@click.option(
+    '--chunksize',
+    'chunksize',
+    required=False,
+    default=constants.DEFAULT_PREDICT_CHUNKSIZE,
+    help=constants.CHUNKSIZE_HELP
+)
+@click.option(
+    '--mode',
+    'mode',
+    type=click.Choice(constants.PREDICT_MODES),
+    default=constants.DEFAULT_PREDICT_MODE,
+    help=constants.PREDICT_MODE_HELP
+)
+@click.option(
+    '--workers',
+    'workers',
+    required=False,
+    default=1,
+    help=constants.WORKERS_HELP
+)
+def main(
+    input_filepath: str, output_filepath: str, chunksize: int, mode: str,
+    workers: int
+):
+    """Score the input file and write the predictions to the output file"""
+    # the model and its dependencies are only imported when scoring
+    # pylint: disable=import-outside-toplevel
+    from houses_pipeline.predict import lasso
+    from houses_pipeline.predict.batch import score_file
+
+    logger.info("Scoring %s into %s", input_filepath, output_filepath)
+    if workers > 1:
+        # load the model before the workers are forked, so they share it
+        # instead of each loading its own copy
+        lasso.warm_up()
+
+    score_file(
+        input_filepath,
+        output_filepath,
+        score=functools.partial(lasso.predict_frame, mode=mode),
+        chunksize=chunksize,
+        workers=workers
+    )
+
+
+if __name__ == '__main__':
+    # pylint: disable=no-value-for-parameter
+    main()
@@ -0,0 +1,251 @@
+"""
+Score large CSV, Parquet or Feather files in fixed size chunks, so that the memory
+stays bounded by the chunk size no matter how big the input file is.
+
+Files can also be split into row ranges scored by a pool of processes. The
+workers are forked from the calling process, so a model it loaded before
+scoring is shared (read-only) instead of unpickled for every task.
+"""
+import collections
+import gc
+import io
+import time
+from typing import Callable, Iterator, Tuple
+
+import pandas as pd
+
+from ..config.logging import LoggingHandler
+from ..io import FrameWriter, arrow_to_pandas, file_format, import_pyarrow
+from ..io import read_chunks, read_columns
+from ..utils import process_context
+
+_logger = LoggingHandler.get_logger(__name__)
+
+# the column identifying the scored rows in the output
+ID_COLUMN = 'Id'
+
+
+def _csv_row_ranges(filepath, chunksize: int):
+    """
+    Split a CSV file into byte ranges of about `chunksize` rows each, every
+    range starting at the beginning of a line. Assumes no quoted newlines.
+    """
+    with open(filepath, 'rb') as csv_file:
+        header = csv_file.readline()
+        data_start = csv_file.tell()
+        sample = [csv_file.readline() for _ in range(1000)]
+        csv_file.seek(0, io.SEEK_END)
+        file_end = csv_file.tell()
+
+        sample_bytes = sum(map(len, sample))
+        rows = sum(1 for line in sample if line)
+        range_bytes = max(1, sample_bytes * chunksize // max(rows, 1))
+
+        start = data_start
+        while start < file_end:
+            csv_file.seek(min(start + range_bytes, file_end))
+            # move the end of the range to the end of the current line
+            csv_file.readline()
+            end = csv_file.tell()
+            yield ('.csv', header, start, end)
+            start = end
+
+
+def _parquet_row_ranges(filepath, chunksize: int):
+    """
+    Split a parquet file into its row groups, read by the workers. Row groups
+    of more than `chunksize` rows are decoded here in batches of `chunksize`
+    rows instead, as a row group can only be read whole, so that neither
+    process holds more than a chunk of them.
+    """
+    parquet_file = import_pyarrow().parquet.ParquetFile(filepath)
+    for row_group in range(parquet_file.num_row_groups):
+        if parquet_file.metadata.row_group(row_group).num_rows <= chunksize:
+            yield ('.parquet', row_group)
+        else:
+            for batch in parquet_file.iter_batches(
+                batch_size=chunksize, row_groups=[row_group]
+            ):
+                yield ('.arrow', batch)
+
+
+def _feather_row_ranges(filepath, chunksize: int):
+    """
+    Split a feather file into slices of at most `chunksize` rows of the
+    record batches it was written with
+    """
+    with import_pyarrow().memory_map(str(filepath)) as source:
+        reader = import_pyarrow().ipc.open_file(source)
+        batch_rows = [
+            reader.get_batch(batch).num_rows for batch in range(reader.num_record_batches)
+        ]
+    for batch, rows in enumerate(batch_rows):
+        for start in range(0, rows, chunksize):
+            yield ('.feather', batch, start, min(chunksize, rows - start))
+
+
+def row_ranges(filepath, chunksize: int):
+    """Split a file into row ranges of about `chunksize` rows, read independently"""
+    suffix = file_format(filepath)
+    if suffix == '.csv':
+        return _csv_row_ranges(filepath, chunksize)
+    if suffix == '.feather':
+        return _feather_row_ranges(filepath, chunksize)
+    return _parquet_row_ranges(filepath, chunksize)
+
+
+def read_row_range(filepath, row_range) -> pd.DataFrame:
+    """Read a single row range of a file, indexed from zero"""
+    if row_range[0] == '.csv':
+        _, header, start, end = row_range
+        with open(filepath, 'rb') as csv_file:
+            csv_file.seek(start)
+            data = csv_file.read(end - start)
+        return pd.read_csv(io.BytesIO(header + data))
+
+    if row_range[0] == '.arrow':
+        # a batch already decoded from the file
+        return arrow_to_pandas(row_range[1])
+
+    pyarrow = import_pyarrow()
+    if row_range[0] == '.feather':
+        # the slice of the memory mapped batch only touches its own pages
+        _, batch, start, length = row_range
+        with pyarrow.memory_map(str(filepath)) as source:
+            return arrow_to_pandas(
+                pyarrow.ipc.open_file(source).get_batch(batch).slice(start, length)
+            )
+
+    _, row_group = row_range
+    parquet_file = pyarrow.parquet.ParquetFile(filepath)
+    return arrow_to_pandas(parquet_file.read_row_group(row_group))
+
+
+def score_chunks(
+    chunks: Iterator[pd.DataFrame],
+    score: Callable[[pd.DataFrame], pd.Series]
+) -> Iterator[Tuple[int, pd.DataFrame]]:
+    """
+    Score every chunk, yielding the number of input rows together with the
+    identifiers and the predictions of the rows which passed the validation
+    """
+    for chunk in chunks:
+        yield len(chunk), to_output_frame(chunk, score(chunk))
+
+
+def to_output_frame(chunk: pd.DataFrame, predictions: pd.Series) -> pd.DataFrame:
+    """Pair the predictions with the identifiers of their input rows"""
+    identifiers = (
+        chunk[ID_COLUMN].loc[predictions.index].to_numpy()
+        if ID_COLUMN in chunk.columns
+        else predictions.index.to_numpy()
+    )
+    return pd.DataFrame({
+        ID_COLUMN: identifiers,
+        'prediction': predictions.to_numpy()
+    })
+
+
+# the state every scoring process inherits from its parent
+_worker_state = {}
+
+
+def _init_worker(filepath, score):
+    """Keep the file to read and the scoring function in the worker"""
+    _worker_state['filepath'] = filepath
+    _worker_state['score'] = score
+
+
+def _score_row_range(row_range) -> Tuple[int, pd.DataFrame]:
+    """Read and score a row range inside a worker"""
+    chunk = read_row_range(_worker_state['filepath'], row_range)
+    return len(chunk), to_output_frame(chunk, _worker_state['score'](chunk))
+
+
+def score_row_ranges_parallel(
+    filepath,
+    score: Callable[[pd.DataFrame], pd.Series],
+    chunksize: int,
+    workers: int
+) -> Iterator[Tuple[int, pd.DataFrame]]:
+    """
+    Score the row ranges of a file in a pool of `workers` processes, yielding
+    the results in the order of the file. At most two ranges per worker are
+    in flight, so the memory stays bounded as with serial scoring.
+    """
+    with_row_numbers = ID_COLUMN not in read_columns(filepath)
+    offset = 0
+
+    def in_file_order(result):
+        nonlocal offset
+        chunk_rows, predictions = result
+        if with_row_numbers:
+            # workers number the rows from zero within their range
+            predictions[ID_COLUMN] += offset
+        offset += chunk_rows
+        return chunk_rows, predictions
+
+    # objects alive before forking are never collected by the workers,
+    # so the garbage collector does not touch (and copy) their pages
+    gc.freeze()
+    try:
+        with process_context().Pool(
+            workers, _init_worker, (filepath, score)
+        ) as pool:
+            pending = collections.deque()
+            for row_range in row_ranges(filepath, chunksize):
+                pending.append(pool.apply_async(_score_row_range, (row_range,)))
+                if len(pending) >= 2 * workers:
+                    yield in_file_order(pending.popleft().get())
+            while pending:
+                yield in_file_order(pending.popleft().get())
+    finally:
+        gc.unfreeze()
+
+
+def score_file(
+    input_filepath, output_filepath, *,
+    score: Callable[[pd.DataFrame], pd.Series],
+    chunksize: int,
+    workers: int = 1
+) -> dict:
+    """
+    Stream an input file through `score` chunk by chunk, writing the
+    predictions incrementally. With more than one worker the row ranges
+    of the file are read and scored in parallel processes.
+    Returns the throughput statistics.
+    """
+    start = time.perf_counter()
+    input_rows, scored_rows = 0, 0
+    if workers > 1:
+        scored = score_row_ranges_parallel(
+            input_filepath, score, chunksize=chunksize, workers=workers
+        )
+    else:
+        chunks = read_chunks(input_filepath, chunksize=chunksize)
+        scored = score_chunks(chunks, score)
+
+    with FrameWriter(output_filepath) as writer:
+        for chunk_rows, predictions in scored:
+            input_rows += chunk_rows
+            scored_rows += len(predictions)
+            writer.write(predictions)
+
+            elapsed = time.perf_counter() - start
+            _logger.debug(
+                "Scored %d rows, %.0f rows/s", scored_rows, scored_rows / elapsed
+            )
+
+    elapsed = time.perf_counter() - start
+    stats = {
+        'input_rows': input_rows,
+        'scored_rows': scored_rows,
+        'seconds': elapsed,
+        'rows_per_second': input_rows / elapsed if elapsed else float('nan'),
+        'workers': workers,
+    }
+    _logger.info(
+        "Scored %d of %d rows in %.2fs (%.0f rows/s)",
+        scored_rows, input_rows, elapsed, stats['rows_per_second']
+    )
+    return stats
@@ -0,0 +1,206 @@
+"""
+A cache of predictions keyed by a canonical hash of the validated feature
+rows and of the artifacts scoring them, so that listings queried again
+within the TTL are not scored again and a new model never serves stale
+predictions. The cache lives in the process, optionally backed by a sqlite
+file shared by the processes (e.g. the server workers) of a machine.
+"""
+import collections
+import contextlib
+import hashlib
+import sqlite3
+import threading
+import time
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from pandas.util import hash_array
+
+from ..config import config
+
+# odd multipliers mixing the hash of a value with the position of its column
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+# the most keys in a single sqlite query
+_SQLITE_CHUNK = 500
+
+
+def hash_rows(
+    input_df: pd.DataFrame, salt: str = '', columns: Optional[Sequence[str]] = None
+) -> np.ndarray:
+    """
+    A uint64 hash of every row, the same whatever the order of the columns
+    and whether the numbers are integers or floats. The salt (e.g. the key
+    of the model) gives another hash to the same rows. Only the given
+    `columns` are hashed (e.g. the features of the model, so that the Id or
+    other keys of a listing do not change its hash), by default all of them.
+    """
+    # the hash key of hash_array only changes the hashes of objects
+    salted = np.frombuffer(hashlib.sha256(salt.encode()).digest()[:8], dtype=np.uint64)
+    columns = sorted(
+        input_df.columns if columns is None else set(columns).intersection(input_df.columns)
+    )
+    numeric = np.array([input_df[column].dtype.kind in 'biuf' for column in columns])
+    multipliers = (np.arange(1, len(columns) + 1, dtype=np.uint64) * _GOLDEN) | np.uint64(1)
+
+    hashes = np.full(len(input_df), salted[0], dtype=np.uint64)
+    for block, dtype in ((numeric, np.float64), (~numeric, object)):
+        if not block.any():
+            continue
+        values = input_df[[column for column, in_block in zip(columns, block) if in_block]]
+        values = values.to_numpy(dtype=dtype)
+        # one call for the whole block, rather than one per column
+        hashed = hash_array(values.ravel()).reshape(values.shape)
+        with np.errstate(over='ignore'):
+            hashes += (hashed * multipliers[block]).sum(axis=1, dtype=np.uint64)
+    return hashes
+
+
+class SqliteStore:
+    """Predictions shared through a sqlite file, expiring after a TTL"""
+
+    def __init__(self, path, ttl: float = config.PREDICTION_CACHE_TTL):
+        self.path = str(path)
+        self.ttl = ttl
+        with self._connect() as connection:
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS predictions '
+                '(key INTEGER PRIMARY KEY, prediction REAL, expires REAL)'
+            )
+
+
+    @contextlib.contextmanager
+    def _connect(self):
+        """A connection committing (or rolling back) and closing when done"""
+        connection = sqlite3.connect(self.path, timeout=5.0)
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+
+    def get_many(self, keys: np.ndarray) -> dict:
+        """The unexpired predictions of the keys found"""
+        # sqlite integers are signed
+        signed = keys.view(np.int64).tolist()
+        found = {}
+        with self._connect() as connection:
+            for start in range(0, len(signed), _SQLITE_CHUNK):
+                chunk = signed[start:start + _SQLITE_CHUNK]
+                found.update(connection.execute(
+                    'SELECT key, prediction FROM predictions WHERE expires > ? '
+                    f'AND key IN ({",".join("?" * len(chunk))})',
+                    [time.time(), *chunk]
+                ).fetchall())
+        return found
+
+
+    def put_many(self, keys: np.ndarray, predictions: np.ndarray):
+        """Store predictions, dropping the expired ones"""
+        now = time.time()
+        with self._connect() as connection:
+            connection.execute('DELETE FROM predictions WHERE expires <= ?', (now,))
+            connection.executemany(
+                'INSERT OR REPLACE INTO predictions VALUES (?, ?, ?)',
+                zip(keys.view(np.int64).tolist(), predictions.tolist(),
+                    [now + self.ttl] * len(keys))
+            )
+
+
+class PredictionCache:
+    """
+    An LRU cache of up to `capacity` predictions expiring after `ttl`
+    seconds, in front of an optional shared store
+    """
+
+    def __init__(
+        self,
+        capacity: int = config.PREDICTION_CACHE_SIZE,
+        ttl: float = config.PREDICTION_CACHE_TTL,
+        store: Optional[SqliteStore] = None
+    ):
+        self.capacity = capacity
+        self.ttl = ttl
+        self.store = store
+        # key -> (prediction, expiry time), least recent first
+        self._predictions = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+
+    def lookup(self, keys: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """The cached predictions of the keys (NaN if missing) and which are hits"""
+        predictions = np.full(len(keys), np.nan)
+        hits = np.zeros(len(keys), dtype=bool)
+        now = time.monotonic()
+        with self._lock:
+            for position, key in enumerate(keys.tolist()):
+                cached = self._predictions.get(key)
+                if cached is None:
+                    continue
+                if cached[1] <= now:
+                    del self._predictions[key]
+                    self.expirations += 1
+                    continue
+                self._predictions.move_to_end(key)
+                predictions[position], hits[position] = cached[0], True
+
+        if self.store is not None and not hits.all():
+            found = self.store.get_many(keys[~hits])
+            if found:
+                shared = np.array([
+                    key in found for key in keys.view(np.int64).tolist()
+                ]) & ~hits
+                predictions[shared] = [
+                    found[key] for key in keys[shared].view(np.int64).tolist()
+                ]
+                hits |= shared
+                self._remember(keys[shared], predictions[shared])
+
+        with self._lock:
+            self.hits += int(hits.sum())
+            self.misses += int(len(keys) - hits.sum())
+        return predictions, hits
+
+
+    def store_many(self, keys: np.ndarray, predictions: np.ndarray):
+        """Cache the predictions of the keys"""
+        self._remember(keys, predictions)
+        if self.store is not None:
+            self.store.put_many(keys, predictions)
+
+
+    def _remember(self, keys: np.ndarray, predictions: np.ndarray):
+        """Cache predictions in the process, evicting the least recent"""
+        expires = time.monotonic() + self.ttl
+        with self._lock:
+            for key, prediction in zip(keys.tolist(), predictions.tolist()):
+                self._predictions[key] = (prediction, expires)
+                self._predictions.move_to_end(key)
+            while len(self._predictions) > self.capacity:
+                self._predictions.popitem(last=False)
+                self.evictions += 1
+
+
+    def clear(self):
+        """Forget the predictions cached in the process"""
+        with self._lock:
+            self._predictions.clear()
+
+
+    def stats(self) -> dict:
+        """The counters of the cache"""
+        with self._lock:
+            return {
+                'size': len(self._predictions),
+                'capacity': self.capacity,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+            }
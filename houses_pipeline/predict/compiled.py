@@ -0,0 +1,329 @@
+"""
+Compile a fitted lasso pipeline into a flat, NumPy-only scoring plan.
+
+At inference the lasso is only a dot product with mostly zero coefficients,
+so instead of running every transformer of the sklearn pipeline we precompute:
+
+* per-column elementwise operations (imputation, affine scaling and
+  Yeo-Johnson) for the numerical features with a non-zero coefficient
+* category -> coefficient lookup tables in place of the one-hot and the
+  ordinal encoded matrices
+* the coefficients of the passthrough columns
+* the inverse of the target transformation, inlined after the dot product
+"""
+import numpy as np
+import pandas as pd
+from sklearn.impute import SimpleImputer
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder, OrdinalEncoder
+from sklearn.preprocessing import PowerTransformer, StandardScaler
+
+from ..transformers import RareCategoriesReplacer
+
+
+_EPSILON = np.spacing(1.0)
+
+
+def _yeo_johnson(x, lambdas):
+    """Vectorised Yeo-Johnson transform with a lambda per column"""
+    positive = x >= 0
+    x_pos = np.where(positive, x, 0.0)
+    x_neg = np.where(positive, 0.0, x)
+
+    lambda_zero = np.abs(lambdas) < _EPSILON
+    lambda_two = np.abs(lambdas - 2) < _EPSILON
+    safe_lambdas = np.where(lambda_zero, 1.0, lambdas)
+    safe_complements = np.where(lambda_two, 1.0, 2 - lambdas)
+
+    out_pos = np.where(
+        lambda_zero,
+        np.log1p(x_pos),
+        (np.power(x_pos + 1, safe_lambdas) - 1) / safe_lambdas
+    )
+    out_neg = np.where(
+        lambda_two,
+        -np.log1p(-x_neg),
+        -(np.power(-x_neg + 1, safe_complements) - 1) / safe_complements
+    )
+    return np.where(positive, out_pos, out_neg)
+
+
+def _inverse_yeo_johnson(x, lambdas):
+    """Vectorised inverse of the Yeo-Johnson transform"""
+    positive = x >= 0
+    x_pos = np.where(positive, x, 0.0)
+    x_neg = np.where(positive, 0.0, x)
+
+    lambda_zero = np.abs(lambdas) < _EPSILON
+    lambda_two = np.abs(lambdas - 2) < _EPSILON
+    safe_lambdas = np.where(lambda_zero, 1.0, lambdas)
+    safe_complements = np.where(lambda_two, 1.0, 2 - lambdas)
+
+    out_pos = np.where(
+        lambda_zero,
+        np.expm1(x_pos),
+        np.power(x_pos * safe_lambdas + 1, 1 / safe_lambdas) - 1
+    )
+    out_neg = np.where(
+        lambda_two,
+        -np.expm1(-x_neg),
+        1 - np.power(-safe_complements * x_neg + 1, 1 / safe_complements)
+    )
+    return np.where(positive, out_pos, out_neg)
+
+
+def _impute(x, values):
+    """Replace missing values with a value per column"""
+    return np.where(np.isnan(x), values, x)
+
+
+def _affine(x, shift, scale):
+    """Compute (x - shift) / scale per column"""
+    return (x - shift) / scale
+
+
+def _inverse_affine(x, shift, scale):
+    """Compute x * scale + shift per column"""
+    return x * scale + shift
+
+
+_OPERATIONS = {
+    'impute': _impute,
+    'affine': _affine,
+    'inverse_affine': _inverse_affine,
+    'yeo_johnson': _yeo_johnson,
+    'inverse_yeo_johnson': _inverse_yeo_johnson,
+}
+
+
+def _apply(operations, values):
+    """Apply a sequence of compiled elementwise operations"""
+    for name, params in operations:
+        values = _OPERATIONS[name](values, *params)
+    return values
+
+
+def _scaler_params(scaler):
+    """The (shift, scale) pair of a fitted standard scaler"""
+    n_features = scaler.n_features_in_
+    shift = scaler.mean_ if scaler.mean_ is not None else np.zeros(n_features)
+    scale = scaler.scale_ if scaler.scale_ is not None else np.ones(n_features)
+    return shift, scale
+
+
+def _compile_elementwise(estimator):
+    """Compile a fitted elementwise (numerical) transformer into operations"""
+    steps = estimator.steps if isinstance(estimator, Pipeline) else [(None, estimator)]
+    operations = []
+    for _, step in steps:
+        if isinstance(step, SimpleImputer):
+            imputes_nan = (
+                isinstance(step.missing_values, float) and
+                np.isnan(step.missing_values)
+            )
+            if step.add_indicator or not imputes_nan:
+                raise ValueError(f"Cannot compile the imputer {step}")
+            operations.append(('impute', (step.statistics_.astype(float),)))
+        elif isinstance(step, StandardScaler):
+            operations.append(('affine', _scaler_params(step)))
+        elif isinstance(step, PowerTransformer):
+            if step.method != 'yeo-johnson':
+                raise ValueError(f"Cannot compile the power transform {step}")
+            operations.append(('yeo_johnson', (step.lambdas_,)))
+            if step.standardize:
+                # the power transformer standardises with an inner scaler
+                # pylint: disable=protected-access
+                operations.append(('affine', _scaler_params(step._scaler)))
+        else:
+            raise ValueError(f"Cannot compile the transformer {step}")
+    return operations
+
+
+def _invert(operations):
+    """Invert a sequence of compiled elementwise operations"""
+    inverses = {'affine': 'inverse_affine', 'yeo_johnson': 'inverse_yeo_johnson'}
+    inverted = []
+    for name, params in reversed(operations):
+        if name not in inverses:
+            raise ValueError(f"Cannot invert the operation {name}")
+        inverted.append((inverses[name], params))
+    return inverted
+
+
+def _subset(operations, mask):
+    """Keep the per-column parameters of the masked columns only"""
+    return [
+        (name, tuple(np.asarray(param)[mask] for param in params))
+        for name, params in operations
+    ]
+
+
+def _one_hot_lookups(estimator, columns, coefs):
+    """Category -> coefficient lookup tables of a (rare replaced) one hot"""
+    steps = estimator.steps if isinstance(estimator, Pipeline) else [(None, estimator)]
+    replacer, encoder = None, None
+    for _, step in steps:
+        if isinstance(step, RareCategoriesReplacer):
+            replacer = step
+        elif isinstance(step, OneHotEncoder):
+            encoder = step
+        else:
+            raise ValueError(f"Cannot compile the transformer {step}")
+    if encoder is None or encoder.drop_idx_ is not None:
+        raise ValueError(f"Cannot compile the categorical transformer {estimator}")
+
+    lookups = []
+    offset = 0
+    for i, column in enumerate(columns):
+        categories = encoder.categories_[i]
+        contributions = pd.Series(
+            coefs[offset:offset + len(categories)], index=categories
+        )
+        offset += len(categories)
+
+        if replacer is None:
+            kept = contributions
+            fallback = np.nan
+        else:
+            kept_categories = replacer.categories_to_keep[i]
+            kept = contributions[contributions.index.isin(kept_categories)]
+            # rare and unseen categories are replaced with the keyword
+            fallback = contributions.get(replacer.keyword, np.nan)
+        if encoder.handle_unknown == 'ignore' and np.isnan(fallback):
+            fallback = 0.0
+        lookups.append((column, kept.index, kept.to_numpy(), fallback))
+    return lookups
+
+
+def _ordinal_lookups(encoder, columns, coefs):
+    """Category -> coefficient lookup tables of an ordinal encoding"""
+    if not isinstance(encoder, OrdinalEncoder):
+        raise ValueError(f"Cannot compile the transformer {encoder}")
+    fallbacks = (
+        coefs * encoder.unknown_value
+        if encoder.handle_unknown == 'use_encoded_value'
+        else np.full(len(columns), np.nan)
+    )
+    return [
+        (column, pd.Index(categories), coef * np.arange(len(categories)), fallback)
+        for column, categories, coef, fallback
+        in zip(columns, encoder.categories_, coefs, fallbacks)
+    ]
+
+
+class LassoScoringPlan:
+    """
+    A flat scoring plan producing the predictions of a fitted lasso pipeline
+    using only NumPy operations and hash lookups
+    """
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self, *, intercept, numerical_columns, numerical_operations,
+        numerical_coefs, lookups, passthrough_columns, passthrough_coefs,
+        target_operations
+    ):
+        self.intercept = intercept
+        self.numerical_columns = numerical_columns
+        self.numerical_operations = numerical_operations
+        self.numerical_coefs = numerical_coefs
+        self.lookups = [
+            # the fallback goes last, so that a -1 (unknown) code selects it
+            (column, categories, np.append(contributions, fallback))
+            for column, categories, contributions, fallback in lookups
+        ]
+        self.passthrough_columns = passthrough_columns
+        self.passthrough_coefs = passthrough_coefs
+        self.target_operations = target_operations
+
+
+    @property
+    def n_features(self):
+        """The number of input columns the plan actually reads"""
+        return (
+            len(self.numerical_columns) + len(self.lookups) +
+            len(self.passthrough_columns)
+        )
+
+
+    def predict(self, df: pd.DataFrame) -> np.ndarray:
+        """Score a preprocessed dataframe"""
+        numericals = df[self.numerical_columns].to_numpy(dtype=float)
+        prediction = self.intercept + _apply(
+            self.numerical_operations, numericals
+        ) @ self.numerical_coefs
+
+        for column, categories, contributions in self.lookups:
+            codes = categories.get_indexer(df[column])
+            if np.isnan(contributions[-1]) and (codes == -1).any():
+                raise ValueError(f"Found unknown categories in column {column}")
+            prediction += contributions[codes]
+
+        passthrough = df[self.passthrough_columns].to_numpy(dtype=float)
+        prediction += passthrough @ self.passthrough_coefs
+
+        return _apply(self.target_operations, prediction.reshape(-1, 1)).ravel()
+
+
+def export_scoring_plan(pipeline: Pipeline) -> LassoScoringPlan:
+    """
+    Export a fitted lasso pipeline (column transformations followed by a
+    target transformed linear regressor) into a flat scoring plan
+    """
+    column_transformer, model = pipeline[0], pipeline[-1]
+    regressor = model.regressor_
+    coefs = np.ravel(regressor.coef_)
+    intercept = float(np.ravel(regressor.intercept_)[0])
+
+    numerical_columns, numerical_operations, numerical_coefs = [], [], np.array([])
+    lookups, passthrough_columns, passthrough_coefs = [], [], np.array([])
+
+    for name, transformer, columns in column_transformer.transformers_:
+        if transformer == 'drop':
+            continue
+        if name == 'remainder':
+            columns = column_transformer.feature_names_in_[columns]
+        columns = list(columns)
+        branch_coefs = coefs[column_transformer.output_indices_[name]]
+
+        if transformer == 'passthrough':
+            nonzero = branch_coefs != 0
+            passthrough_columns += list(np.array(columns)[nonzero])
+            passthrough_coefs = np.append(passthrough_coefs, branch_coefs[nonzero])
+        elif isinstance(transformer, OrdinalEncoder):
+            lookups += _ordinal_lookups(transformer, columns, branch_coefs)
+        elif (
+            isinstance(transformer, Pipeline) and
+            isinstance(transformer.steps[-1][1], OneHotEncoder)
+        ):
+            lookups += _one_hot_lookups(transformer, columns, branch_coefs)
+        else:
+            if numerical_columns:
+                raise ValueError("Cannot compile more than one numerical branch")
+            nonzero = branch_coefs != 0
+            operations = _subset(_compile_elementwise(transformer), nonzero)
+            numerical_coefs = branch_coefs[nonzero]
+            # fold a trailing affine into the coefficients and the intercept
+            if operations and operations[-1][0] == 'affine':
+                (_, (shift, scale)) = operations.pop()
+                numerical_coefs = numerical_coefs / scale
+                intercept -= float(shift @ numerical_coefs)
+            numerical_columns = list(np.array(columns)[nonzero])
+            numerical_operations = operations
+
+    # lookups that add nothing wherever they are looked up are dropped,
+    # so unknown categories of such columns are no longer rejected
+    lookups = [
+        lookup for lookup in lookups
+        if np.any(lookup[2] != 0) or np.nan_to_num(lookup[3]) != 0
+    ]
+
+    return LassoScoringPlan(
+        intercept=intercept,
+        numerical_columns=numerical_columns,
+        numerical_operations=numerical_operations,
+        numerical_coefs=numerical_coefs,
+        lookups=lookups,
+        passthrough_columns=passthrough_columns,
+        passthrough_coefs=passthrough_coefs,
+        target_operations=_invert(_compile_elementwise(model.transformer_)),
+    )
@@ -1,54 +1,163 @@
 """Main pipeline endpoint for producing predictions with the lasso model"""
-from typing import Union
+from typing import Optional, Union
 
 import numpy as np
 import pandas as pd
 
 from .. import __version__
+from .. import constants
+from .. import metrics
 from ..validation import validate_inputs
 
 from ..config import config
 from ..config.logging import LoggingHandler
 
-from .. import load_preprocess_pipeline
-from .. import load_model
-from .. import constants
+from ..registry import ModelRegistry
+from .cache import PredictionCache, hash_rows
+from .compiled import export_scoring_plan
 
 
 
 _logger = LoggingHandler.get_logger(__name__)
 
-# load the preprocessor
-preprocessor = load_preprocess_pipeline()
 
-# load the model
-lasso_model_filnename = f"{config.LASSO_SAVE_FILENAME}_{__version__}.pkl"
-lasso_model = load_model(model_name=lasso_model_filnename)
+def _prepare_artifacts(preprocessor, lasso_model):
+    """
+    Time the loaded preprocessor and lasso pipeline (its column transformer
+    branches and its final step), and compile its NumPy only scoring plan
+    """
+    # compiled first, as the timing wraps the steps of the pipeline
+    scoring_plan = export_scoring_plan(lasso_model)
+    return (
+        metrics.instrument(preprocessor, prefix='preprocess'),
+        metrics.instrument(lasso_model, 'lasso'),
+        scoring_plan
+    )
+
+
+def create_registry(directory=None, **options) -> ModelRegistry:
+    """
+    A registry of the artifacts in a models directory, loading the
+    preprocessor and the lasso pipeline as a single artifact, so that they
+    are always swapped in together
+    """
+    artifacts_registry = ModelRegistry(directory, **options)
+    artifacts_registry.register(
+        config.LASSO_SAVE_FILENAME, _prepare_artifacts,
+        files=(config.PREPROCESS_SAVE_FILENAME, config.LASSO_SAVE_FILENAME)
+    )
+    return artifacts_registry
+
+
+# the loaded artifacts, reloaded when a new artifact is dropped in the
+# models directory (see registry.watch)
+registry = create_registry()
+
+
+def load_artifacts():
+    """
+    Get the current preprocessor (fitted once at training time and only
+    used for transforming here), lasso pipeline and scoring plan, all from
+    the same deployment. They are loaded on first use, see `warm_up` to load
+    them ahead of requests.
+    """
+    return registry.get(config.LASSO_SAVE_FILENAME, __version__)
 
 
-def predict(*, input_data: Union[pd.DataFrame, dict]) -> dict:
+def warm_up():
+    """Load the artifacts, so the first request does not wait for them"""
+    load_artifacts()
+
+
+PREDICT_MODES = constants.PREDICT_MODES
+
+
+def _cache_salt(mode: str) -> str:
+    """Tell the predictions of other artifacts or modes apart in a cache"""
+    return repr((registry.key(config.LASSO_SAVE_FILENAME, __version__), mode))
+
+
+def predict_frame(
+    input_df: pd.DataFrame,
+    mode: str = 'pipeline',
+    cache: Optional[PredictionCache] = None
+) -> pd.Series:
+    """Validate, preprocess and score a dataframe.
+
+    Args:
+        input_df: Model prediction inputs.
+        mode: Either 'pipeline' to score with the sklearn pipeline or
+            'compiled' to score with the equivalent NumPy scoring plan.
+        cache: Cache of the predictions of the rows already scored, in
+            which case only the rows missing from it are scored.
+
+    Returns:
+        Predictions indexed by the input rows which passed validation.
+    """
+
+    if mode not in PREDICT_MODES:
+        raise ValueError(f"Unknown predict mode {mode}, use one of {PREDICT_MODES}")
+
+    preprocessor, lasso_model, scoring_plan = load_artifacts()
+    with metrics.timed('validate_inputs'):
+        validated_df, drop_counts = validate_inputs(
+            input_data=input_df, return_counts=True
+        )
+    if drop_counts['total']:
+        _logger.info("Dropped invalid rows: %s", drop_counts)
+
+    if cache is None:
+        predictions = _score(validated_df, mode, preprocessor, lasso_model, scoring_plan)
+    else:
+        with metrics.timed('cache_lookup'):
+            keys = hash_rows(
+                validated_df, salt=_cache_salt(mode), columns=lasso_model.feature_names_in_
+            )
+            predictions, hits = cache.lookup(keys)
+        if not hits.all():
+            missing = ~hits
+            predictions[missing] = _score(
+                validated_df[missing], mode, preprocessor, lasso_model, scoring_plan
+            )
+            cache.store_many(keys[missing], predictions[missing])
+
+    return pd.Series(predictions, index=validated_df.index, name='prediction')
+
+
+def _score(validated_df, mode, preprocessor, lasso_model, scoring_plan) -> np.ndarray:
+    """Preprocess and score validated rows"""
+    if validated_df.empty:
+        # the sklearn transformers refuse empty inputs
+        return np.empty(0)
+    processed_df = preprocessor.transform(validated_df)
+    if mode == 'compiled':
+        with metrics.timed('compiled.predict'):
+            return scoring_plan.predict(processed_df)
+    return lasso_model.predict(processed_df)
+
+
+def predict(
+    *,
+    input_data: Union[pd.DataFrame, dict],
+    mode: str = 'pipeline',
+    cache: Optional[PredictionCache] = None
+) -> dict:
     """Make a prediction using a saved model pipeline.
 
     Args:
         input_data: Array of model prediction inputs.
+        mode: Either 'pipeline' to score with the sklearn pipeline or
+            'compiled' to score with the equivalent NumPy scoring plan.
+        cache: Cache of the predictions of the rows already scored.
 
     Returns:
         Predictions for each input row, as well as the model version.
     """
 
-    # load the data and validate it
+    # load the data, validate it and produce predictions
     input_df = pd.DataFrame(input_data)
-    validated_df = validate_inputs(input_data=input_df)
-
-    # preprocess the data
-    to_impute = np.append(constants.CATEGORICAL_COLUMNS, constants.ORDINALS)
-    processed_df = preprocessor.fit_transform(
-        validated_df, impute_missing_categories__columns=to_impute
-    )
-
-    # produce predictions
     _logger.info("Making predictions with model version: %s", __version__)
-    predictions = lasso_model.predict(processed_df).tolist()
+    predictions = predict_frame(input_df, mode=mode, cache=cache).tolist()
 
     result = {
         'predictions': predictions,
@@ -4,15 +4,12 @@ in the modelling step of the pipeline
 """
 # general utilities
 import logging
-import pandas as pd
-import numpy as np
 import click
 
 # sklearn pipeline modules
 # internal modules
 from houses_pipeline import constants
 from houses_pipeline.config.logging import LoggingHandler
-from houses_pipeline.preprocess.core import load_preprocess_pipeline
 
 
 logger = LoggingHandler.get_logger(__name__)
@@ -36,26 +33,70 @@ logger = LoggingHandler.get_logger(__name__)
     default=False,
     help=constants.VERBOSE_HELP
 )
-def main(input_filepath: str, output_filepath: str, verbose: bool):
+@click.option(
+    '--chunksize',
+    'chunksize',
+    required=False,
+    default=None,
+    type=int,
+    help=constants.PREPROCESS_CHUNKSIZE_HELP
+)
+@click.option(
+    '--categorical_dtype',
+    'categorical_dtype',
+    type=click.Choice(constants.CATEGORICAL_DTYPES),
+    default=None,
+    help=constants.CATEGORICAL_DTYPE_HELP
+)
+@click.option(
+    '--numerical_dtype',
+    'numerical_dtype',
+    type=click.Choice(constants.NUMERICAL_DTYPES),
+    default=None,
+    help=constants.NUMERICAL_DTYPE_HELP
+)
+# pylint: disable=too-many-arguments
+def main(
+    input_filepath: str, output_filepath: str, verbose: bool, chunksize: int,
+    categorical_dtype: str, numerical_dtype: str
+):
     """Preprocess the dataset and turn it from the given input to the output"""
+    # pandas and sklearn are only imported when preprocessing
+    # pylint: disable=import-outside-toplevel
+    from houses_pipeline.io import read_frame, write_frame
+    from houses_pipeline.preprocess.core import load_preprocess_pipeline
+    from houses_pipeline.preprocess.core import COLUMNS_TO_IMPUTE
+    from houses_pipeline.preprocess.core import preprocess_file
+
     # click.echo() or logger.info?
     logger.info("Transforming %s to %s", input_filepath, output_filepath)
 
+    if chunksize or categorical_dtype or numerical_dtype:
+        # stream the file in two passes over its chunks, reading them
+        # with the chosen dtypes
+        preprocess_file(
+            input_filepath, output_filepath,
+            chunksize=chunksize or constants.DEFAULT_PREPROCESS_CHUNKSIZE,
+            categorical_dtype=categorical_dtype,
+            numerical_dtype=numerical_dtype,
+            verbose=verbose
+        )
+        return
+
     # load the input dataframe
-    input_df = pd.read_csv(input_filepath)
+    input_df = read_frame(input_filepath)
 
     # load the pipeline to preprocess the data
     pipeline = load_preprocess_pipeline(verbose=verbose)
 
     # transform the data
-    to_impute = np.append(constants.CATEGORICAL_COLUMNS, constants.ORDINALS)
     output_houses_dataframe = pipeline.fit_transform(
         input_df,
-        impute_missing_categories__columns=to_impute
+        impute_missing_categories__columns=COLUMNS_TO_IMPUTE
     )
 
-    # save the output to the specified path
-    output_houses_dataframe.to_csv(output_filepath, index=False)
+    # save the output to the specified path, with its schema if columnar
+    write_frame(output_houses_dataframe, output_filepath)
 
 if __name__ == '__main__':
     LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
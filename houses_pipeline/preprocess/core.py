@@ -1,20 +1,49 @@
 """The main definition of our preprocessing steps"""
+import numpy as np
+import pandas as pd
 from sklearn.pipeline import Pipeline
 from sklearn.preprocessing import FunctionTransformer
 from sklearn.impute import SimpleImputer
 from ..transformers import Pandalizer
+from ..io import FrameWriter, read_chunks, read_columns
+from ..config.logging import LoggingHandler
 from .. import constants
 
+_logger = LoggingHandler.get_logger(__name__)
+
+# categorical columns in which a missing value is a category on its own
+COLUMNS_TO_IMPUTE = np.append(constants.CATEGORICAL_COLUMNS, constants.ORDINALS)
+# what the missing categories are imputed with
+MISSING_CATEGORY = 'Missing'
+# the columns kept with their inferred dtype whatever the numerical dtype
+KEEP_DTYPE_COLUMNS = ('Id', constants.TARGET_VARIABLE_NAME)
+
+
+def drop_useless_columns(df):
+    """Drop the columns we never model on, if they are still present"""
+    # rebuilding from the remaining columns shares them with the input,
+    # where DataFrame.drop would copy all of them
+    return pd.DataFrame(
+        {
+            column: df[column] for column in df.columns
+            if column not in constants.DROP_COLUMNS
+        },
+        index=df.index,
+        copy=False
+    )
+
 
 def load_preprocess_pipeline(verbose=False):
     """Load the preprocessing pipeline"""
     preprocess_pipeline = Pipeline(
         steps=[
-            ('drop_useless_columns', FunctionTransformer(
-                lambda df: df.drop(constants.DROP_COLUMNS, axis=1))
-            ),
+            # a module level function (not a lambda) so the fitted
+            # pipeline can be pickled next to the model
+            ('drop_useless_columns', FunctionTransformer(drop_useless_columns)),
+            # only the imputed columns are rebuilt, the rest are shared
             ('impute_missing_categories', Pandalizer(
-                SimpleImputer(strategy='constant', fill_value='Missing')
+                SimpleImputer(strategy='constant', fill_value=MISSING_CATEGORY),
+                copy='shallow'
             ))
             # Usually this pipeline might also have:
             # removing duplicate rows
@@ -28,3 +57,94 @@ def load_preprocess_pipeline(verbose=False):
         verbose=verbose
     )
     return preprocess_pipeline
+
+
+def fit_preprocess_pipeline(df, verbose=False):
+    """
+    Fit the preprocessing pipeline once, so that it can be frozen and
+    only used for transforming afterwards (e.g. at serving time)
+    """
+    pipeline = load_preprocess_pipeline(verbose=verbose)
+    pipeline.fit(df, impute_missing_categories__columns=COLUMNS_TO_IMPUTE)
+    return pipeline
+
+
+def _promote(dtype, other):
+    """The dtype holding the values of both, as read_csv infers on a whole file"""
+    if object in (dtype, other):
+        return np.dtype(object)
+    return np.promote_types(dtype, other)
+
+
+def scan_dtypes(
+    filepath,
+    chunksize: int,
+    categorical_dtype: str = None,
+    numerical_dtype: str = None
+) -> dict:
+    """
+    Learn the dtypes of every column from all the chunks of a file, so that
+    the chunks are read alike (a chunk may have no value at all of a column).
+    With categorical_dtype='category' the imputed columns are categoricals
+    of all the categories of the file, and with a numerical_dtype (e.g.
+    float32) the numerical columns are read as such.
+    """
+    # the categories are collected without a string object per value
+    as_categories = dict.fromkeys(
+        np.intersect1d(COLUMNS_TO_IMPUTE, read_columns(filepath)), 'category'
+    )
+    dtypes, categories = {}, {}
+    for chunk in read_chunks(filepath, chunksize, dtype=as_categories):
+        for column, dtype in chunk.dtypes.items():
+            if isinstance(dtype, pd.CategoricalDtype):
+                categories.setdefault(column, set()).update(dtype.categories)
+                # read as strings once a chunk has any value
+                dtype = np.dtype(object if len(dtype.categories) else float)
+            dtypes[column] = _promote(dtypes.get(column, dtype), dtype)
+
+    for column, dtype in dtypes.items():
+        if categorical_dtype == 'category' and column in categories and dtype == object:
+            dtypes[column] = pd.CategoricalDtype(sorted(categories[column]))
+        elif numerical_dtype and dtype.kind in 'iuf' and column not in KEEP_DTYPE_COLUMNS:
+            dtypes[column] = np.dtype(numerical_dtype)
+    return dtypes
+
+
+def _restore_categories(df: pd.DataFrame, dtypes: dict) -> pd.DataFrame:
+    """Turn the imputed columns of categoricals back into categoricals"""
+    for column in df.columns:
+        dtype = dtypes.get(column)
+        if isinstance(dtype, pd.CategoricalDtype) and df[column].dtype == object:
+            df[column] = pd.Categorical(
+                df[column],
+                categories=dtype.categories.union([MISSING_CATEGORY])
+            )
+    return df
+
+
+def preprocess_file(
+    input_filepath, output_filepath, *,
+    chunksize: int,
+    categorical_dtype: str = None,
+    numerical_dtype: str = None,
+    verbose: bool = False
+) -> Pipeline:
+    """
+    Preprocess a CSV, Parquet or Feather file in two passes over its chunks, holding
+    a single chunk in memory at a time: the first pass learns the dtypes
+    (and the categories) of the whole file, the second one transforms and
+    writes the chunks. The imputation only fills in a constant, so once the
+    dtypes are known the first chunk is enough to fit it.
+    Returns the fitted pipeline.
+    """
+    dtypes = scan_dtypes(input_filepath, chunksize, categorical_dtype, numerical_dtype)
+    pipeline = None
+    rows = 0
+    with FrameWriter(output_filepath) as writer:
+        for chunk in read_chunks(input_filepath, chunksize, dtype=dtypes):
+            if pipeline is None:
+                pipeline = fit_preprocess_pipeline(chunk, verbose=verbose)
+            writer.write(_restore_categories(pipeline.transform(chunk), dtypes))
+            rows += len(chunk)
+    _logger.info("Preprocessed %d rows in chunks of %d", rows, chunksize)
+    return pipeline
@@ -0,0 +1,193 @@
+"""
+A cache of the trained artifacts, keyed by their name, version and content.
+An artifact may be loaded from several files (e.g. a model and the
+preprocessor it was trained with), which are then swapped in together.
+
+Numeric arrays are memory mapped from the artifact files, so processes
+loading the same artifact share its pages. New artifacts dropped in the
+models directory are loaded (and prepared) by a background watcher, and
+only swapped in once they are ready, so requests never wait for a reload.
+Artifacts must be dropped atomically (see `houses_pipeline.save_model`),
+as the memory mapped arrays of the replaced file may still be in use.
+"""
+import collections
+import hashlib
+import os
+import pathlib
+import threading
+from typing import Callable, Optional
+
+import joblib
+
+from .config import config
+from .config.logging import LoggingHandler
+from .utils import file_digest
+
+_logger = LoggingHandler.get_logger(__name__)
+
+
+def _file_signature(path):
+    """A cheap signature telling whether a file might have changed"""
+    stat = os.stat(path)
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
+class ModelRegistry:
+    """
+    An LRU cache of loaded artifacts keyed by (name, version, digest),
+    keeping track of the current artifact of every (name, version). The
+    digest is the one of the content of every file of the artifact.
+    """
+
+    def __init__(
+        self,
+        directory=None,
+        capacity: int = config.MODEL_CACHE_SIZE,
+        mmap_mode: Optional[str] = 'r'
+    ):
+        self.directory = pathlib.Path(directory or config.TRAINED_MODELS_DIR)
+        self.capacity = capacity
+        self.mmap_mode = mmap_mode
+        # (name, version, digest) -> prepared artifact, least recent first
+        self._artifacts = collections.OrderedDict()
+        # (name, version) -> (file signatures, key of the current artifact)
+        self._current = {}
+        # name -> (prepare, names of the files of the artifact)
+        self._prepare = {}
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._watcher = None
+        self._stop = threading.Event()
+        self.loads = 0
+
+
+    def path(self, name: str, version: str) -> pathlib.Path:
+        """The path of an artifact in the models directory"""
+        return self.directory / f"{name}_{version}.pkl"
+
+
+    def register(self, name: str, prepare: Callable, files: Optional[tuple] = None):
+        """
+        Prepare every loaded artifact of a name with `prepare`, e.g. to
+        compile or warm it up before it serves any request. An artifact of
+        several `files` (names of artifact files, by default only its own)
+        is prepared from all of them, as positional arguments.
+        """
+        self._prepare[name] = (prepare, tuple(files or (name,)))
+
+
+    def _paths(self, name: str, version: str) -> list:
+        """The paths of the files an artifact is loaded from"""
+        _, files = self._prepare.get(name, (None, (name,)))
+        return [self.path(file, version) for file in files]
+
+
+    def get(self, name: str, version: str):
+        """Get the current artifact of a name and version, loading it if needed"""
+        current = self._current.get((name, version))
+        if current is not None:
+            with self._lock:
+                key = current[1]
+                if key in self._artifacts:
+                    self._artifacts.move_to_end(key)
+                    return self._artifacts[key]
+        return self._load(name, version)
+
+
+    def key(self, name: str, version: str) -> Optional[tuple]:
+        """The (name, version, digest) key of the current artifact, if loaded"""
+        current = self._current.get((name, version))
+        return current and current[1]
+
+
+    def _load(self, name: str, version: str):
+        """Load (or find in the cache) the artifact currently on disk"""
+        paths = self._paths(name, version)
+        with self._load_lock:
+            signature = tuple(_file_signature(path) for path in paths)
+            current = self._current.get((name, version))
+            if current is not None and current[0] == signature:
+                with self._lock:
+                    if current[1] in self._artifacts:
+                        return self._artifacts[current[1]]
+
+            digests = [file_digest(path) for path in paths]
+            digest = digests[0] if len(digests) == 1 else hashlib.sha256(
+                ''.join(digests).encode()
+            ).hexdigest()
+            key = (name, version, digest)
+            with self._lock:
+                artifact = self._artifacts.get(key)
+            if artifact is None:
+                loaded = [joblib.load(path, mmap_mode=self.mmap_mode) for path in paths]
+                prepare, _ = self._prepare.get(name, (None, None))
+                if prepare is not None:
+                    artifact = prepare(*loaded)
+                else:
+                    artifact = loaded[0] if len(loaded) == 1 else tuple(loaded)
+                self.loads += 1
+                _logger.info("Loaded %s version %s (%s)", name, version, key[2][:12])
+
+            with self._lock:
+                self._artifacts[key] = artifact
+                self._artifacts.move_to_end(key)
+                self._current[(name, version)] = (signature, key)
+                self._evict()
+            return artifact
+
+
+    def _evict(self):
+        """Drop the least recently used artifacts over the capacity"""
+        current_keys = {key for _, key in self._current.values()}
+        for key in list(self._artifacts):
+            if len(self._artifacts) <= self.capacity:
+                break
+            if key not in current_keys:
+                del self._artifacts[key]
+
+
+    def refresh(self) -> list:
+        """
+        Reload the artifacts whose files changed since they were loaded,
+        returning the keys of the swapped in artifacts
+        """
+        swapped = []
+        for (name, version), (signature, key) in list(self._current.items()):
+            try:
+                paths = self._paths(name, version)
+                if tuple(_file_signature(path) for path in paths) == signature:
+                    continue
+                self._load(name, version)
+            except Exception:  # pylint: disable=broad-except
+                # keep serving the current artifact if the new one is broken
+                _logger.exception("Could not reload %s version %s", name, version)
+                continue
+            new_key = self.key(name, version)
+            if new_key != key:
+                swapped.append(new_key)
+        return swapped
+
+
+    def watch(self, interval: float = config.MODEL_RELOAD_INTERVAL):
+        """Refresh the artifacts every `interval` seconds in a daemon thread"""
+        if self._watcher is not None and self._watcher.is_alive():
+            return self._watcher
+
+        def run():
+            while not self._stop.wait(interval):
+                self.refresh()
+
+        self._stop.clear()
+        self._watcher = threading.Thread(
+            target=run, name='model-registry-watcher', daemon=True
+        )
+        self._watcher.start()
+        return self._watcher
+
+
+    def stop(self):
+        """Stop the watcher thread"""
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
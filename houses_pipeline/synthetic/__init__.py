@@ -0,0 +1 @@
+"""Generate synthetic houses data at scale, for load and scale testing"""
@@ -0,0 +1,62 @@
+"""
+Generate any number of synthetic houses rows into a CSV, Parquet or
+Feather file, in chunks of bounded memory, optionally breaking some of them
+to exercise the validation of the inputs
+"""
+import click
+
+from houses_pipeline import constants
+from houses_pipeline.config.logging import LoggingHandler
+
+
+logger = LoggingHandler.get_logger(__name__)
+
+
+@click.command()
+@click.argument('output_filepath', type=click.Path())
+@click.option(
+    '--input',
+    'input_filepath',
+    type=click.Path(exists=True),
+    default=constants.DEFAULT_PREPROCESS_INPUT_PATH,
+    help=constants.GENERATE_INPUT_PATH_HELP
+)
+@click.option('--rows', 'rows', default=1_000_000, help=constants.GENERATE_ROWS_HELP)
+@click.option(
+    '--chunksize',
+    'chunksize',
+    default=constants.DEFAULT_GENERATE_CHUNKSIZE,
+    help=constants.CHUNKSIZE_HELP
+)
+@click.option('--seed', 'seed', default=0, help=constants.SEED_HELP)
+@click.option('--target/--no-target', 'target', default=True, help=constants.TARGET_HELP)
+@click.option('--unseen_rate', 'unseen_rate', default=0.0, help=constants.UNSEEN_RATE_HELP)
+@click.option('--na_rate', 'na_rate', default=0.0, help=constants.NA_RATE_HELP)
+@click.option(
+    '--non_positive_rate',
+    'non_positive_rate',
+    default=0.0,
+    help=constants.NON_POSITIVE_RATE_HELP
+)
+# pylint: disable=too-many-arguments
+def main(
+    output_filepath: str, input_filepath: str, rows: int, chunksize: int,
+    seed: int, target: bool, unseen_rate: float, na_rate: float,
+    non_positive_rate: float
+):
+    """Fit the input data and write synthetic rows to the output file"""
+    # pandas and scipy are only imported when generating
+    # pylint: disable=import-outside-toplevel
+    from houses_pipeline.synthetic.core import generate_file
+
+    logger.info("Generating %d rows like %s into %s", rows, input_filepath, output_filepath)
+    generate_file(
+        input_filepath, output_filepath, rows,
+        chunksize=chunksize, seed=seed, target=target, unseen_rate=unseen_rate,
+        na_rate=na_rate, non_positive_rate=non_positive_rate
+    )
+
+
+if __name__ == '__main__':
+    # pylint: disable=no-value-for-parameter
+    main()
@@ -0,0 +1,221 @@
+"""
+Fit the marginals and the dependencies of the houses data and sample as many
+rows as needed from them, in chunks of bounded memory.
+
+Every column gets a latent standard normal score from its rank (categories
+being ordered by frequency), and the dependencies are the correlations of
+these scores, i.e. a Gaussian copula. Sampling draws correlated normal
+scores and maps each one back through the marginal of its column: the
+category frequencies, or the quantiles of the numbers.
+"""
+from typing import Iterator
+
+import numpy as np
+import pandas as pd
+from scipy.special import ndtr, ndtri
+
+from .. import constants
+from ..config import config
+from ..io import COLUMNAR_FORMATS, FrameWriter, file_format, import_pyarrow
+from ..io import read_frame
+
+ID_COLUMN = 'Id'
+# numbers with more distinct values are interpolated between the quantiles
+CONTINUOUS_MIN_VALUES = 50
+# the category of the unseen values, numbered
+UNSEEN_CATEGORY = 'Unseen'
+
+
+def _mid_ranks(codes: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """The mid rank quantiles of coded values, the codes ordered by rank"""
+    upper = np.cumsum(counts)
+    middle = (upper - counts / 2) / upper[-1]
+    return middle[codes]
+
+
+class HousesGenerator:
+    """A Gaussian copula of the houses columns, with their marginals"""
+
+    def __init__(self, seed: int = 0):
+        self.seed = seed
+        self.columns = []
+        self.dtypes = {}
+        self.categories = {}
+        self.quantiles = {}
+        self.na_rates = {}
+        self.cholesky = None
+
+
+    def fit(self, houses_df: pd.DataFrame):
+        """Fit the marginals and the correlations of the latent scores"""
+        self.columns = list(houses_df.columns)
+        self.dtypes = houses_df.dtypes.to_dict()
+        categoricals = set(constants.CATEGORICAL_COLUMNS) | set(constants.ORDINALS) | {
+            column for column, dtype in self.dtypes.items() if dtype == object
+        }
+
+        scores = []
+        for column in self._latent_columns():
+            values = houses_df[column]
+            if column in categoricals:
+                # categories by decreasing frequency, missing values included
+                counts = values.value_counts(dropna=False)
+                self.categories[column] = (
+                    counts.index.to_numpy(dtype=object), np.cumsum(counts.to_numpy()) / len(values)
+                )
+                codes = pd.Index(counts.index).get_indexer(values)
+                scores.append(ndtri(_mid_ranks(codes, counts.to_numpy())))
+                continue
+
+            present = values.notna().to_numpy()
+            self.na_rates[column] = 1 - present.mean()
+            self.quantiles[column] = np.sort(values[present].to_numpy(dtype=float))
+            ranks = values[present].rank(method='average').to_numpy()
+            score = np.zeros(len(values))
+            # the missing numbers are left at the mean score
+            score[present] = ndtri((ranks - 0.5) / present.sum())
+            scores.append(score)
+
+        correlation = np.corrcoef(np.array(scores))
+        # a little ridge keeps the matrix positive definite
+        correlation += np.eye(len(correlation)) * 1e-6
+        self.cholesky = np.linalg.cholesky(correlation)
+        return self
+
+
+    def _latent_columns(self) -> list:
+        """The columns sampled from the copula, all but the ids"""
+        return [column for column in self.columns if column != ID_COLUMN]
+
+
+    def sample(self, rows: int, rng: np.random.Generator, first_id: int = 1) -> pd.DataFrame:
+        """Sample rows, numbering their ids from `first_id`"""
+        latent_columns = self._latent_columns()
+        quantiles = ndtr(rng.standard_normal((rows, len(latent_columns))) @ self.cholesky.T)
+
+        sampled = {}
+        for position, column in enumerate(latent_columns):
+            u = quantiles[:, position]
+            if column in self.categories:
+                categories, cumulative = self.categories[column]
+                codes = np.minimum(
+                    np.searchsorted(cumulative, u, side='right'), len(categories) - 1
+                )
+                sampled[column] = categories[codes]
+                continue
+
+            values = self.quantiles[column]
+            if len(np.unique(values)) >= CONTINUOUS_MIN_VALUES:
+                numbers = np.interp(u * (len(values) - 1), np.arange(len(values)), values)
+            else:
+                numbers = values[np.minimum((u * len(values)).astype(int), len(values) - 1)]
+            if self.dtypes[column].kind == 'i':
+                numbers = np.round(numbers).astype(self.dtypes[column])
+            elif self.na_rates[column]:
+                numbers = np.where(rng.random(rows) < self.na_rates[column], np.nan, numbers)
+            sampled[column] = numbers
+
+        if ID_COLUMN in self.columns:
+            sampled[ID_COLUMN] = np.arange(first_id, first_id + rows)
+        return pd.DataFrame(sampled, columns=self.columns)
+
+
+    def chunks(self, rows: int, chunksize: int) -> Iterator[pd.DataFrame]:
+        """Sample rows in chunks of at most `chunksize` rows, reproducibly"""
+        rng = np.random.default_rng(self.seed)
+        for start in range(0, rows, chunksize):
+            yield self.sample(min(chunksize, rows - start), rng, first_id=start + 1)
+
+
+def _arrow_schema(dtypes: pd.Series):
+    """The arrow schema of frames of these dtypes, strings for the objects"""
+    pyarrow = import_pyarrow()
+    return pyarrow.schema([
+        (column, pyarrow.string() if dtype == object else pyarrow.from_numpy_dtype(dtype))
+        for column, dtype in dtypes.items()
+    ])
+
+
+def inject_invalid_values(
+    chunk: pd.DataFrame,
+    rng: np.random.Generator,
+    unseen_rate: float = 0.0,
+    na_rate: float = 0.0,
+    non_positive_rate: float = 0.0
+) -> pd.DataFrame:
+    """
+    Break a share of the rows: give them a category never seen in training,
+    a missing value where the model does not accept one or a non-positive
+    value of a log transformed variable (one of each per broken row)
+    """
+    chunk = chunk.copy()
+    categoricals = [
+        column for column in dict.fromkeys(constants.CATEGORICAL_COLUMNS)
+        if column in chunk.columns
+    ]
+    na_not_allowed = [
+        column for column in config.NUMERICAL_NA_NOT_ALLOWED + config.CATEGORICAL_NA_NOT_ALLOWED
+        if column in chunk.columns
+    ]
+    log_vars = [column for column in config.NUMERICALS_LOG_VARS if column in chunk.columns]
+
+    if na_rate:
+        # the same dtypes for every chunk, whether it got a missing value or not
+        integers = [column for column in na_not_allowed if chunk[column].dtype.kind == 'i']
+        chunk[integers] = chunk[integers].astype(float)
+
+    for rate, columns, value in (
+        (unseen_rate, categoricals, None),
+        (na_rate, na_not_allowed, np.nan),
+        (non_positive_rate, log_vars, 0),
+    ):
+        broken = np.flatnonzero(rng.random(len(chunk)) < rate)
+        if not broken.size or not columns:
+            continue
+        picked = rng.integers(len(columns), size=len(broken))
+        for position, column in enumerate(columns):
+            rows = chunk.index[broken[picked == position]]
+            if rows.empty:
+                continue
+            if value is None:
+                chunk.loc[rows, column] = [
+                    f'{UNSEEN_CATEGORY}{number}' for number in rng.integers(100, size=len(rows))
+                ]
+            else:
+                chunk.loc[rows, column] = value
+    return chunk
+
+
+def generate_file(
+    input_filepath, output_filepath, rows: int, *,
+    chunksize: int = constants.DEFAULT_GENERATE_CHUNKSIZE,
+    seed: int = 0,
+    target: bool = True,
+    unseen_rate: float = 0.0,
+    na_rate: float = 0.0,
+    non_positive_rate: float = 0.0
+):
+    """
+    Fit a generator on a houses file and write `rows` synthetic rows to a
+    CSV, Parquet or Feather file, holding a single chunk in memory at a time
+    """
+    houses_df = read_frame(input_filepath)
+    if not target:
+        houses_df = houses_df.drop(columns=constants.TARGET_VARIABLE_NAME, errors='ignore')
+    generator = HousesGenerator(seed=seed).fit(houses_df)
+
+    # the values to break are drawn apart from the sampled ones
+    rng = np.random.default_rng([seed, 1])
+    schema = None
+    if file_format(output_filepath) in COLUMNAR_FORMATS:
+        # a fixed schema, as a chunk may have a column of missing values only
+        dtypes = inject_invalid_values(
+            generator.sample(0, rng), rng, unseen_rate, na_rate, non_positive_rate
+        ).dtypes
+        schema = _arrow_schema(dtypes)
+    with FrameWriter(output_filepath, schema=schema) as writer:
+        for chunk in generator.chunks(rows, chunksize):
+            writer.write(inject_invalid_values(
+                chunk, rng, unseen_rate=unseen_rate, na_rate=na_rate,
+                non_positive_rate=non_positive_rate
+            ))
@@ -0,0 +1,49 @@
+"""Configuration for testing the houses pipeline"""
+import joblib
+import pandas as pd
+import pytest
+from .. import __version__, constants
+from ..config import config
+from ..preprocess.core import fit_preprocess_pipeline
+
+
+RAW_TRAIN_PATH = config.DATASET_DIR / 'raw/train.csv'
+RAW_TEST_PATH = config.DATASET_DIR / 'raw/test.csv'
+
+
+@pytest.fixture(scope='session')
+def houses_df():
+    """The preprocessed training dataset, as the modelling step reads it"""
+    raw_df = pd.read_csv(RAW_TRAIN_PATH)
+    return fit_preprocess_pipeline(raw_df).transform(raw_df)
+
+
+@pytest.fixture(scope='session')
+def fitted_lasso_pipeline(houses_df):
+    """A lasso pipeline fitted the same way the training command does"""
+    # pylint: disable=import-outside-toplevel
+    from ..modelling.train_lasso import create_lasso_pipeline
+
+    X_train = houses_df.drop([constants.TARGET_VARIABLE_NAME, 'Id'], axis=1)
+    y_train = houses_df[constants.TARGET_VARIABLE_NAME]
+    pipeline = create_lasso_pipeline(0.05, X_train, alpha=0.05, model_seed=1)
+    return pipeline.fit(X_train, y_train)
+
+
+@pytest.fixture
+def lasso_registry(fitted_lasso_pipeline, tmp_path, monkeypatch):
+    """
+    A registry of freshly saved preprocessor and lasso pipeline artifacts,
+    in place of the one the lasso predictions load the artifacts from
+    """
+    # pylint: disable=import-outside-toplevel
+    from ..predict import lasso
+
+    registry = lasso.create_registry(tmp_path)
+    for name, artifact in (
+        (config.PREPROCESS_SAVE_FILENAME, fit_preprocess_pipeline(pd.read_csv(RAW_TRAIN_PATH))),
+        (config.LASSO_SAVE_FILENAME, fitted_lasso_pipeline)
+    ):
+        joblib.dump(artifact, registry.path(name, __version__))
+    monkeypatch.setattr(lasso, 'registry', registry)
+    return registry
@@ -0,0 +1,111 @@
+"""
+Test scoring files in chunks
+"""
+import math
+
+import pandas as pd
+import pytest
+from click.testing import CliRunner
+from .. import __version__
+from ..validation import validate_inputs
+from ..preprocess.core import fit_preprocess_pipeline
+from ..predict import batch
+from ..predict.__main__ import main
+from ..predict.batch import score_file, row_ranges, ID_COLUMN
+from ..io import FrameWriter, read_frame, to_arrow_table
+from ..utils import process_context
+from .conftest import RAW_TRAIN_PATH, RAW_TEST_PATH
+
+
+@pytest.fixture(name='score')
+def score_fixture(fitted_lasso_pipeline):
+    """Score a dataframe the way the lasso predict endpoint does"""
+    preprocessor = fit_preprocess_pipeline(pd.read_csv(RAW_TRAIN_PATH))
+
+    def score(input_df):
+        validated_df = validate_inputs(input_data=input_df)
+        predictions = fitted_lasso_pipeline.predict(
+            preprocessor.transform(validated_df)
+        )
+        return pd.Series(predictions, index=validated_df.index)
+
+    return score
+
+
+@pytest.mark.parametrize(
+    'output_name', ['predictions.csv', 'predictions.parquet', 'predictions.feather']
+)
+def test_chunked_scoring_matches_scoring_at_once(score, tmp_path, output_name):
+    """Streaming the file in chunks gives the same predictions in order"""
+    if not output_name.endswith('.csv'):
+        pytest.importorskip('pyarrow')
+    test_df = pd.read_csv(RAW_TEST_PATH)
+    expected = score(test_df)
+    output_path = tmp_path / output_name
+
+    stats = score_file(RAW_TEST_PATH, output_path, score=score, chunksize=100)
+
+    predictions = read_frame(output_path)
+    assert stats['input_rows'] == len(test_df)
+    assert stats['scored_rows'] == len(expected)
+    assert predictions[ID_COLUMN].tolist() == test_df.loc[expected.index, ID_COLUMN].tolist()
+    pd.testing.assert_series_equal(
+        predictions['prediction'], expected.reset_index(drop=True),
+        check_names=False
+    )
+
+
+@pytest.mark.parametrize('written_rows', [300, None])
+@pytest.mark.parametrize('input_name', ['houses.csv', 'houses.parquet', 'houses.feather'])
+def test_parallel_scoring_matches_serial_scoring(score, tmp_path, input_name, written_rows):
+    """
+    Scoring row ranges in worker processes keeps the order of the file,
+    whether its row groups (or batches) are of a chunk or of the whole file
+    """
+    test_df = pd.read_csv(RAW_TEST_PATH).drop(columns=ID_COLUMN)
+    written_rows = written_rows or len(test_df)
+    input_path = tmp_path / input_name
+    if input_name.endswith('.parquet'):
+        pytest.importorskip('pyarrow')
+        test_df.to_parquet(input_path, row_group_size=written_rows)
+    elif input_name.endswith('.feather'):
+        pytest.importorskip('pyarrow')
+        with FrameWriter(input_path, schema=to_arrow_table(test_df).schema) as writer:
+            for start in range(0, len(test_df), written_rows):
+                writer.write(test_df.iloc[start:start + written_rows])
+    else:
+        test_df.to_csv(input_path, index=False)
+    if not input_name.endswith('.csv'):
+        assert len(list(row_ranges(input_path, 300))) == math.ceil(len(test_df) / 300)
+
+    score_file(input_path, tmp_path / 'serial.csv', score=score, chunksize=300)
+    stats = score_file(
+        input_path, tmp_path / 'parallel.csv', score=score, chunksize=300,
+        workers=3
+    )
+
+    serial = pd.read_csv(tmp_path / 'serial.csv')
+    parallel = pd.read_csv(tmp_path / 'parallel.csv')
+    assert stats['input_rows'] == len(test_df)
+    assert parallel[ID_COLUMN].tolist() == serial[ID_COLUMN].tolist()
+    pd.testing.assert_series_equal(parallel['prediction'], serial['prediction'])
+
+
+def test_scoring_command_loads_the_model_before_forking(lasso_registry, tmp_path, monkeypatch):
+    """The workers are forked once the parent loaded every artifact, once"""
+    loads_at_fork = []
+
+    def recording_context():
+        loads_at_fork.append(lasso_registry.loads)
+        return process_context()
+
+    monkeypatch.setattr(batch, 'process_context', recording_context)
+
+    result = CliRunner().invoke(main, [
+        str(RAW_TEST_PATH), str(tmp_path / 'predictions.csv'),
+        '--chunksize', '500', '--workers', '2'
+    ])
+
+    assert result.exit_code == 0, result.output
+    assert loads_at_fork == [1] and lasso_registry.loads == 1
+    assert len(pd.read_csv(tmp_path / 'predictions.csv')) > 0
@@ -0,0 +1,68 @@
+"""Test caching the predictions of the rows already scored"""
+import numpy as np
+import pandas as pd
+
+from ..predict import lasso
+from ..predict.cache import PredictionCache, SqliteStore, hash_rows
+from .conftest import RAW_TEST_PATH
+
+
+def test_hash_rows_is_canonical():
+    """Column order and integer or float numbers do not change the hash"""
+    input_df = pd.DataFrame({'LotArea': [8450, 9600], 'Street': ['Pave', None]})
+    reordered = input_df[['Street', 'LotArea']].astype({'LotArea': float})
+
+    hashes = hash_rows(input_df)
+    assert (hash_rows(reordered) == hashes).all()
+    assert hashes[0] != hashes[1]
+    assert (hash_rows(input_df, salt='another model') != hashes).all()
+
+
+def test_hash_rows_only_hashes_the_feature_columns():
+    """The Id and other columns the model does not use do not change the hash"""
+    input_df = pd.DataFrame({'LotArea': [8450, 9600], 'Street': ['Pave', None]})
+    keyed = input_df.assign(Id=[1, 2], request_key=['a', 'b'])
+
+    features = ['LotArea', 'Street', 'GrLivArea']
+    assert (hash_rows(keyed, columns=features) == hash_rows(input_df)).all()
+
+
+def test_predict_frame_only_scores_the_missing_rows(monkeypatch):
+    """A partly cached batch only scores its new rows, with the same results"""
+    input_df = pd.read_csv(RAW_TEST_PATH).head(20)
+    expected = lasso.predict_frame(input_df)
+
+    scored = []
+    score = lasso._score  # pylint: disable=protected-access
+
+    def counting_score(validated_df, *args):
+        scored.append(len(validated_df))
+        return score(validated_df, *args)
+
+    monkeypatch.setattr(lasso, '_score', counting_score)
+    cache = PredictionCache()
+    lasso.predict_frame(input_df.head(5), cache=cache)
+    predictions = lasso.predict_frame(input_df, cache=cache)
+
+    pd.testing.assert_series_equal(predictions, expected)
+    assert scored == [5, len(expected) - 5]
+    assert cache.stats()['hits'] == 5
+
+
+def test_prediction_caches_share_a_store_and_expire(tmp_path):
+    """Predictions are shared through the store and evicted or expired"""
+    keys = np.array([1, 2, 2**63 + 5], dtype=np.uint64)
+    predictions = np.array([1.5, 2.5, 3.5])
+    PredictionCache(store=SqliteStore(tmp_path / 'cache.db')).store_many(keys, predictions)
+
+    other = PredictionCache(capacity=2, store=SqliteStore(tmp_path / 'cache.db'))
+    found, hits = other.lookup(keys)
+    assert hits.all()
+    np.testing.assert_array_equal(found, predictions)
+    assert other.stats()['evictions'] == 1
+
+    expiring = PredictionCache(ttl=0)
+    expiring.store_many(keys, predictions)
+    _, hits = expiring.lookup(keys)
+    assert not hits.any()
+    assert expiring.stats()['expirations'] == 3
@@ -0,0 +1,53 @@
+"""
+Test the compiled scoring plan of the lasso pipeline
+"""
+import pickle
+import numpy as np
+import pandas as pd
+import pytest
+from .. import __version__
+from ..config import config
+from ..predict import lasso
+from ..validation import validate_inputs
+from ..preprocess.core import fit_preprocess_pipeline
+from ..predict.compiled import export_scoring_plan
+from .conftest import RAW_TRAIN_PATH, RAW_TEST_PATH
+
+
+def test_scoring_plan_matches_the_pipeline(fitted_lasso_pipeline):
+    """The compiled plan predicts what the sklearn pipeline predicts"""
+    preprocessor = fit_preprocess_pipeline(pd.read_csv(RAW_TRAIN_PATH))
+    test_df = preprocessor.transform(
+        validate_inputs(input_data=pd.read_csv(RAW_TEST_PATH))
+    )
+
+    plan = pickle.loads(pickle.dumps(export_scoring_plan(fitted_lasso_pipeline)))
+
+    expected = fitted_lasso_pipeline.predict(test_df)
+    np.testing.assert_allclose(
+        plan.predict(test_df), expected, rtol=config.ACCEPTABLE_MODEL_DIFFERENCE
+    )
+
+
+def test_scoring_plan_drops_zero_coefficients(fitted_lasso_pipeline):
+    """Only the features with a non-zero lasso coefficient are read"""
+    coefs = fitted_lasso_pipeline[-1].regressor_.coef_
+
+    plan = export_scoring_plan(fitted_lasso_pipeline)
+
+    assert plan.n_features <= np.count_nonzero(coefs)
+
+
+@pytest.mark.usefixtures('lasso_registry')
+def test_unseen_categories_are_scored_in_both_modes():
+    """
+    A category unseen in the fit, of a column without rare ones to replace
+    it with, is encoded as all zeros by the pipeline and the compiled plan
+    """
+    unseen_df = pd.read_csv(RAW_TEST_PATH).head(20).assign(CentralAir='Unseen')
+
+    pipeline = lasso.predict_frame(unseen_df, mode='pipeline')
+    compiled = lasso.predict_frame(unseen_df, mode='compiled')
+
+    assert len(pipeline) > 0 and np.isfinite(pipeline).all()
+    np.testing.assert_allclose(compiled, pipeline, rtol=config.ACCEPTABLE_MODEL_DIFFERENCE)
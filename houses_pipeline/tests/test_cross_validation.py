@@ -0,0 +1,53 @@
+"""
+Test cross validating the lasso pipeline on folds of the training rows
+"""
+import numpy as np
+import pytest
+from sklearn.linear_model import Lasso
+from sklearn.metrics import mean_squared_error
+from sklearn.model_selection import KFold
+from .. import constants
+from ..modelling.cross_validation import cross_validate_lasso, default_alphas
+from ..modelling.search import PathConfig, transform_design
+from ..modelling.train_lasso import create_lasso_pipeline
+
+
+def test_folds_score_as_refitted_pipelines(houses_df):
+    """The folds score as refitted pipelines, in parallel as serially"""
+    X = houses_df.drop([constants.TARGET_VARIABLE_NAME, 'Id'], axis=1)
+    y = houses_df[constants.TARGET_VARIABLE_NAME]
+
+    path = PathConfig(alphas=[0.01, 0.1, 0.001])
+    parallel = cross_validate_lasso(
+        X, y, rare_threshold=0.05, path=path, n_folds=3, seed=1, n_jobs=2
+    )
+    serial = cross_validate_lasso(
+        X, y, rare_threshold=0.05, path=path, n_folds=3, seed=1, n_jobs=1
+    )
+
+    assert [fold['fold'] for fold in parallel['folds']] == [0, 1, 2]
+    np.testing.assert_allclose(parallel['rmse_mean'], serial['rmse_mean'])
+    assert parallel['best_alpha'] == parallel['alphas'][np.argmin(parallel['rmse_mean'])]
+
+    train_index, test_index = next(KFold(3, shuffle=True, random_state=1).split(X))
+    for i, alpha in enumerate(parallel['alphas']):
+        pipeline = create_lasso_pipeline(
+            0.05, X.iloc[train_index], alpha, model_seed=1
+        ).fit(X.iloc[train_index], y.iloc[train_index])
+        assert parallel['folds'][0]['rmse'][i] == pytest.approx(mean_squared_error(
+            y.iloc[test_index], pipeline.predict(X.iloc[test_index]), squared=False
+        ), rel=1e-3)
+
+
+def test_default_alphas_start_from_the_alpha_zeroing_every_coefficient(houses_df):
+    """The strongest default alpha just zeroes every coefficient of the design"""
+    X = houses_df.drop([constants.TARGET_VARIABLE_NAME, 'Id'], axis=1)
+    y = houses_df[constants.TARGET_VARIABLE_NAME]
+
+    alphas = default_alphas(X, y, 0.05, PathConfig(n_alphas=10, eps=1e-3))
+    assert alphas[-1] == pytest.approx(alphas[0] * 1e-3)
+
+    design, target, _ = transform_design(0.05, X, y)
+    for alpha, zeroed in ((alphas[0], True), (alphas[0] * 0.9, False)):
+        lasso = Lasso(alpha=alpha).fit(design, target)
+        assert (np.count_nonzero(lasso.coef_) == 0) == zeroed
@@ -0,0 +1,36 @@
+"""Test the modules imported by the entry points of the package"""
+import subprocess
+import sys
+
+import pytest
+
+
+# the heavy modules which an entry point must not import, the import times
+# themselves are measured by benchmarks/bench_import_time.py
+DEFERRED_IMPORTS = {
+    'houses_pipeline': ('pandas', 'sklearn', 'joblib', 'mlflow'),
+    'houses_pipeline.predict.__main__': ('pandas', 'sklearn', 'mlflow'),
+    'houses_pipeline.preprocess.__main__': ('pandas', 'sklearn', 'mlflow'),
+    'houses_pipeline.modelling.train_lasso': ('mlflow',),
+}
+
+
+@pytest.mark.parametrize('module', DEFERRED_IMPORTS)
+def test_entry_point_defers_heavy_imports(module):
+    """Importing an entry point (e.g. for --help) defers its heavy imports"""
+    completed = subprocess.run(
+        [sys.executable, '-c', f"import sys, {module}; print(' '.join(sys.modules))"],
+        capture_output=True, text=True, check=True
+    )
+    assert not set(DEFERRED_IMPORTS[module]).intersection(completed.stdout.split())
+
+def test_lasso_model_is_loaded_on_first_use():
+    """Importing the lasso predictions does not load the model yet"""
+    completed = subprocess.run(
+        [
+            sys.executable, '-c',
+            "from houses_pipeline.predict import lasso; print(lasso.registry.loads)"
+        ],
+        capture_output=True, text=True, check=True
+    )
+    assert completed.stdout.split()[-1] == '0'
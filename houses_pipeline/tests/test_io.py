@@ -0,0 +1,59 @@
+"""
+Test reading and writing the datasets between the pipeline stages
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from ..io import FrameWriter, read_columns, read_frame, to_arrow_table, write_frame
+from .conftest import RAW_TRAIN_PATH
+
+
+@pytest.mark.parametrize('suffix', ['.parquet', '.feather'])
+def test_columnar_files_keep_the_values_and_the_dtypes(tmp_path, suffix):
+    """Columnar files read back as written, strings as categoricals"""
+    pytest.importorskip('pyarrow')
+    train_df = pd.read_csv(RAW_TRAIN_PATH)
+    path = tmp_path / f'train{suffix}'
+
+    write_frame(train_df, path)
+
+    read_df = read_frame(path)
+    assert read_df['Neighborhood'].dtype == 'category'
+    assert read_df['LotFrontage'].dtype == train_df['LotFrontage'].dtype
+    pd.testing.assert_frame_equal(read_df.astype(train_df.dtypes), train_df)
+    assert read_columns(path) == list(train_df.columns)
+
+    projected = read_frame(path, columns=['SalePrice', 'Alley'])
+    assert list(projected.columns) == ['SalePrice', 'Alley']
+    assert projected['Alley'].isna().sum() == train_df['Alley'].isna().sum()
+
+
+@pytest.mark.parametrize('suffix', ['.parquet', '.feather'])
+def test_frame_writer_converts_the_chunks_to_the_first_schema(tmp_path, suffix):
+    """Later chunks with nulls are written with the types of the first one"""
+    pytest.importorskip('pyarrow')
+    path = tmp_path / f'chunks{suffix}'
+
+    with FrameWriter(path) as writer:
+        writer.write(pd.DataFrame({'rooms': [3, 4], 'alley': ['Grvl', 'Pave']}))
+        writer.write(pd.DataFrame({'rooms': [np.nan, 5.0], 'alley': [None, None]}))
+
+    read_df = read_frame(path)
+    np.testing.assert_array_equal(read_df['rooms'], [3, 4, np.nan, 5])
+    assert read_df['alley'].tolist()[:2] == ['Grvl', 'Pave']
+    assert read_df['alley'].isna().sum() == 2
+
+
+@pytest.mark.parametrize('suffix', ['.csv', '.parquet', '.feather'])
+def test_frame_writer_creates_a_file_without_chunks(tmp_path, suffix):
+    """Writing no chunk leaves a file of no rows, with the given schema"""
+    if suffix != '.csv':
+        pytest.importorskip('pyarrow')
+    path = tmp_path / f'empty{suffix}'
+    schema = to_arrow_table(pd.DataFrame({'Id': [1], 'prediction': [1.0]})).schema
+
+    with FrameWriter(path, schema=schema):
+        pass
+
+    assert read_columns(path) == ['Id', 'prediction']
+    assert read_frame(path).empty
@@ -0,0 +1,49 @@
+"""Test logging through the background listener"""
+import logging
+import threading
+
+from ..config.logging import AsyncQueueHandler, LoggingHandler
+
+
+class _CapturingHandler(logging.Handler):
+    """Keep the formatted messages and the threads writing them"""
+
+    def __init__(self):
+        super().__init__()
+        self.records = []
+        self.written = []
+
+    def emit(self, record):
+        self.records.append(record)
+        self.written.append((self.format(record), threading.current_thread()))
+
+
+def test_get_logger_attaches_its_handler_once():
+    """Getting a logger again does not multiply its handlers"""
+    LoggingHandler.get_logger('houses_pipeline.tests.repeated')
+    logger = LoggingHandler.get_logger('houses_pipeline.tests.repeated')
+    assert len(logger.handlers) == 1
+    assert isinstance(logger.handlers[0], AsyncQueueHandler)
+
+
+def test_records_are_formatted_and_written_by_the_listener():
+    """The logging thread only queues the records, with their message merged"""
+    capturing = _CapturingHandler()
+    handler = AsyncQueueHandler(capturing)
+    logger = logging.getLogger('houses_pipeline.tests.async')
+    logger.addHandler(handler)
+    try:
+        logger.warning("Scored %d rows", 3)
+        try:
+            raise ValueError("no rows")
+        except ValueError:
+            logger.exception("Scoring failed")
+    finally:
+        logger.removeHandler(handler)
+        handler.stop()
+
+    [(message, thread), (failure, _)] = capturing.written
+    assert message == "Scored 3 rows"
+    assert thread is not threading.current_thread()
+    assert failure.startswith("Scoring failed\nTraceback") and "no rows" in failure
+    assert all(record.args is None and record.exc_info is None for record in capturing.records)
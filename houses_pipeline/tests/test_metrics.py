@@ -0,0 +1,46 @@
+"""Test timing the stages of the predictions"""
+import copy
+
+import numpy as np
+
+from .. import constants, metrics
+
+
+def test_instrumented_pipeline_times_its_stages(fitted_lasso_pipeline, houses_df):
+    """Every branch and the final step are timed, without changing predictions"""
+    X = houses_df.drop([constants.TARGET_VARIABLE_NAME, 'Id'], axis=1).head(20)
+    expected = fitted_lasso_pipeline.predict(X)
+    metrics.reset()
+
+    instrumented = metrics.instrument(copy.deepcopy(fitted_lasso_pipeline), 'lasso')
+    np.testing.assert_allclose(instrumented.predict(X), expected)
+
+    timed_stages = {
+        stage for stage in metrics._histograms  # pylint: disable=protected-access
+        if metrics.histogram(stage).count == 1
+    }
+    assert timed_stages == {
+        'lasso.numeriric_transformations', 'lasso.categoric_transformations',
+        'lasso.ordinals_encoding', 'lasso.lasso_and_target_transform'
+    }
+
+
+def test_render_prometheus_cumulates_the_buckets():
+    """Buckets count the values <= their bound, the last one every value"""
+    metrics.reset()
+    stage_histogram = metrics.histogram('validate_inputs')
+    for seconds in (0.0001, 0.003, 0.003, 10.0):
+        stage_histogram.observe(seconds)
+
+    metrics.enable(False)
+    try:
+        with metrics.timed('validate_inputs'):
+            pass
+    finally:
+        metrics.enable(True)
+
+    lines = metrics.render_prometheus().splitlines()
+    assert 'houses_stage_seconds_bucket{stage="validate_inputs",le="0.0001"} 1' in lines
+    assert 'houses_stage_seconds_bucket{stage="validate_inputs",le="0.005"} 3' in lines
+    assert 'houses_stage_seconds_bucket{stage="validate_inputs",le="+Inf"} 4' in lines
+    assert 'houses_stage_seconds_count{stage="validate_inputs"} 4' in lines
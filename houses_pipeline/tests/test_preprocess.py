@@ -0,0 +1,62 @@
+"""
+Test the preprocessing pipeline
+"""
+import pickle
+import pandas as pd
+import pytest
+from ..config import config
+from ..preprocess.core import load_preprocess_pipeline
+from ..preprocess.core import fit_preprocess_pipeline, preprocess_file
+from ..preprocess.core import COLUMNS_TO_IMPUTE
+
+
+RAW_TRAIN_PATH = config.DATASET_DIR / 'raw/train.csv'
+RAW_TEST_PATH = config.DATASET_DIR / 'raw/test.csv'
+
+
+def test_frozen_preprocessor_matches_refitting():
+    """A pickled, fitted preprocessor transforms like fitting per call"""
+    train_df = pd.read_csv(RAW_TRAIN_PATH)
+    test_df = pd.read_csv(RAW_TEST_PATH)
+
+    frozen = pickle.loads(pickle.dumps(fit_preprocess_pipeline(train_df)))
+    refitted = load_preprocess_pipeline().fit_transform(
+        test_df, impute_missing_categories__columns=COLUMNS_TO_IMPUTE
+    )
+
+    pd.testing.assert_frame_equal(frozen.transform(test_df), refitted)
+
+
+def test_preprocessor_fits_on_already_preprocessed_data():
+    """Fitting at training time happens on data without the dropped columns"""
+    train_df = pd.read_csv(RAW_TRAIN_PATH)
+    interim_df = load_preprocess_pipeline().fit_transform(
+        train_df, impute_missing_categories__columns=COLUMNS_TO_IMPUTE
+    )
+
+    frozen = fit_preprocess_pipeline(interim_df)
+
+    pd.testing.assert_frame_equal(frozen.transform(interim_df), interim_df)
+
+
+@pytest.mark.parametrize('dtypes', [{}, {
+    'categorical_dtype': 'category', 'numerical_dtype': 'float32'
+}])
+def test_chunked_preprocessing_matches_the_whole_file(tmp_path, dtypes):
+    """Chunks are read and transformed alike, whatever values they hold"""
+    pytest.importorskip('pyarrow')
+    train_df = pd.read_csv(RAW_TRAIN_PATH)
+    expected = load_preprocess_pipeline().fit_transform(
+        train_df, impute_missing_categories__columns=COLUMNS_TO_IMPUTE
+    )
+    output_path = tmp_path / 'train.parquet'
+
+    # some chunks of 20 rows have no value at all of a column
+    preprocess_file(RAW_TRAIN_PATH, output_path, chunksize=20, **dtypes)
+
+    preprocessed = pd.read_parquet(output_path)
+    if dtypes:
+        assert preprocessed['Neighborhood'].dtype == 'category'
+        assert preprocessed['LotFrontage'].dtype == 'float32'
+        preprocessed = preprocessed.astype(expected.dtypes)
+    pd.testing.assert_frame_equal(preprocessed, expected)
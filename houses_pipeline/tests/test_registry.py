@@ -0,0 +1,61 @@
+"""Test the cache of the trained artifacts"""
+import numpy as np
+
+from .. import save_model
+from ..registry import ModelRegistry
+
+
+def test_registry_memory_maps_and_hot_swaps(tmp_path):
+    """The cached artifact is memory mapped and swapped once its file changes"""
+    save_model({'coefs': np.arange(10.0)}, model_name='model_1.pkl', directory=tmp_path)
+    registry = ModelRegistry(tmp_path)
+    registry.register('model', lambda artifact: artifact['coefs'])
+
+    coefs = registry.get('model', '1')
+    assert isinstance(coefs, np.memmap)
+    assert registry.get('model', '1') is coefs
+    assert registry.refresh() == []
+
+    save_model({'coefs': np.ones(10)}, model_name='model_1.pkl', directory=tmp_path)
+    # the replaced file stays readable by the current artifact
+    np.testing.assert_array_equal(registry.get('model', '1'), np.arange(10.0))
+    assert registry.refresh() == [registry.key('model', '1')]
+    np.testing.assert_array_equal(registry.get('model', '1'), np.ones(10))
+    assert registry.loads == 2
+
+
+def test_registry_evicts_least_recently_used(tmp_path):
+    """Only the current artifacts are kept over the capacity"""
+    for version in '123':
+        save_model(version, model_name=f'model_{version}.pkl', directory=tmp_path)
+    registry = ModelRegistry(tmp_path, capacity=2)
+
+    keys = []
+    for version in '123':
+        assert registry.get('model', version) == version
+        keys.append(registry.key('model', version))
+    registry.get('model', '1')
+    # every version is current here, so none is evicted
+    assert len(registry._artifacts) == 3  # pylint: disable=protected-access
+
+    # a reverted file maps to the content already in the cache
+    save_model('1', model_name='model_2.pkl', directory=tmp_path)
+    registry.refresh()
+    assert registry.key('model', '2')[2] == keys[0][2]
+    assert keys[1] not in registry._artifacts  # pylint: disable=protected-access
+
+
+def test_registry_swaps_the_files_of_an_artifact_together(tmp_path):
+    """An artifact of several files is loaded, and swapped, as one snapshot"""
+    for name in ('preprocess', 'model'):
+        save_model(f'{name} 1', model_name=f'{name}_1.pkl', directory=tmp_path)
+    registry = ModelRegistry(tmp_path)
+    registry.register('pair', lambda *artifacts: artifacts, files=('preprocess', 'model'))
+
+    assert registry.get('pair', '1') == ('preprocess 1', 'model 1')
+
+    save_model('model 2', model_name='model_1.pkl', directory=tmp_path)
+    assert registry.get('pair', '1') == ('preprocess 1', 'model 1')
+    assert registry.refresh() == [registry.key('pair', '1')]
+    assert registry.get('pair', '1') == ('preprocess 1', 'model 2')
+    assert registry.loads == 2
@@ -0,0 +1,34 @@
+"""
+Test searching the hyperparameters of the lasso pipeline
+"""
+import pytest
+from sklearn.metrics import mean_squared_error
+from sklearn.model_selection import train_test_split
+from .. import constants
+from ..modelling.search import SearchConfig, search_lasso
+from ..modelling.train_lasso import create_lasso_pipeline
+
+
+def test_path_candidates_score_as_refitted_pipelines(houses_df):
+    """Every candidate of the path scores as its refitted pipeline would"""
+    X_fit, X_val, y_fit, y_val = train_test_split(
+        houses_df.drop([constants.TARGET_VARIABLE_NAME, 'Id'], axis=1),
+        houses_df[constants.TARGET_VARIABLE_NAME],
+        train_size=0.8, random_state=1
+    )
+
+    candidates = search_lasso(
+        X_fit, y_fit, X_val, y_val, SearchConfig([0.05, 0.1], n_alphas=5, n_jobs=2)
+    )
+
+    assert len(candidates) == 10
+    assert [candidate['rmse'] for candidate in candidates] == sorted(
+        candidate['rmse'] for candidate in candidates
+    )
+    for candidate in (candidates[0], candidates[-1]):
+        pipeline = create_lasso_pipeline(
+            candidate['rare_threshold'], X_fit, candidate['alpha'], model_seed=1
+        ).fit(X_fit, y_fit)
+        assert candidate['rmse'] == pytest.approx(
+            mean_squared_error(y_val, pipeline.predict(X_val), squared=False), rel=1e-3
+        )
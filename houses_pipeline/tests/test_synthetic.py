@@ -0,0 +1,78 @@
+"""
+Test generating synthetic houses data
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from ..validation import validate_inputs
+from ..synthetic.core import HousesGenerator, generate_file, inject_invalid_values
+from .conftest import RAW_TRAIN_PATH
+
+
+@pytest.fixture(name='generator', scope='module')
+def generator_fixture():
+    """A generator fitted on the raw training data"""
+    return HousesGenerator(seed=3).fit(pd.read_csv(RAW_TRAIN_PATH))
+
+
+def test_sampled_rows_follow_the_training_data(generator):
+    """The chunks keep the dtypes, marginals and dependencies of the source"""
+    train_df = pd.read_csv(RAW_TRAIN_PATH)
+    sampled = pd.concat(generator.chunks(20_000, chunksize=3_000), ignore_index=True)
+
+    assert sampled.dtypes.to_dict() == train_df.dtypes.to_dict()
+    assert sampled['Id'].tolist() == list(range(1, 20_001))
+    assert set(sampled['Neighborhood']) <= set(train_df['Neighborhood'])
+    assert sampled['LotFrontage'].isna().mean() == pytest.approx(
+        train_df['LotFrontage'].isna().mean(), abs=0.02
+    )
+    assert sampled['SalePrice'].median() == pytest.approx(
+        train_df['SalePrice'].median(), rel=0.05
+    )
+    assert sampled['GrLivArea'].corr(sampled['SalePrice']) == pytest.approx(
+        train_df['GrLivArea'].corr(train_df['SalePrice']), abs=0.1
+    )
+    # reproducible from the seed
+    pd.testing.assert_frame_equal(
+        next(generator.chunks(20_000, chunksize=3_000)), sampled.head(3_000)
+    )
+
+
+def _changed_rows(broken, chunk):
+    """Whether any value of each row was changed"""
+    return (broken.ne(chunk) & ~(broken.isna() & chunk.isna())).any(axis=1)
+
+
+def test_injected_values_fail_validation(generator):
+    """Rows with invalid values are dropped, unseen categories reach the model"""
+    chunk = generator.sample(2_000, np.random.default_rng(0))
+    assert len(validate_inputs(input_data=chunk)) == len(chunk)
+
+    broken = inject_invalid_values(
+        chunk, np.random.default_rng(1), na_rate=0.05, non_positive_rate=0.05
+    )
+    changed = _changed_rows(broken, chunk)
+    assert 100 < changed.sum() < 300
+    assert validate_inputs(input_data=broken).index.equals(chunk.index[~changed])
+
+    unseen = inject_invalid_values(chunk, np.random.default_rng(1), unseen_rate=0.05)
+    changed = _changed_rows(unseen, chunk)
+    assert 50 < changed.sum() < 150
+    assert unseen['Neighborhood'].str.startswith('Unseen').sum() > 0
+    assert len(validate_inputs(input_data=unseen)) == len(chunk)
+
+
+def test_generated_parquet_chunks_share_a_schema(tmp_path):
+    """Chunks with and without missing values are written to one file"""
+    pytest.importorskip('pyarrow')
+    output_path = tmp_path / 'houses.parquet'
+
+    generate_file(
+        RAW_TRAIN_PATH, output_path, rows=1_000, chunksize=10, target=False,
+        na_rate=0.05
+    )
+
+    generated = pd.read_parquet(output_path)
+    assert len(generated) == 1_000
+    assert 'SalePrice' not in generated
+    assert generated['Id'].is_monotonic_increasing
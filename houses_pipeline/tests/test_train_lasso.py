@@ -0,0 +1,23 @@
+"""
+Test the lasso training pipeline
+"""
+import numpy as np
+import scipy.sparse
+from .. import constants
+from ..modelling.train_lasso import create_lasso_pipeline
+
+
+def test_sparse_design_predicts_as_dense(houses_df, fitted_lasso_pipeline):
+    """The design matrix stays sparse and the lasso fits on it as on a dense one"""
+    X = houses_df.drop([constants.TARGET_VARIABLE_NAME, 'Id'], axis=1)
+    y = houses_df[constants.TARGET_VARIABLE_NAME]
+    dense_pipeline = create_lasso_pipeline(0.05, X, alpha=0.05, model_seed=1).set_params(
+        column_transformations__sparse_threshold=0
+    ).fit(X, y)
+
+    assert scipy.sparse.isspmatrix_csr(
+        fitted_lasso_pipeline.named_steps['column_transformations'].transform(X)
+    )
+    np.testing.assert_allclose(
+        fitted_lasso_pipeline.predict(X), dense_pipeline.predict(X), rtol=1e-6
+    )
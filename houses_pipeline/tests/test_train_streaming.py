@@ -0,0 +1,43 @@
+"""
+Test training the lasso pipeline over a file in chunks
+"""
+import numpy as np
+from sklearn.metrics import r2_score
+from .. import constants
+from ..modelling.train_lasso import create_lasso_pipeline
+from ..modelling.train_streaming import train_streaming
+from ..predict.compiled import export_scoring_plan
+
+
+def test_streamed_pipeline_fits_as_the_whole_file(houses_df, tmp_path):
+    """
+    The streamed statistics are the ones of the whole file, and the
+    pipeline is compiled and scores as one trained in memory
+    """
+    input_path = tmp_path / 'train.csv'
+    houses_df.to_csv(input_path, index=False)
+    X = houses_df.drop(columns=[constants.TARGET_VARIABLE_NAME, 'Id'])
+    y = houses_df[constants.TARGET_VARIABLE_NAME]
+
+    pipeline, statistics = train_streaming(
+        input_path, chunksize=200, reservoir_size=300, epochs=5, holdout=0, alpha=0.01
+    )
+    whole = create_lasso_pipeline(0.05, X, alpha=0.01, model_seed=1)[0].fit(X, y)
+
+    assert statistics['rows'] == len(X) and len(statistics['reservoir']) == 300
+    streamed_numeric = pipeline[0].named_transformers_['numeriric_transformations']
+    whole_numeric = whole.named_transformers_['numeriric_transformations']
+    for step, attribute in (('impute_with_mean', 'statistics_'), ('scaling', 'scale_')):
+        np.testing.assert_allclose(
+            getattr(streamed_numeric.named_steps[step], attribute),
+            getattr(whole_numeric.named_steps[step], attribute)
+        )
+    streamed_replacer = pipeline[0].named_transformers_['categoric_transformations'][0]
+    whole_replacer = whole.named_transformers_['categoric_transformations'][0]
+    assert [set(kept) for kept in streamed_replacer.categories_to_keep] == [
+        set(kept) for kept in whole_replacer.categories_to_keep
+    ]
+
+    predictions = pipeline.predict(X)
+    np.testing.assert_allclose(export_scoring_plan(pipeline).predict(X), predictions)
+    assert r2_score(y, predictions) > 0.8
@@ -0,0 +1,86 @@
+"""
+Test caching the fitted training transformations and their design matrix
+"""
+import numpy as np
+import scipy.sparse
+from .. import constants
+from ..modelling.train_lasso import create_lasso_pipeline, fit_lasso_pipeline
+from ..modelling import transform_cache
+from ..modelling.transform_cache import TransformCache
+
+
+def test_cached_design_matrix_fits_the_same_model(houses_df, tmp_path):
+    """A second fit reuses the cached transformations, to the same model"""
+    X_train = houses_df.drop([constants.TARGET_VARIABLE_NAME, 'Id'], axis=1)
+    y_train = houses_df[constants.TARGET_VARIABLE_NAME]
+    expected = create_lasso_pipeline(0.05, X_train, alpha=0.05, model_seed=1).fit(
+        X_train, y_train
+    ).predict(X_train)
+    cache = TransformCache(tmp_path)
+
+    predictions = []
+    for alpha in (0.05, 0.05, 0.1):
+        pipeline = create_lasso_pipeline(0.05, X_train, alpha=alpha, model_seed=1)
+        key = cache.key('input digest', {'split_seed': 1}, pipeline.named_steps[
+            'column_transformations'
+        ])
+        fit_lasso_pipeline(pipeline, X_train, y_train, cache, key)
+        predictions.append(pipeline.predict(X_train))
+
+    np.testing.assert_allclose(predictions[0], expected)
+    np.testing.assert_allclose(predictions[1], expected)
+    assert not np.allclose(predictions[2], expected)
+    assert cache.stats()['entries'] == 1
+    assert cache.stats()['hits'] == 2
+
+
+def test_cache_evicts_the_least_recently_used_entries(tmp_path):
+    """Sparse and dense entries are evicted, the oldest first, past the size"""
+    design = scipy.sparse.random(1000, 50, density=0.1, format='csr', random_state=0)
+    cache = TransformCache(tmp_path, max_bytes=10 ** 9)
+    cache.put('sparse', 'transformer', design)
+    cache.put('dense', 'transformer', design.toarray())
+
+    transformer, cached = cache.get('sparse')
+    assert transformer == 'transformer'
+    assert (cached != design).nnz == 0
+
+    entry_bytes = {entry['key']: entry['bytes'] for entry in cache.entries()}
+    cache.max_bytes = entry_bytes['sparse'] + entry_bytes['dense'] - 1
+    assert cache.evict() == 1
+    assert cache.get('dense') is None
+    assert cache.get('sparse') is not None
+
+
+def test_key_changes_with_the_transformers_code(houses_df, monkeypatch):
+    """Entries made by an older code of the transformers are not reused"""
+    X_train = houses_df.drop([constants.TARGET_VARIABLE_NAME, 'Id'], axis=1)
+    transformer = create_lasso_pipeline(0.05, X_train, alpha=0.05, model_seed=1).named_steps[
+        'column_transformations'
+    ]
+    key = TransformCache.key('input digest', {'split_seed': 1}, transformer)
+    assert TransformCache.key('input digest', {'split_seed': 1}, transformer) == key
+
+    monkeypatch.setattr(transform_cache, '_transformers_digest', lambda: 'edited')
+    assert TransformCache.key('input digest', {'split_seed': 1}, transformer) != key
+
+
+def test_put_only_ignores_an_entry_cached_meanwhile(tmp_path, monkeypatch):
+    """Caching a key cached meanwhile is quiet, other failures are logged"""
+    warnings = []
+    monkeypatch.setattr(
+        transform_cache._logger, 'warning',  # pylint: disable=protected-access
+        lambda *args: warnings.append(args)
+    )
+    cache = TransformCache(tmp_path, max_bytes=10 ** 9)
+    cache.put('key', 'transformer', np.ones((10, 2)))
+    cache.put('key', 'transformer', np.ones((10, 2)))
+    assert not warnings and cache.get('key') is not None
+
+    def denied(*_):
+        raise PermissionError(13, 'Permission denied')
+
+    monkeypatch.setattr(transform_cache.os, 'replace', denied)
+    cache.put('another key', 'transformer', np.ones((10, 2)))
+    assert len(warnings) == 1 and cache.get('another key') is None
+    assert [path.name for path in tmp_path.iterdir()] == ['key']
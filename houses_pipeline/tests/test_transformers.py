@@ -4,7 +4,7 @@ Test transformers
 from sklearn.impute import SimpleImputer
 import pandas as pd
 import numpy as np
-from ..transformers import Pandalizer
+from ..transformers import Pandalizer, RareCategoriesReplacer
 
 
 def test_pandalizer_returns_dataframe():
@@ -17,3 +17,99 @@ def test_pandalizer_returns_dataframe():
     imputer = Pandalizer(SimpleImputer(strategy='mean'))
     result_dataframe = imputer.fit_transform(dataframe)
     assert isinstance(result_dataframe, pd.DataFrame)
+
+
+def test_rare_categories_replacer_replaces_rare_and_unseen():
+    """Rare categories and categories not seen in fitting become the keyword"""
+    train = pd.DataFrame({
+        'x': ['a'] * 8 + ['b', 'c'],
+        'y': ['d'] * 5 + ['e'] * 5
+    })
+    test = pd.DataFrame({'x': ['a', 'b', 'z'], 'y': ['e', 'd', 'd']})
+
+    replacer = RareCategoriesReplacer(threshold=0.15).fit(train)
+
+    expected = np.array([['a', 'e'], ['Other', 'd'], ['Other', 'd']], dtype=object)
+    np.testing.assert_array_equal(replacer.transform(test), expected)
+    np.testing.assert_array_equal(replacer.transform(test.to_numpy()), expected)
+    np.testing.assert_array_equal(
+        replacer.transform(test.astype('category')), expected
+    )
+
+
+def test_rare_categories_replacer_is_same_for_small_and_large_inputs():
+    """The small input lookups agree with the vectorised ones"""
+    train = pd.DataFrame({'x': list('aaaabbbccd')})
+    test = pd.DataFrame({'x': list('abcdez') * 20})
+
+    replacer = RareCategoriesReplacer(threshold=0.2).fit(train)
+
+    large = replacer.transform(test)
+    small = np.concatenate([
+        replacer.transform(test.iloc[i:i + 1]) for i in range(len(test))
+    ])
+    assert len(test) > replacer.SMALL_INPUT_ROWS
+    np.testing.assert_array_equal(small, large)
+
+
+def test_rare_categories_replacer_partial_fit_is_fit():
+    """Fitting chunk by chunk keeps the categories a single fit keeps"""
+    train = pd.DataFrame({'x': list('aaaabbbccd'), 'y': list('eeeeeffggg')})
+    test = pd.DataFrame({'x': list('abcdz'), 'y': list('efggz')})
+
+    replacer = RareCategoriesReplacer(threshold=0.3)
+    for start in range(0, len(train), 3):
+        replacer.partial_fit(train.iloc[start:start + 3])
+
+    np.testing.assert_array_equal(
+        replacer.transform(test), RareCategoriesReplacer(threshold=0.3).fit(train).transform(test)
+    )
+
+
+def test_rare_categories_replacer_fit_forgets_partial_fits():
+    """Fitting again discards the counts of the chunks fitted before"""
+    train = pd.DataFrame({'x': list('aaaabbbccd')})
+    test = pd.DataFrame({'x': list('abcdz')})
+
+    replacer = RareCategoriesReplacer(threshold=0.3).partial_fit(pd.DataFrame({'x': list('dddd')}))
+    replacer.fit(train)
+
+    assert replacer.counts_[0].sum() == len(train)
+    np.testing.assert_array_equal(
+        replacer.transform(test), RareCategoriesReplacer(threshold=0.3).fit(train).transform(test)
+    )
+
+
+def test_pandalizer_copy_modes_agree():
+    """All copy modes impute the same, only inplace modifies the input"""
+    dataframe = pd.DataFrame({
+        'x': [1, 2, 3, np.nan],
+        'y': [np.nan, 12, 1.4, 5.6],
+        'z': ['a', 'b', 'c', 'd']
+    })
+    expected = Pandalizer(SimpleImputer(strategy='mean')).fit_transform(
+        dataframe, columns=['x']
+    )
+
+    for copy in ['shallow', 'inplace']:
+        data = dataframe.copy()
+        imputer = Pandalizer(SimpleImputer(strategy='mean'), copy=copy)
+        result = imputer.fit_transform(data, columns=['x'])
+
+        pd.testing.assert_frame_equal(result, expected)
+        assert (result is data) == (copy == 'inplace')
+        assert data['x'].isnull().any() == (copy != 'inplace')
+
+
+def test_shallow_pandalizer_shares_untouched_columns():
+    """The shallow copy mode only allocates the transformed columns"""
+    dataframe = pd.DataFrame({
+        'x': [1, 2, 3, np.nan],
+        'y': [np.nan, 12, 1.4, 5.6]
+    })
+
+    imputer = Pandalizer(SimpleImputer(strategy='mean'), copy='shallow')
+    result = imputer.fit_transform(dataframe, columns=['x'])
+
+    assert np.shares_memory(result['y'].to_numpy(), dataframe['y'].to_numpy())
+    assert imputer.bytes_allocated == result['x'].to_numpy().nbytes
@@ -0,0 +1,49 @@
+"""Test the validation of the model inputs"""
+import numpy as np
+import pandas as pd
+
+from ..config import config
+from ..validation import validate_inputs
+from .conftest import RAW_TEST_PATH
+
+
+NA_NOT_ALLOWED = config.NUMERICAL_NA_NOT_ALLOWED + config.CATEGORICAL_NA_NOT_ALLOWED
+
+
+def test_validate_inputs_drops_whole_rows():
+    """Rows breaking a rule are dropped whole, counted per rule"""
+    input_df = pd.read_csv(RAW_TEST_PATH).head(10)
+    input_df = input_df.dropna(subset=NA_NOT_ALLOWED)
+    input_df.loc[input_df.index[1], config.NUMERICALS_LOG_VARS[0]] = 0
+    input_df.loc[input_df.index[2], config.NUMERICALS_LOG_VARS[-1]] = -5
+    input_df.loc[input_df.index[2], config.CATEGORICAL_NA_NOT_ALLOWED[0]] = np.nan
+
+    validated_df, counts = validate_inputs(input_df, return_counts=True)
+
+    pd.testing.assert_frame_equal(
+        validated_df, input_df.drop(index=input_df.index[1:3])
+    )
+    assert counts == {
+        'numerical_na': 0, 'categorical_na': 1, 'non_positive_log': 2, 'total': 2
+    }
+
+
+def test_validate_inputs_does_not_copy_valid_inputs():
+    """Valid inputs are returned as they are"""
+    input_df = pd.read_csv(RAW_TEST_PATH).head(10)
+    input_df = input_df.dropna(subset=NA_NOT_ALLOWED)
+    assert validate_inputs(input_df) is input_df
+
+
+def test_validate_inputs_keeps_missing_values_of_object_columns():
+    """None in an object column of a log variable is not <= 0"""
+    input_df = pd.read_csv(RAW_TEST_PATH).head(10)
+    input_df = input_df.dropna(subset=NA_NOT_ALLOWED)
+    column = config.NUMERICALS_LOG_VARS[0]
+    input_df[column] = input_df[column].astype(object)
+    input_df.loc[input_df.index[0], column] = None
+    input_df.loc[input_df.index[1], column] = 0
+
+    validated_df, counts = validate_inputs(input_df, return_counts=True)
+    assert counts['non_positive_log'] == 1
+    assert input_df.index[0] in validated_df.index
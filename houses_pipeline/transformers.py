@@ -6,28 +6,65 @@ import numpy as np
 class Pandalizer(BaseEstimator, TransformerMixin):
     """
     Executes a transformer on a subset of columns and returns a
-    Pandas DataFrame as a result
+    Pandas DataFrame as a result.
+
+    By default the whole input is copied (copy='deep'). With copy='shallow'
+    only the transformed columns are new, the untouched column blocks are
+    shared with the input, and with copy='inplace' the input itself is
+    modified. The bytes allocated by the last transform are kept in
+    `bytes_allocated`.
     """
-    def __init__(self, transformer):
+    COPY_MODES = ('deep', 'shallow', 'inplace')
+
+    def __init__(self, transformer, copy='deep'):
         self.transformer = transformer
+        self.copy = copy
         self.columns = None
+        self.bytes_allocated = 0
 
 
     def fit(self, df, y=None, columns=None, **fit_args):
         """Fit the Pandalizer taking additional fit_args to pass"""
+        if self.copy not in self.COPY_MODES:
+            raise ValueError(
+                f"Unknown copy mode {self.copy}, use one of {self.COPY_MODES}"
+            )
         # get only a subset of columns on which to apply the transformer
         if columns is None:
             self.columns = df.columns
         else:
             self.columns = np.intersect1d(columns, df.columns)
-        return self.transformer.fit(df[self.columns], y, **fit_args)
+        self.transformer.fit(df[self.columns], y, **fit_args)
+        return self
 
 
     def transform(self, data):
         """Transform the data"""
-        df = data.copy()
-        df.loc[:, self.columns] = self.transformer.transform(df[self.columns])
-        return df
+        transformed = self.transformer.transform(data[self.columns])
+        self.bytes_allocated = transformed.nbytes
+
+        if self.copy == 'inplace':
+            data.loc[:, self.columns] = transformed
+            return data
+
+        if self.copy == 'deep':
+            df = data.copy()
+            df.loc[:, self.columns] = transformed
+            self.bytes_allocated += data.memory_usage(index=False).sum()
+            return df
+
+        # rebuild the frame column by column, without consolidating the
+        # columns into blocks, so the untouched ones are not copied
+        positions = {column: i for i, column in enumerate(self.columns)}
+        return pd.DataFrame(
+            {
+                column: transformed[:, positions[column]]
+                if column in positions else data[column]
+                for column in data.columns
+            },
+            index=data.index,
+            copy=False
+        )
 
 
     def fit_transform(self, X, y=None, columns=None, **fit_args):
@@ -41,10 +78,21 @@ class RareCategoriesReplacer(BaseEstimator, TransformerMixin):
     """
     Replaces Categorical Columns rare values with a keyword
     """
+    # below this many rows, python set lookups beat the vectorised ones
+    SMALL_INPUT_ROWS = 64
+
     def __init__(self, threshold=0.05, keyword: str='Other') -> None:
         self.keyword = keyword
         self.threshold = threshold
+        self._reset()
+
+
+    def _reset(self):
+        """Forget the fitted counts, proportions and categories"""
+        self.counts_ = None
         self.proportions = []
+        self.categories_to_keep = []
+        self.category_sets_to_keep = []
 
 
     def get_proportions(self, X):
@@ -56,29 +104,74 @@ class RareCategoriesReplacer(BaseEstimator, TransformerMixin):
 
 
     def fit(self, X, y=None):
-        """Fit the rare categorical transformer"""
+        """Fit the rare categorical transformer, forgetting any partial fit"""
+        # pylint: disable=unused-argument
+        self._reset()
+        return self.partial_fit(X)
+
+
+    def partial_fit(self, X, y=None):
+        """
+        Fit the rare categorical transformer on one more chunk of rows, the
+        proportions being the ones of all the chunks seen so far
+        """
         # pylint: disable=unused-argument
         is_df = isinstance(X, pd.DataFrame)
-        self.proportions = self.get_proportions(X.values if is_df else X)
+        counts = [pd.Series(x).value_counts() for x in (X.values if is_df else X).T]
+        if self.counts_ is not None:
+            counts = [
+                seen.add(chunk, fill_value=0) for seen, chunk in zip(self.counts_, counts)
+            ]
+        self.counts_ = counts
+        self.proportions = [
+            column_counts / column_counts.sum() for column_counts in counts
+        ]
+        self._keep_frequent()
         return self
 
 
+    def _keep_frequent(self):
+        """Keep the categories which are not rare, by their proportions"""
+        # the categories which are not rare, as hash indexes for the lookups
+        self.categories_to_keep = [
+            props.index[props >= self.threshold] for props in self.proportions
+        ]
+        self.category_sets_to_keep = [
+            frozenset(categories) for categories in self.categories_to_keep
+        ]
+
+
     def is_to_replace(self, i, col):
         """calculate keywords to replace by a given column"""
-        props = self.proportions[i]
-        rares = props[props < self.threshold].index.values
-        new_ones = np.setdiff1d(col, props.index)
-        is_rare = np.isin(col, rares)
-        is_new_one = np.isin(col, new_ones)
-        return is_rare | is_new_one
+        # rare and never seen categories are both missing from the keep-set
+        if len(col) <= self.SMALL_INPUT_ROWS:
+            keep = self.category_sets_to_keep[i]
+            return np.fromiter(
+                (value not in keep for value in col), dtype=bool, count=len(col)
+            )
+        return self.categories_to_keep[i].get_indexer(col) == -1
 
 
-    def transform(self, X) -> pd.DataFrame:
+    def transform(self, X) -> np.ndarray:
         """Transform the rare categorical transformer"""
         is_df = isinstance(X, pd.DataFrame)
-        Xt = X.values.copy() if is_df else X.values.copy()
-        for i, col in enumerate(Xt.T):
-            col[self.is_to_replace(i, col)] = self.keyword
+        if is_df and any(isinstance(dtype, pd.CategoricalDtype) for dtype in X.dtypes):
+            columns = [X[column] for column in X.columns]
+        else:
+            columns = np.asarray(X).T
+        # the only allocation, filled column by column
+        Xt = np.empty((len(X), len(columns)), dtype=object, order='F')
+        for i, col in enumerate(columns):
+            if isinstance(col.dtype, pd.CategoricalDtype):
+                # replace among the few categories and take them by the codes,
+                # the keyword is appended for the missing values coded as -1
+                categories = col.cat.categories.to_numpy(dtype=object)
+                categories = np.where(
+                    self.is_to_replace(i, categories), self.keyword, categories
+                )
+                Xt[:, i] = np.append(categories, self.keyword)[col.cat.codes]
+            else:
+                Xt[:, i] = np.where(self.is_to_replace(i, col), self.keyword, col)
         return Xt
 
 
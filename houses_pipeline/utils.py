@@ -0,0 +1,24 @@
+"""
+Helpers shared by the modules of the package, light enough to be imported
+by any of them
+"""
+import hashlib
+import multiprocessing
+
+
+def file_digest(filepath, block_size: int = 1 << 20) -> str:
+    """The sha256 hex digest of the content of a file, read in blocks"""
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as input_file:
+        for block in iter(lambda: input_file.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def process_context():
+    """
+    Prefer forking, so the worker processes share the memory of their parent
+    (e.g. the loaded model or the training rows)
+    """
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context('fork' if 'fork' in methods else None)
@@ -1,30 +1,62 @@
 """Main module for validating the data to be processed and predicted on"""
+from typing import Dict, Tuple, Union
+
+import numpy as np
 import pandas as pd
 from .config import config
 
 
-def validate_inputs(input_data: pd.DataFrame) -> pd.DataFrame:
-    """Check model inputs for unprocessable values."""
+def _has_missing(values: np.ndarray) -> np.ndarray:
+    """Whether each value is missing"""
+    return pd.isna(values)
+
+
+def _is_not_positive(values: np.ndarray) -> np.ndarray:
+    """Whether each value is <= 0 (missing values are not)"""
+    if values.dtype == object:
+        # None does not compare with numbers, as it does in a Series
+        present = pd.notna(values)
+        broken = np.zeros(len(values), dtype=bool)
+        broken[present] = values[present] <= 0
+        return broken
+    return values <= 0
+
+
+# the rules dropping rows: (name, columns, check of the values of a column)
+VALIDATION_RULES = (
+    # numerical variables with NA not seen during training
+    ('numerical_na', config.NUMERICAL_NA_NOT_ALLOWED, _has_missing),
+    # categorical variables with NA not seen during training
+    ('categorical_na', config.CATEGORICAL_NA_NOT_ALLOWED, _has_missing),
+    # values <= 0 of the log transformed variables
+    ('non_positive_log', config.NUMERICALS_LOG_VARS, _is_not_positive),
+)
+
 
-    validated_data = input_data.copy()
+def validate_inputs(
+    input_data: pd.DataFrame, *, return_counts: bool = False
+) -> Union[pd.DataFrame, Tuple[pd.DataFrame, Dict[str, int]]]:
+    """
+    Check model inputs for unprocessable values, dropping the rows which
+    break any of the validation rules. The input is returned as it is (not
+    copied) when no row is dropped.
 
-    # check for numerical variables with NA not seen during training
-    if input_data[config.NUMERICAL_NA_NOT_ALLOWED].isnull().any().any():
-        validated_data = validated_data.dropna(
-            axis=0, subset=config.NUMERICAL_NA_NOT_ALLOWED
-        )
+    With return_counts, also return the number of rows each rule drops
+    (a row can break several rules) and the total number of dropped rows.
+    """
+    dropped = np.zeros(len(input_data), dtype=bool)
+    broken = np.empty(len(input_data), dtype=bool)
+    counts = {}
 
-    # check for categorical variables with NA not seen during training
-    if input_data[config.CATEGORICAL_NA_NOT_ALLOWED].isnull().any().any():
-        validated_data = validated_data.dropna(
-            axis=0, subset=config.CATEGORICAL_NA_NOT_ALLOWED
-        )
+    for name, columns, check in VALIDATION_RULES:
+        broken[:] = False
+        for column in columns:
+            broken |= check(input_data[column].to_numpy())
+        counts[name] = int(broken.sum())
+        dropped |= broken
 
-    # check for values <= 0 for the log transformed variables
-    if (input_data[config.NUMERICALS_LOG_VARS] <= 0).any().any():
-        vars_with_neg_values = config.NUMERICALS_LOG_VARS[
-            (input_data[config.NUMERICALS_LOG_VARS] <= 0).any()
-        ]
-        greater_mask = validated_data[vars_with_neg_values] > 0
-        validated_data = validated_data[greater_mask]
+    counts['total'] = int(dropped.sum())
+    validated_data = input_data[~dropped] if counts['total'] else input_data
+    if return_counts:
+        return validated_data, counts
     return validated_data